@@ -1,3 +1,5 @@
+from functions.apollo_input_data import industries
+
 
 
 INDUSTRY_ICPS = {
@@ -57,3 +59,73 @@ def get_icp_for_industry(industry: str) -> str:
         "Target: B2B service-oriented companies..."
     """
     return INDUSTRY_ICPS.get(industry.strip(), DEFAULT_ICP)
+
+
+# Titles that are never a fit; clean_titles drops every title containing one of these
+EXCLUDED_TITLE_KEYWORDS = [
+    "assistant",
+    "member",
+    "research fellow",
+    "chief of staff",
+    "secretary",
+    "personal wealth executive",
+]
+
+# Scraper configs from apollo_input_data.py keyed by industry
+INDUSTRY_CONFIGS = {
+    industry_key: config
+    for industry_obj in industries
+    for industry_key, config in industry_obj.items()
+}
+
+
+def get_industry_config(industry: str) -> dict:
+    """
+    Get the Apollo scraper config for a given industry.
+
+    Args:
+        industry: Industry identifier from apollo_input_data.py
+
+    Returns:
+        Config dict for the industry, or an empty dict if not found
+    """
+    return INDUSTRY_CONFIGS.get(str(industry).strip(), {})
+
+
+def is_target_title(industry: str, job_title: str) -> bool:
+    """
+    Check whether a job title matches one of the industry's configured contact_job_title values.
+
+    Matching is case-insensitive and accepts either title containing the other,
+    e.g. "Director of Food & Beverage Operations" matches "Director of Food & Beverage".
+    """
+    title = str(job_title or "").strip().lower()
+    if not title or title == "nan":
+        return False
+    targets = get_industry_config(industry).get("contact_job_title", [])
+    return any(
+        target.lower() in title or title in target.lower()
+        for target in targets
+    )
+
+
+def get_size_ranges_for_industry(industry: str) -> list:
+    """
+    Get the industry's configured company size buckets as numeric ranges.
+
+    Args:
+        industry: Industry identifier from apollo_input_data.py
+
+    Returns:
+        List of (min_employees, max_employees) tuples, e.g. "11-20" -> (11, 20)
+        and "10001+" -> (10001, inf). Empty if the industry has no size filter.
+    """
+    ranges = []
+    for bucket in get_industry_config(industry).get("size", []):
+        bucket = str(bucket).strip()
+        if bucket.endswith("+"):
+            ranges.append((int(bucket[:-1]), float("inf")))
+        elif "-" in bucket:
+            low, high = bucket.split("-", 1)
+            ranges.append((int(low), int(high)))
+    return ranges
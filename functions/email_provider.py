@@ -3,10 +3,12 @@ Email Provider Functions
 Individual functions for each email finding service
 """
 
-import requests
+import asyncio
 import time
 import os
 from dotenv import load_dotenv
+from toolkit.asyncHttp import async_get, async_post
+from toolkit.httpClient import http_get, http_post
 
 load_dotenv()
 
@@ -24,41 +26,46 @@ def hunter_find_email(domain):
         return None
     
     try:
-        response = requests.get(
+        response = http_get(
             "https://api.hunter.io/v2/domain-search",
             params={"domain": domain, "api_key": HUNTER_API_KEY},
             timeout=10
         )
         
         if response.status_code == 200:
-            data = response.json()
-            if data.get('data') and data['data'].get('emails'):
-                emails = data['data']['emails']
-                if emails:
-                    for email_data in emails:
-                        email = email_data.get('value')
-                        if email and any(p in email.lower() for p in ['info@', 'contact@', 'hello@', 'support@']):
-                            return email
-                    return emails[0].get('value')
+            return _hunter_email(response.json())
         return None
     except Exception:
         return None
 
 
+def _hunter_email(data):
+    if data.get('data') and data['data'].get('emails'):
+        emails = data['data']['emails']
+        if emails:
+            for email_data in emails:
+                email = email_data.get('value')
+                if email and any(p in email.lower() for p in ['info@', 'contact@', 'hello@', 'support@']):
+                    return email
+            return emails[0].get('value')
+    return None
+
+
 def snov_find_email(domain):
     """Find email using Snov.io"""
     if not domain or not SNOV_API_USER_ID or not SNOV_API_SECRET:
         return None
     
     try:
-        token_response = requests.post(
+        token_response = http_post(
             "https://api.snov.io/v1/oauth/access_token",
             data={
                 "grant_type": "client_credentials",
                 "client_id": SNOV_API_USER_ID,
                 "client_secret": SNOV_API_SECRET
             },
-            timeout=10
+            timeout=10,
+            retry_post=True
         )
         
         if token_response.status_code != 200:
@@ -68,61 +75,71 @@ def snov_find_email(domain):
         if not token:
             return None
         
-        response = requests.post(
+        response = http_post(
             "https://api.snov.io/v1/get-domain-emails-with-info",
             json={"domain": domain, "type": "all", "limit": 10},
             headers={"Authorization": f"Bearer {token}"},
-            timeout=10
+            timeout=10,
+            retry_post=True
         )
         
         if response.status_code == 200:
-            data = response.json()
-            if data.get('emails') and len(data['emails']) > 0:
-                emails = data['emails']
-                for email_data in emails:
-                    email = email_data.get('email')
-                    if email and any(p in email.lower() for p in ['info@', 'contact@', 'hello@', 'support@']):
-                        return email
-                return emails[0].get('email')
+            return _snov_email(response.json())
         return None
     except Exception:
         return None
 
 
+def _snov_email(data):
+    if data.get('emails') and len(data['emails']) > 0:
+        emails = data['emails']
+        for email_data in emails:
+            email = email_data.get('email')
+            if email and any(p in email.lower() for p in ['info@', 'contact@', 'hello@', 'support@']):
+                return email
+        return emails[0].get('email')
+    return None
+
+
 def apollo_find_email(domain):
     """Find email using Apollo.io"""
     if not domain or not APOLLO_API_KEY:
         return None
     
     try:
-        response = requests.post(
+        response = http_post(
             "https://api.apollo.io/v1/mixed_people/search",
             json={"organization_domains": [domain], "page": 1, "per_page": 1},
             headers={
                 "Content-Type": "application/json",
                 "X-Api-Key": APOLLO_API_KEY
             },
-            timeout=10
+            timeout=10,
+            retry_post=True
         )
         
         if response.status_code == 200:
-            data = response.json()
-            if data.get('people') and len(data['people']) > 0:
-                email = data['people'][0].get('email')
-                if email:
-                    return email
+            return _apollo_email(response.json())
         return None
     except Exception:
         return None
 
 
+def _apollo_email(data):
+    if data.get('people') and len(data['people']) > 0:
+        email = data['people'][0].get('email')
+        if email:
+            return email
+    return None
+
+
 def anymail_find_email(domain):
     """Find email using RocketReach"""
     if not domain or not ROCKETREACH_API_KEY:
         return None
     
     try:
-        response = requests.get(
+        response = http_get(
             "https://api.rocketreach.co/v2/api/search",
             params={"current_employer": domain, "page_size": 1},
             headers={"Api-Key": ROCKETREACH_API_KEY},
@@ -130,16 +147,20 @@ def anymail_find_email(domain):
         )
         
         if response.status_code == 200:
-            data = response.json()
-            if data.get('profiles') and len(data['profiles']) > 0:
-                emails = data['profiles'][0].get('emails')
-                if emails and len(emails) > 0:
-                    return emails[0].get('email')
+            return _rocketreach_email(response.json())
         return None
     except Exception:
         return None
 
 
+def _rocketreach_email(data):
+    if data.get('profiles') and len(data['profiles']) > 0:
+        emails = data['profiles'][0].get('emails')
+        if emails and len(emails) > 0:
+            return emails[0].get('email')
+    return None
+
+
 def find_email_with_fallback(domain, delay=0.5):
     """
     Try multiple email finders until one succeeds
@@ -160,3 +181,108 @@ def find_email_with_fallback(domain, delay=0.5):
         time.sleep(delay)
     
     return None, None
+
+
+# Async variants (used by the pipelines' async runners)
+
+async def async_hunter_find_email(domain):
+    """Async counterpart of hunter_find_email"""
+    if not domain or not HUNTER_API_KEY:
+        return None
+    try:
+        response = await async_get(
+            "https://api.hunter.io/v2/domain-search",
+            params={"domain": domain, "api_key": HUNTER_API_KEY},
+            timeout=10
+        )
+        return _hunter_email(response.json()) if response.status_code == 200 else None
+    except Exception:
+        return None
+
+
+async def async_snov_find_email(domain):
+    """Async counterpart of snov_find_email"""
+    if not domain or not SNOV_API_USER_ID or not SNOV_API_SECRET:
+        return None
+    try:
+        token_response = await async_post(
+            "https://api.snov.io/v1/oauth/access_token",
+            data={
+                "grant_type": "client_credentials",
+                "client_id": SNOV_API_USER_ID,
+                "client_secret": SNOV_API_SECRET
+            },
+            timeout=10,
+            retry_post=True
+        )
+        token = token_response.json().get('access_token') if token_response.status_code == 200 else None
+        if not token:
+            return None
+
+        response = await async_post(
+            "https://api.snov.io/v1/get-domain-emails-with-info",
+            json={"domain": domain, "type": "all", "limit": 10},
+            headers={"Authorization": f"Bearer {token}"},
+            timeout=10,
+            retry_post=True
+        )
+        return _snov_email(response.json()) if response.status_code == 200 else None
+    except Exception:
+        return None
+
+
+async def async_apollo_find_email(domain):
+    """Async counterpart of apollo_find_email"""
+    if not domain or not APOLLO_API_KEY:
+        return None
+    try:
+        response = await async_post(
+            "https://api.apollo.io/v1/mixed_people/search",
+            json={"organization_domains": [domain], "page": 1, "per_page": 1},
+            headers={
+                "Content-Type": "application/json",
+                "X-Api-Key": APOLLO_API_KEY
+            },
+            timeout=10,
+            retry_post=True
+        )
+        return _apollo_email(response.json()) if response.status_code == 200 else None
+    except Exception:
+        return None
+
+
+async def async_anymail_find_email(domain):
+    """Async counterpart of anymail_find_email (RocketReach)"""
+    if not domain or not ROCKETREACH_API_KEY:
+        return None
+    try:
+        response = await async_get(
+            "https://api.rocketreach.co/v2/api/search",
+            params={"current_employer": domain, "page_size": 1},
+            headers={"Api-Key": ROCKETREACH_API_KEY},
+            timeout=10
+        )
+        return _rocketreach_email(response.json()) if response.status_code == 200 else None
+    except Exception:
+        return None
+
+
+async def async_find_email_with_fallback(domain, delay=0.5):
+    """
+    Async counterpart of find_email_with_fallback
+    Returns: (email, provider_name) or (None, None)
+    """
+    finders = [
+        (async_hunter_find_email, "Hunter.io"),
+        (async_snov_find_email, "Snov.io"),
+        (async_apollo_find_email, "Apollo.io"),
+        (async_anymail_find_email, "Anymail"),
+    ]
+
+    for finder_func, provider_name in finders:
+        email = await finder_func(domain)
+        if email:
+            return email, provider_name
+        await asyncio.sleep(delay)
+
+    return None, None
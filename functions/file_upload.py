@@ -1,6 +1,6 @@
-import requests
 import os
 from dotenv import load_dotenv
+from toolkit.httpClient import http_post
 
 load_dotenv()
 
@@ -31,7 +31,7 @@ def upload_csv_to_google_drive(file_path, filename="test", delete_after_upload=F
             files = {
                 'data': (filename, file, 'text/csv')
             }
-            response = requests.post(WEBHOOK_URL, files=files)
+            response = http_post(WEBHOOK_URL, files=files, timeout=300)
         
         # Check response
         if response.status_code == 200:
@@ -25,6 +25,28 @@ Use case: Businesses seeking operational improvements, sustainability initiative
 Focus: Venues where food & beverage, operations, or guest experience improvements can create meaningful business impact"""
 
 
+# Review count each search intent's ICP treats as a sign of a large enough venue
+GMAPS_MIN_REVIEWS = {
+    "Search for stadium": 500,
+    "Search for Coffee Shops": 200,
+}
+
+DEFAULT_GMAPS_MIN_REVIEWS = 100
+
+
+def get_min_reviews_for_gmaps_search(search_intent: str) -> int:
+    """
+    Get the review count the ICP expects for a given Google Maps search intent.
+
+    Args:
+        search_intent: Search category from google_scraper_input_data.py (stored in 'icp' field)
+
+    Returns:
+        Minimum review count, or the default if the search intent is unknown
+    """
+    return GMAPS_MIN_REVIEWS.get(str(search_intent).strip(), DEFAULT_GMAPS_MIN_REVIEWS)
+
+
 def get_icp_for_gmaps_search(search_intent: str) -> str:
     """
     Get ICP text for a given Google Maps search intent.
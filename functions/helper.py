@@ -1,9 +1,20 @@
 import pandas as pd
 import os
 from toolkit.neverBounceHTTP import verify_emails
+from toolkit import instantlyStore
+from toolkit.fuzzyMatch import FUZZY_COMPANY_MATCH, CompanyNameMatcher
+from functions.stage_storage import read_stage, update_stage
 from datetime import datetime
 from pathlib import Path
 
+# Probe the on-disk Instantly suppression index instead of loading instantly_leads.csv
+INSTANTLY_SUPPRESSION_INDEX = os.getenv("INSTANTLY_SUPPRESSION_INDEX", "true").lower() == "true"
+
+
+def use_instantly_suppression_index():
+    """True when the suppression index is enabled and the Instantly lead store has been synced"""
+    return INSTANTLY_SUPPRESSION_INDEX and instantlyStore.count_leads() > 0
+
 
 ## Check the data from the apolo cleaned file and check with instantly and output a clean file of leads which are not contacted
 def recheck_duplicate_emails(input_cleaned_file_path, input_instantly_leads_file_path, output_rechecked_duplicates_file_path):
@@ -26,41 +37,54 @@ def recheck_duplicate_emails(input_cleaned_file_path, input_instantly_leads_file
     df_filtered.to_csv(output_rechecked_duplicates_file_path, index=False)
 
 ## Filter Apollo leads against Instantly leads and deduplicate Apollo data
+DEDUPE_KEY_COLUMNS = ['email', 'company_domain', 'company_name']
+
+
 def filter_apollo_with_instantly_and_dedupe(input_apollo_file_path, input_instantly_leads_file_path, output_apollo_final_file_path):
     """
     Filters out Apollo leads that exist in Instantly leads (by email, company_domain, or company_name)
     and deduplicates the remaining Apollo leads
     """
     print("Loading Apollo leads...")
-    df_apollo = pd.read_csv(input_apollo_file_path)
+    # Only the match keys are loaded; update_stage carries the other columns over
+    df_apollo = read_stage(input_apollo_file_path, columns=DEDUPE_KEY_COLUMNS)
     print(f"   Initial Apollo leads: {len(df_apollo)}")
     
-    print("Loading Instantly leads...")
-    df_instantly = pd.read_csv(input_instantly_leads_file_path)
-    print(f"   Instantly leads: {len(df_instantly)}")
-    
     # Normalize email columns for comparison
     df_apollo['email'] = df_apollo['email'].astype(str).str.strip().str.lower()
-    df_instantly['email'] = df_instantly['email'].astype(str).str.strip().str.lower()
     
     # Normalize company_domain for comparison (handle NaN values)
     df_apollo['company_domain'] = df_apollo['company_domain'].astype(str).str.strip().str.lower()
-    df_instantly['company_domain'] = df_instantly['company_domain'].astype(str).str.strip().str.lower()
     
     # Normalize company_name for comparison
     df_apollo['company_name'] = df_apollo['company_name'].astype(str).str.strip().str.lower()
-    df_instantly['company_name'] = df_instantly['company_name'].astype(str).str.strip().str.lower()
     
     # Replace 'nan' strings with empty string for cleaner filtering
     df_apollo['company_domain'] = df_apollo['company_domain'].replace('nan', '')
     df_apollo['company_name'] = df_apollo['company_name'].replace('nan', '')
-    df_instantly['company_domain'] = df_instantly['company_domain'].replace('nan', '')
-    df_instantly['company_name'] = df_instantly['company_name'].replace('nan', '')
     
-    # Create sets for faster lookup (exclude empty strings and 'nan')
-    instantly_emails = set(df_instantly[df_instantly['email'].notna() & (df_instantly['email'] != '') & (df_instantly['email'] != 'nan')]['email'].unique())
-    instantly_domains = set(df_instantly[df_instantly['company_domain'].notna() & (df_instantly['company_domain'] != '') & (df_instantly['company_domain'] != 'nan')]['company_domain'].unique())
-    instantly_company_names = set(df_instantly[df_instantly['company_name'].notna() & (df_instantly['company_name'] != '') & (df_instantly['company_name'] != 'nan')]['company_name'].unique())
+    if use_instantly_suppression_index():
+        # Only the Apollo values that are already in Instantly come back from the index
+        print("Probing Instantly suppression index...")
+        instantly_emails = instantlyStore.find_suppressed("email", df_apollo['email'].unique())
+        instantly_domains = instantlyStore.find_suppressed("domain", df_apollo['company_domain'].unique())
+        instantly_company_names = instantlyStore.find_suppressed("company", df_apollo['company_name'].unique())
+        print(f"   Matches: {len(instantly_emails)} emails, {len(instantly_domains)} domains, {len(instantly_company_names)} company names")
+    else:
+        print("Loading Instantly leads...")
+        df_instantly = pd.read_csv(input_instantly_leads_file_path)
+        print(f"   Instantly leads: {len(df_instantly)}")
+        
+        df_instantly['email'] = df_instantly['email'].astype(str).str.strip().str.lower()
+        df_instantly['company_domain'] = df_instantly['company_domain'].astype(str).str.strip().str.lower()
+        df_instantly['company_name'] = df_instantly['company_name'].astype(str).str.strip().str.lower()
+        df_instantly['company_domain'] = df_instantly['company_domain'].replace('nan', '')
+        df_instantly['company_name'] = df_instantly['company_name'].replace('nan', '')
+        
+        # Create sets for faster lookup (exclude empty strings and 'nan')
+        instantly_emails = set(df_instantly[df_instantly['email'].notna() & (df_instantly['email'] != '') & (df_instantly['email'] != 'nan')]['email'].unique())
+        instantly_domains = set(df_instantly[df_instantly['company_domain'].notna() & (df_instantly['company_domain'] != '') & (df_instantly['company_domain'] != 'nan')]['company_domain'].unique())
+        instantly_company_names = set(df_instantly[df_instantly['company_name'].notna() & (df_instantly['company_name'] != '') & (df_instantly['company_name'] != 'nan')]['company_name'].unique())
     
     # Filter out Apollo leads that match Instantly leads
     print("Filtering out leads already in Instantly...")
@@ -74,6 +98,21 @@ def filter_apollo_with_instantly_and_dedupe(input_apollo_file_path, input_instan
     # Filter by company_name (only if name is not empty)
     mask = mask & ~(df_apollo['company_name'].isin(instantly_company_names) & (df_apollo['company_name'] != ''))
     
+    # Filter by fuzzy company_name ("Acme Parks, Inc." vs "ACME Parks") among the leads still kept
+    if FUZZY_COMPANY_MATCH:
+        # Index this run's Apollo names and stream Instantly's names through it
+        matcher = CompanyNameMatcher()
+        matcher.add_many(df_apollo.loc[mask & (df_apollo['company_name'] != ''), 'company_name'].unique())
+        fuzzy_matches = set()
+        if use_instantly_suppression_index():
+            for names in instantlyStore.iter_suppressed_keys("company"):
+                fuzzy_matches |= matcher.find_matches(names)
+        else:
+            fuzzy_matches = matcher.find_matches(instantly_company_names)
+        fuzzy_mask = df_apollo['company_name'].isin(list(fuzzy_matches)) & mask
+        print(f"   Fuzzy company-name matches: {len(fuzzy_matches)} names, {int(fuzzy_mask.sum())} leads")
+        mask = mask & ~fuzzy_mask
+    
     # Also filter out rows where email is 'nan' or empty
     mask = mask & (df_apollo['email'] != 'nan') & (df_apollo['email'] != '')
     
@@ -89,7 +128,7 @@ def filter_apollo_with_instantly_and_dedupe(input_apollo_file_path, input_instan
     print(f"   Final Apollo leads: {len(df_filtered)}")
     
     # Save to output file
-    df_filtered.to_csv(output_apollo_final_file_path, index=False)
+    update_stage(input_apollo_file_path, df_filtered, output_apollo_final_file_path)
     print(f"Saved filtered and deduplicated leads to {output_apollo_final_file_path}")
 
 ## Filter HubSpot leads against Instantly leads and deduplicate HubSpot data
@@ -106,29 +145,34 @@ def filter_hubspot_with_instantly_and_dedupe(input_hubspot_file_path, input_inst
     df_hubspot = pd.read_csv(input_hubspot_file_path)
     print(f"   Initial HubSpot leads: {len(df_hubspot)}")
     
-    # Check if Instantly leads file exists
-    if not os.path.exists(input_instantly_leads_file_path):
+    # Normalize email columns for comparison
+    df_hubspot['email'] = df_hubspot['email'].astype(str).str.strip().str.lower()
+    
+    instantly_emails = None
+    if use_instantly_suppression_index():
+        print("Probing Instantly suppression index...")
+        instantly_emails = instantlyStore.find_suppressed("email", df_hubspot['email'].unique())
+        print(f"   Matches: {len(instantly_emails)} emails")
+    elif not os.path.exists(input_instantly_leads_file_path):
+        # Check if Instantly leads file exists
         print(f"⚠️  Warning: Instantly leads file not found at {input_instantly_leads_file_path}")
         print("   Skipping Instantly filtering. Will only deduplicate HubSpot leads.")
-        df_instantly = pd.DataFrame(columns=['email'])
     else:
         print("Loading Instantly leads...")
         df_instantly = pd.read_csv(input_instantly_leads_file_path)
         print(f"   Instantly leads: {len(df_instantly)}")
-    
-    # Normalize email columns for comparison
-    df_hubspot['email'] = df_hubspot['email'].astype(str).str.strip().str.lower()
-    
-    if len(df_instantly) > 0 and 'email' in df_instantly.columns:
-        df_instantly['email'] = df_instantly['email'].astype(str).str.strip().str.lower()
-        
-        # Create set for faster lookup (exclude empty strings and 'nan')
-        instantly_emails = set(df_instantly[
-            df_instantly['email'].notna() & 
-            (df_instantly['email'] != '') & 
-            (df_instantly['email'] != 'nan')
-        ]['email'].unique())
         
+        if len(df_instantly) > 0 and 'email' in df_instantly.columns:
+            df_instantly['email'] = df_instantly['email'].astype(str).str.strip().str.lower()
+            
+            # Create set for faster lookup (exclude empty strings and 'nan')
+            instantly_emails = set(df_instantly[
+                df_instantly['email'].notna() & 
+                (df_instantly['email'] != '') & 
+                (df_instantly['email'] != 'nan')
+            ]['email'].unique())
+    
+    if instantly_emails is not None:
         # Filter out HubSpot leads that match Instantly leads
         print("Filtering out leads already in Instantly...")
         initial_count = len(df_hubspot)
@@ -183,61 +227,96 @@ def remove_unverified_emails(input_cleaned_file_path, output_verified_file_path,
     df = df[df["email"].isin(verified_emails["email"])]
     df.to_csv(output_verified_subsetted_file_path, index=False)
     
+def clean_company_urls(urls):
+    """Vectorized URL key: lower-cased, without scheme, 'www.' or a trailing slash ('' for missing)"""
+    cleaned = urls.astype(str).str.strip().str.lower()
+    cleaned = cleaned.str.replace("https://", "", regex=False).str.replace("http://", "", regex=False)
+    cleaned = cleaned.str.replace("www.", "", regex=False).str.replace(r"/$", "", regex=True)
+    return cleaned.where(~cleaned.isin(["nan", "none"]), "")
+
+
+def _normalized_names(names):
+    cleaned = names.astype(str).str.strip().str.lower()
+    return cleaned.where(~cleaned.isin(["nan", "none"]), "")
+
+
+def _first_column(df, candidates):
+    """First of the candidate columns present in df (Apollo exports use organization_* or company_* names)"""
+    for column in candidates:
+        if column in df.columns:
+            return df[column]
+    return pd.Series("", index=df.index)
+
+
+PREVIOUS_CUSTOMER_KEY_COLUMNS = [
+    "organization_website_url", "company_website", "company_domain",
+    "organization_name", "company_name", "email",
+]
+
+
 # Check if the lead is  previosuly contacted     
 def check_against_previous_customers(input_retrieved_leads_file_path, input_previous_customers_file_path, output_instantly_leads_file_path, output_rechecked_previous_customers_file_path):
-    df_retrieved_leads = pd.read_csv(input_retrieved_leads_file_path)
+    """
+    Drop leads whose company is a previous customer (by website or name) or whose
+    email is already in Instantly
+
+    Every key is normalized once and matched with a hash anti-join (isin against
+    a pandas Index), so the cost is linear in leads + history.
+
+    Returns:
+        Dict with the leads dropped by each rule (a lead counts toward the first
+        rule that matched it), plus `input`, `dropped` and `kept` totals
+    """
+    df_retrieved_leads = read_stage(input_retrieved_leads_file_path, columns=PREVIOUS_CUSTOMER_KEY_COLUMNS)
     df_previous_customers = pd.read_csv(input_previous_customers_file_path)
-    
     print("df_retrieved_leads", df_retrieved_leads.shape)
     print("df_previous_customers", df_previous_customers.shape)
-    print("df_retrieved_leads", df_retrieved_leads[["organization_website_url", "organization_name"]].head())
-    print("df_previous_customers", df_previous_customers.head())
 
-    drop_indices = []
-    df_instantly_leads = pd.read_csv(output_instantly_leads_file_path)
+    if "cleaned_company_url" in df_previous_customers.columns:
+        customer_urls = df_previous_customers["cleaned_company_url"].astype(str).str.strip().str.lower()
+    else:
+        customer_urls = clean_company_urls(df_previous_customers.get("Website URL", pd.Series(dtype=str)))
+    customer_urls = pd.Index(customer_urls[customer_urls != ""].unique())
+    customer_names = _normalized_names(df_previous_customers.get("Company Name", pd.Series(dtype=str)))
+    customer_names = pd.Index(customer_names[customer_names != ""].unique())
 
-    for index, row in df_retrieved_leads.iterrows():
-        # clean the retrieved lead's company url
-        company_url = str(row["organization_website_url"])
-        company_url = company_url.lower()
-        company_url = company_url.replace("https://", "")
-        company_url = company_url.replace("http://", "")
-        company_url = company_url.replace("www.", "")
-        if(company_url[-1] == "/"):
-            company_url = company_url[:-1]
-        
-        # check if the retrieved lead's company url is in the previous customers
-        if(company_url in df_previous_customers["cleaned_company_url"].values):
-            print("company_url", company_url)
-            print("df_previous_customers", df_previous_customers[df_previous_customers["cleaned_company_url"] == company_url])
-            drop_indices.append(index)
-        # check if the retrieved lead's company name is in the previous customers
-        if(row["organization_name"] in df_previous_customers["Company Name"].values):
-            drop_indices.append(index)
+    lead_urls = clean_company_urls(_first_column(df_retrieved_leads, ["organization_website_url", "company_website", "company_domain"]))
+    lead_names = _normalized_names(_first_column(df_retrieved_leads, ["organization_name", "company_name"]))
+    lead_emails = _normalized_names(_first_column(df_retrieved_leads, ["email"]))
 
-        # check if the email is in instantly prior emails
-        if(row["email"] in df_instantly_leads["email"].values):
-            drop_indices.append(index)
+    if use_instantly_suppression_index():
+        instantly_emails = pd.Index(list(instantlyStore.find_suppressed("email", lead_emails.unique())))
+    elif os.path.exists(output_instantly_leads_file_path):
+        instantly_emails = _normalized_names(pd.read_csv(output_instantly_leads_file_path, usecols=["email"])["email"])
+        instantly_emails = pd.Index(instantly_emails[instantly_emails != ""].unique())
+    else:
+        instantly_emails = pd.Index([])
+
+    rules = {
+        "previous_customer_url": (lead_urls != "") & lead_urls.isin(customer_urls),
+        "previous_customer_name": (lead_names != "") & lead_names.isin(customer_names),
+        "instantly_email": (lead_emails != "") & lead_emails.isin(instantly_emails),
+    }
+
+    dropped = pd.Series(False, index=df_retrieved_leads.index)
+    report = {"input": len(df_retrieved_leads)}
+    for rule, matched in rules.items():
+        report[rule] = int((matched & ~dropped).sum())
+        dropped |= matched
+    report["dropped"] = int(dropped.sum())
+    report["kept"] = report["input"] - report["dropped"]
 
-    df_retrieved_leads = df_retrieved_leads.drop(drop_indices)
-    df_retrieved_leads.to_csv(output_rechecked_previous_customers_file_path, index=False)
+    # Keep the surviving rows; no column changes, so the other columns are copied as-is
+    update_stage(input_retrieved_leads_file_path, df_retrieved_leads.loc[~dropped, []], output_rechecked_previous_customers_file_path)
+    print(f"   Previous customers check dropped {report['dropped']}/{report['input']} leads "
+          f"(url {report['previous_customer_url']}, name {report['previous_customer_name']}, "
+          f"instantly email {report['instantly_email']})")
+    return report
 
 # Clean data of the previous companies
 def clean_previous_customers(input_previous_customers_file_path):
-        
     df_previous_customers = pd.read_csv(input_previous_customers_file_path)
-    cleaned_company_urls = []
-    for index, row in df_previous_customers.iterrows():
-        company_url = row["Website URL"]
-        company_url = company_url.lower()
-        company_url = company_url.replace("https://", "")
-        company_url = company_url.replace("http://", "")
-        company_url = company_url.replace("www.", "")
-        if(company_url[-1] == "/"):
-            company_url = company_url[:-1]
-        cleaned_company_urls.append(company_url)
-
-    df_previous_customers["cleaned_company_url"] = cleaned_company_urls
+    df_previous_customers["cleaned_company_url"] = clean_company_urls(df_previous_customers["Website URL"])
     df_previous_customers.to_csv(input_previous_customers_file_path, index=False)    
     
 
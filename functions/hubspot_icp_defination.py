@@ -23,6 +23,29 @@ Exclusions:
 - Spam or invalid email addresses"""
 
 
+# Personal email providers the ICP excludes
+PERSONAL_EMAIL_DOMAINS = {
+    "gmail.com",
+    "googlemail.com",
+    "yahoo.com",
+    "yahoo.co.uk",
+    "ymail.com",
+    "hotmail.com",
+    "hotmail.co.uk",
+    "outlook.com",
+    "live.com",
+    "msn.com",
+    "aol.com",
+    "icloud.com",
+    "me.com",
+    "mac.com",
+    "protonmail.com",
+    "proton.me",
+    "gmx.com",
+    "mail.com",
+}
+
+
 def get_hubspot_icp() -> str:
     """
     Get ICP text for HubSpot leads evaluation.
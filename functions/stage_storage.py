@@ -0,0 +1,245 @@
+"""
+Stage storage for intermediate pipeline files
+
+Stage files are written as Parquet or Arrow IPC with an explicit schema and read
+back memory-mapped. The format follows the file extension, so .csv paths keep
+working everywhere; CSV is only produced for the upload at the end of a pipeline.
+
+Steps that only look at a few fields load just those with read_stage(columns=...)
+and write their result back with update_stage(), which selects rows and replaces
+columns at the Arrow level, so untouched columns never become pandas objects.
+Cleaning rewrites most columns and still loads the whole file.
+"""
+
+import os
+import threading
+from pathlib import Path
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Format of intermediate stage files: parquet, arrow or csv
+STAGE_FORMAT = os.getenv("STAGE_FORMAT", "parquet").lower()
+
+STAGE_EXTENSIONS = {"parquet": ".parquet", "arrow": ".arrow", "csv": ".csv"}
+
+# Non-string columns of the lead files, typed the way read_csv infers them so values
+# (and the prompts built from them) read back unchanged; every other column is a string.
+# Integer columns are nullable: a column holding fractions is stored as float64 instead.
+STAGE_COLUMN_TYPES = {
+    "company_size": pa.int64(),
+    "company_linkedin_uid": pa.int64(),
+    "company_founded_year": pa.float64(),
+    "company_annual_revenue": pa.float64(),
+    "company_total_funding": pa.float64(),
+    "icp_score": pa.float64(),
+    "rating": pa.float64(),
+    "reviewsCount": pa.int64(),
+}
+
+
+def _format_of(path):
+    suffix = Path(path).suffix.lower()
+    if suffix == ".parquet":
+        return "parquet"
+    if suffix in (".arrow", ".feather", ".ipc"):
+        return "arrow"
+    return "csv"
+
+
+def stage_path(path):
+    """Swap a stage file's extension for the configured STAGE_FORMAT (e.g. apollo_final.csv -> apollo_final.parquet)"""
+    path = Path(path)
+    return path.with_suffix(STAGE_EXTENSIONS.get(STAGE_FORMAT, ".csv"))
+
+
+def schema_for(df, column_types=None):
+    """Explicit Arrow schema for df: known numeric columns from STAGE_COLUMN_TYPES, everything else as string"""
+    column_types = {**STAGE_COLUMN_TYPES, **(column_types or {})}
+    return pa.schema([(str(column), column_types.get(column, pa.string())) for column in df.columns])
+
+
+def _coerce(df, schema):
+    """
+    Cast df's columns to the schema's types (unparseable numbers become null)
+
+    Returns:
+        (df, schema) with integer fields demoted to float64 where values have fractions
+    """
+    df = df.copy()
+    fields = []
+    for field in schema:
+        column = df[field.name]
+        if pa.types.is_string(field.type):
+            df[field.name] = column.astype(object).where(column.notna(), None).map(
+                lambda value: value if value is None else str(value)
+            )
+        elif pa.types.is_integer(field.type):
+            numbers = pd.to_numeric(column, errors="coerce")
+            if (numbers.dropna() % 1 == 0).all():
+                df[field.name] = numbers.astype("Int64")
+            else:
+                df[field.name] = numbers
+                field = pa.field(field.name, pa.float64())
+        elif pa.types.is_floating(field.type):
+            df[field.name] = pd.to_numeric(column, errors="coerce")
+        fields.append(field)
+    return df, pa.schema(fields)
+
+
+def write_stage(df, path, column_types=None):
+    """
+    Write a stage file in the format of its extension, replacing it atomically
+
+    Args:
+        df: Rows to write
+        path: Destination (.parquet, .arrow/.feather or .csv)
+        column_types: Optional {column: pyarrow type} overrides for the schema
+    """
+    path = str(path)
+    output_dir = os.path.dirname(path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    fmt = _format_of(path)
+
+    try:
+        if fmt == "csv":
+            df.to_csv(tmp_path, index=False)
+        else:
+            df, schema = _coerce(df, schema_for(df, column_types))
+            _write_table(pa.Table.from_pandas(df, schema=schema, preserve_index=False), tmp_path, fmt)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _write_table(table, path, fmt):
+    if fmt == "parquet":
+        pq.write_table(table, path)
+    else:
+        with pa.OSFile(path, "wb") as sink, ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def stage_columns(path):
+    """Column names of a stage file, read from its schema / header only"""
+    path = str(path)
+    fmt = _format_of(path)
+    if fmt == "parquet":
+        return pq.read_schema(path).names
+    if fmt == "arrow":
+        with pa.memory_map(path, "r") as source:
+            return ipc.open_file(source).schema.names
+    return pd.read_csv(path, nrows=0).columns.tolist()
+
+
+def read_stage(path, columns=None):
+    """
+    Load a stage file as a DataFrame
+
+    Parquet and Arrow files are memory-mapped and only the requested columns are
+    materialised; columns missing from the file are ignored.
+
+    Args:
+        path: Stage file (.parquet, .arrow/.feather or .csv)
+        columns: Optional list of columns to load
+    """
+    path = str(path)
+    fmt = _format_of(path)
+    if columns is not None:
+        available = set(stage_columns(path))
+        columns = [column for column in columns if column in available]
+
+    if fmt == "csv":
+        return pd.read_csv(path, usecols=columns)
+
+    table = _read_table(path, fmt, columns)
+    # Ignore the stored pandas metadata so strings come back as plain object columns,
+    # and keep integer columns integer even when they contain nulls
+    df = table.to_pandas(ignore_metadata=True, types_mapper=_pandas_type)
+
+    # Missing strings come back as None; use NaN like read_csv so existing checks keep working
+    for column in df.select_dtypes(include="object").columns:
+        df[column] = df[column].where(df[column].notna(), float("nan"))
+    return df
+
+
+def _read_table(path, fmt, columns=None):
+    if fmt == "parquet":
+        return pq.read_table(path, columns=columns, memory_map=True)
+    with pa.memory_map(path, "r") as source:
+        table = ipc.open_file(source).read_all()
+    return table.select(columns) if columns is not None else table
+
+
+def update_stage(path, df, output_path=None, column_types=None):
+    """
+    Write back the result of a step that loaded only some columns of a stage file
+
+    The output holds the file's rows picked (and ordered) by df.index, with df's
+    columns replacing or added to the file's own; every other column is carried
+    over as-is.
+
+    Args:
+        path: Stage file df was read from with read_stage(path, columns=...);
+            df.index must still be the row positions read_stage returned
+        df: Kept rows, with the columns the step changed or added (may have none)
+        output_path: Destination (default: overwrite path)
+        column_types: Optional {column: pyarrow type} overrides for the new columns
+    """
+    path = str(path)
+    output_path = str(output_path or path)
+    fmt = _format_of(path)
+    out_fmt = _format_of(output_path)
+    if fmt == "csv" or out_fmt == "csv":
+        full = read_stage(path).loc[df.index]
+        for column in df.columns:
+            full[column] = df[column]
+        write_stage(full, output_path, column_types)
+        return
+
+    table = _read_table(path, fmt).take(pa.array(df.index.to_numpy(dtype="int64")))
+    if len(df.columns):
+        values, schema = _coerce(df.reset_index(drop=True), schema_for(df, column_types))
+        updates = pa.Table.from_pandas(values, schema=schema, preserve_index=False)
+        for field, column in zip(updates.schema, updates.columns):
+            if field.name in table.column_names:
+                table = table.set_column(table.column_names.index(field.name), field, column)
+            else:
+                table = table.append_column(field, column)
+
+    output_dir = os.path.dirname(output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    tmp_path = f"{output_path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    try:
+        _write_table(table, tmp_path, out_fmt)
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _pandas_type(arrow_type):
+    if pa.types.is_integer(arrow_type):
+        return pd.Int64Dtype()
+    return None
+
+
+def export_stage_csv(path, csv_path=None):
+    """
+    Write a stage file out as CSV for upload
+
+    Returns:
+        The CSV path (the stage file itself when it already is a CSV)
+    """
+    csv_path = str(csv_path or Path(path).with_suffix(".csv"))
+    if os.path.abspath(csv_path) != os.path.abspath(str(path)):
+        read_stage(path).to_csv(csv_path, index=False)
+    return csv_path
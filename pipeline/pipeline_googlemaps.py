@@ -1,10 +1,20 @@
+import asyncio
 from datetime import date, datetime
 from pathlib import Path
 from typing import Dict, List
-
-from toolkit.googleMapsFuncs import scrape_google_maps_by_query
-from toolkit.perplexityFuncs import evaluate_gmaps_with_perplexity
-from toolkit.emailFinder import find_emails_for_leads
+import os
+
+from toolkit.googleMapsFuncs import scrape_google_maps_by_query, scrape_google_maps_batch
+from toolkit.asyncHttp import close_async_client
+from toolkit.httpClient import get_http_stats, http_stats_since
+from toolkit.perplexityFuncs import (
+    evaluate_gmaps_with_perplexity,
+    async_evaluate_gmaps_with_perplexity,
+    get_scoring_tier_stats,
+    scoring_tier_stats_since,
+)
+from toolkit.emailFinder import find_emails_for_leads, async_find_emails_for_leads
+from toolkit.llmCache import get_llm_cache_stats, llm_cache_stats_since
 
 from functions.file_upload import upload_csv_to_google_drive
 from functions.google_scraper_input_data import google_maps_scraping_icp
@@ -23,22 +33,75 @@ FILES = {
 }
 
 GOOGLE_MAPS_MAX_RESULTS = 2
+# Send every query/location search in one (optionally sharded) actor run
+GOOGLE_MAPS_BATCHED = os.getenv("GOOGLE_MAPS_BATCHED", "true").lower() == "true"
+
 def log(step: str, message: str):
     print(f"[{datetime.now().isoformat()}] {step} → {message}")
 
 
+def scrape_google_maps_step(result: Dict):
+    """
+    Step 0: scrape every query/location of google_maps_scraping_icp into the
+    results CSV, as one batched actor run or one run per search depending on
+    GOOGLE_MAPS_BATCHED. Per-search statuses and cache hits go into `result`.
+    """
+    if GOOGLE_MAPS_BATCHED:
+        searches = [
+            (query, location)
+            for query_obj in google_maps_scraping_icp
+            for query, settings in query_obj.items()
+            for location in settings["locations"]
+        ]
+        log("SCRAPE", f"Batching {len(searches)} query/location searches")
+        result["queries"].update(
+            scrape_google_maps_batch(
+                searches,
+                max_results=GOOGLE_MAPS_MAX_RESULTS,
+                output_file_path=str(FILES["google_maps"]),
+                cache_report=result["scrape_cache"],
+            )
+        )
+    else:
+        for query_obj in google_maps_scraping_icp:
+            query = list(query_obj.keys())[0]
+            locations = query_obj[query]["locations"]
+
+            result["queries"][query] = {}
+
+            for location in locations:
+                try:
+                    log("SCRAPE", f"{query} | {location}")
+                    scrape_google_maps_by_query(
+                        query=f"{query} {location}",
+                        max_results=GOOGLE_MAPS_MAX_RESULTS,
+                        output_file_path=str(FILES["google_maps"]),
+                        icp=query,
+                        location=location,
+                        cache_report=result["scrape_cache"],
+                    )
+                    result["queries"][query][location] = "completed"
+                except Exception as e:
+                    result["queries"][query][location] = f"failed: {str(e)}"
+                    log("SCRAPE ERROR", f"{query} | {location} → {e}")
+
+
 def run_googlemaps_pipeline(skip_steps: List[int] = None) -> Dict:
     """
     Run the complete Google Maps pipeline.
     Returns structured result for Flask / monitoring.
     """
     skip_steps = skip_steps or []
+    llm_cache_snapshot = get_llm_cache_stats()
+    tier_snapshot = get_scoring_tier_stats()
+    http_snapshot = get_http_stats()
 
     result = {
         "pipeline": "googlemaps",
         "started_at": datetime.now().isoformat(),
         "steps": {},
         "queries": {},
+        "scrape_cache": {},
         "status": "running",
     }
 
@@ -47,26 +110,7 @@ def run_googlemaps_pipeline(skip_steps: List[int] = None) -> Dict:
         if 0 not in skip_steps:
             log("STEP 0", "Starting Google Maps scraping")
 
-            for query_obj in google_maps_scraping_icp:
-                query = list(query_obj.keys())[0]
-                locations = query_obj[query]["locations"]
-
-                result["queries"][query] = {}
-
-                for location in locations:
-                    try:
-                        log("SCRAPE", f"{query} | {location}")
-                        scrape_google_maps_by_query(
-                            query=f"{query} {location}",
-                            max_results=GOOGLE_MAPS_MAX_RESULTS,
-                            output_file_path=str(FILES["google_maps"]),
-                            icp=query,
-                            location=location,
-                        )
-                        result["queries"][query][location] = "completed"
-                    except Exception as e:
-                        result["queries"][query][location] = f"failed: {str(e)}"
-                        log("SCRAPE ERROR", f"{query} | {location} → {e}")
+            scrape_google_maps_step(result)
 
             result["steps"]["scraping"] = "completed"
 
@@ -100,6 +144,77 @@ def run_googlemaps_pipeline(skip_steps: List[int] = None) -> Dict:
         log("PIPELINE ERROR", str(e))
 
     finally:
+        result["llm_cache"] = llm_cache_stats_since(llm_cache_snapshot)
+        result["scoring_tiers"] = scoring_tier_stats_since(tier_snapshot)
+        result["http"] = http_stats_since(http_snapshot)
+        result["completed_at"] = datetime.now().isoformat()
+
+    return result
+
+async def run_googlemaps_pipeline_async(skip_steps: List[int] = None) -> Dict:
+    """
+    Run the Google Maps pipeline on one event loop.
+    Same steps and result dict as run_googlemaps_pipeline; scoring and email
+    finding keep many requests in flight on the shared async client. The
+    scraping step is not async: it runs the sync Apify scraper (step 0 of
+    run_googlemaps_pipeline) in a worker thread so the loop stays free.
+    """
+    skip_steps = skip_steps or []
+    llm_cache_snapshot = get_llm_cache_stats()
+    tier_snapshot = get_scoring_tier_stats()
+    http_snapshot = get_http_stats()
+
+    result = {
+        "pipeline": "googlemaps",
+        "started_at": datetime.now().isoformat(),
+        "steps": {},
+        "queries": {},
+        "scrape_cache": {},
+        "status": "running",
+    }
+
+    try:
+        # STEP 0: Google Maps scraping
+        if 0 not in skip_steps:
+            log("STEP 0", "Starting Google Maps scraping")
+            await asyncio.to_thread(scrape_google_maps_step, result)
+            result["steps"]["scraping"] = "completed"
+
+        # STEP 1: AI qualification (Perplexity)
+        if 1 not in skip_steps:
+            log("STEP 1", "Evaluating leads with Perplexity")
+            await async_evaluate_gmaps_with_perplexity(str(FILES["google_maps"]))
+            result["steps"]["perplexity"] = "completed"
+
+        # STEP 2: Email finding
+        if 2 not in skip_steps:
+            log("STEP 2", "Finding emails for leads")
+            await async_find_emails_for_leads(file_path=str(FILES["google_maps"]))
+            result["steps"]["email_finder"] = "completed"
+
+        # STEP 3: Upload
+        if 3 not in skip_steps:
+            log("STEP 3", "Uploading results to Google Drive")
+            await asyncio.to_thread(
+                upload_csv_to_google_drive,
+                file_path=str(FILES["google_maps"]),
+                filename=f"google_maps_scraped_final-{date.today().isoformat()}",
+                delete_after_upload=True,
+            )
+            result["steps"]["upload"] = "completed"
+
+        result["status"] = "completed"
+
+    except Exception as e:
+        result["status"] = "failed"
+        result["error"] = str(e)
+        log("PIPELINE ERROR", str(e))
+
+    finally:
+        await close_async_client()
+        result["llm_cache"] = llm_cache_stats_since(llm_cache_snapshot)
+        result["scoring_tiers"] = scoring_tier_stats_since(tier_snapshot)
+        result["http"] = http_stats_since(http_snapshot)
         result["completed_at"] = datetime.now().isoformat()
 
     return result
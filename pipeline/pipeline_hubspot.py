@@ -1,13 +1,21 @@
+import asyncio
 from datetime import date, datetime
 from pathlib import Path
 from typing import Dict
-import os
 
-from toolkit.hubspotFuncs import get_contacts
-from toolkit.perplexityFuncs import evaluate_hubspot_with_perplexity
-from toolkit.instantlyFuncs import export_paginated_instantly_leads
+from toolkit.hubspotFuncs import get_contacts, async_get_contacts
+from toolkit.asyncHttp import close_async_client
+from toolkit.httpClient import get_http_stats, http_stats_since
+from toolkit.perplexityFuncs import (
+    evaluate_hubspot_with_perplexity,
+    async_evaluate_hubspot_with_perplexity,
+    get_scoring_tier_stats,
+    scoring_tier_stats_since,
+)
+from toolkit.instantlyFuncs import ensure_instantly_leads_exported, async_ensure_instantly_leads_exported
+from toolkit.llmCache import get_llm_cache_stats, llm_cache_stats_since
 from functions.file_upload import upload_csv_to_google_drive
-from functions.helper import filter_hubspot_with_instantly_and_dedupe,should_export_instantly_leads
+from functions.helper import filter_hubspot_with_instantly_and_dedupe
 
 
 BASE_DIR = Path(".")
@@ -32,6 +40,9 @@ def run_hubspot_pipeline(skip_steps=None) -> Dict:
     Returns a summary dict for API / logging usage.
     """
     skip_steps = skip_steps or []
+    llm_cache_snapshot = get_llm_cache_stats()
+    tier_snapshot = get_scoring_tier_stats()
+    http_snapshot = get_http_stats()
 
     result = {
         "pipeline": "hubspot",
@@ -43,13 +54,10 @@ def run_hubspot_pipeline(skip_steps=None) -> Dict:
     try:
         # Step 0: Export Instantly leads (if needed)
         if 0 not in skip_steps:
-            if should_export_instantly_leads(FILES["instantly"]):
-                log("STEP 0", "Exporting Instantly leads for deduplication")
-                export_paginated_instantly_leads(-1)
-                result["steps"]["export_instantly"] = "completed"
-            else:
-                log("STEP 0", "Skipping Instantly leads export (already run today)")
-                result["steps"]["export_instantly"] = "skipped"
+            log("STEP 0", "Exporting Instantly leads for deduplication (shared with concurrent pipelines)")
+            result["steps"]["export_instantly"] = ensure_instantly_leads_exported(FILES["instantly"])
+            if result["steps"]["export_instantly"] == "skipped":
+                log("STEP 0", "Instantly leads already exported today, reusing the file")
 
         # Step 1: Fetch contacts from HubSpot
         if 1 not in skip_steps:
@@ -91,6 +99,88 @@ def run_hubspot_pipeline(skip_steps=None) -> Dict:
         log("ERROR", str(e))
 
     finally:
+        result["llm_cache"] = llm_cache_stats_since(llm_cache_snapshot)
+        result["scoring_tiers"] = scoring_tier_stats_since(tier_snapshot)
+        result["http"] = http_stats_since(http_snapshot)
+        result["completed_at"] = datetime.now().isoformat()
+
+    return result
+
+
+async def run_hubspot_pipeline_async(skip_steps=None) -> Dict:
+    """
+    Run the HubSpot pipeline on one event loop.
+    Same steps and result dict as run_hubspot_pipeline, but the Instantly export
+    (step 0) and the HubSpot contact fetch (step 1) run at the same time.
+    """
+    skip_steps = skip_steps or []
+    llm_cache_snapshot = get_llm_cache_stats()
+    tier_snapshot = get_scoring_tier_stats()
+    http_snapshot = get_http_stats()
+
+    result = {
+        "pipeline": "hubspot",
+        "started_at": datetime.now().isoformat(),
+        "steps": {},
+        "status": "running"
+    }
+
+    async def export_instantly():
+        log("STEP 0", "Exporting Instantly leads for deduplication (shared with concurrent pipelines)")
+        result["steps"]["export_instantly"] = await async_ensure_instantly_leads_exported(FILES["instantly"])
+        if result["steps"]["export_instantly"] == "skipped":
+            log("STEP 0", "Instantly leads already exported today, reusing the file")
+
+    async def fetch_contacts():
+        log("STEP 1", "Fetching contacts from HubSpot")
+        await async_get_contacts(str(FILES["hubspot_raw"]))
+        result["steps"]["fetch_contacts"] = "completed"
+
+    try:
+        first_steps = []
+        if 0 not in skip_steps:
+            first_steps.append(export_instantly())
+        if 1 not in skip_steps:
+            first_steps.append(fetch_contacts())
+        await asyncio.gather(*first_steps)
+
+        if 2 not in skip_steps:
+            log("STEP 2", "Filtering & deduplicating leads")
+            await asyncio.to_thread(
+                filter_hubspot_with_instantly_and_dedupe,
+                input_hubspot_file_path=str(FILES["hubspot_raw"]),
+                input_instantly_leads_file_path=str(FILES["instantly"]),
+                output_hubspot_final_file_path=str(FILES["hubspot_deduped"]),
+            )
+            result["steps"]["dedupe"] = "completed"
+
+        if 3 not in skip_steps:
+            log("STEP 3", "Evaluating leads with Perplexity")
+            await async_evaluate_hubspot_with_perplexity(str(FILES["hubspot_deduped"]))
+            result["steps"]["perplexity"] = "completed"
+
+        if 4 not in skip_steps:
+            log("STEP 4", "Uploading to Google Drive")
+            await asyncio.to_thread(
+                upload_csv_to_google_drive,
+                file_path=str(FILES["hubspot_deduped"]),
+                filename=f"Hubspot leads - {date.today().isoformat()}",
+                delete_after_upload=True
+            )
+            result["steps"]["upload"] = "completed"
+
+        result["status"] = "completed"
+
+    except Exception as e:
+        result["status"] = "failed"
+        result["error"] = str(e)
+        log("ERROR", str(e))
+
+    finally:
+        await close_async_client()
+        result["llm_cache"] = llm_cache_stats_since(llm_cache_snapshot)
+        result["scoring_tiers"] = scoring_tier_stats_since(tier_snapshot)
+        result["http"] = http_stats_since(http_snapshot)
         result["completed_at"] = datetime.now().isoformat()
 
     return result
@@ -1,20 +1,29 @@
+import asyncio
 from datetime import date, datetime
 from pathlib import Path
 from typing import Dict, List
+import os
 
 from toolkit.cleaning import clean_data
-from toolkit.instantlyFuncs import export_paginated_instantly_leads
-from toolkit.apolloFuncs import apify_apollo_scraper
-from toolkit.perplexityFuncs import evaluate_leads_with_perplexity
-from toolkit.neverBounceHTTP import verify_apollo_final_emails
+from toolkit.instantlyFuncs import ensure_instantly_leads_exported, async_ensure_instantly_leads_exported
+from toolkit.apolloFuncs import apify_apollo_scraper, apify_apollo_scrape_all, async_apify_apollo_scrape_all
+from toolkit.asyncHttp import close_async_client
+from toolkit.httpClient import get_http_stats, http_stats_since
+from toolkit.perplexityFuncs import (
+    evaluate_leads_with_perplexity,
+    async_evaluate_leads_with_perplexity,
+    get_scoring_tier_stats,
+    scoring_tier_stats_since,
+)
+from toolkit.neverBounceHTTP import verify_apollo_final_emails, async_verify_apollo_final_emails
+from toolkit.llmCache import get_llm_cache_stats, llm_cache_stats_since
 
 from functions.helper import (
     filter_apollo_with_instantly_and_dedupe,
-    remove_unverified_emails,
     check_against_previous_customers,
-    should_export_instantly_leads
 )
 from functions.file_upload import upload_csv_to_google_drive
+from functions.stage_storage import export_stage_csv, stage_path
 from functions.apollo_input_data import industries
 
 
@@ -29,8 +38,10 @@ FILES = {
     "previous_customers": INPUT_DIR / "previous_customers.csv",
     "instantly": OUTPUT_DIR / "instantly_leads.csv",
     "apollo_scraped": OUTPUT_DIR / "apollo_all_industries.csv",
-    "apollo_deduped": OUTPUT_DIR / "apollo_deduped.csv",
-    "apollo_clean": OUTPUT_DIR / "apollo_final.csv",
+    # Intermediate stages use STAGE_FORMAT (Parquet by default); CSV is only written for the upload
+    "apollo_deduped": stage_path(OUTPUT_DIR / "apollo_deduped.csv"),
+    "apollo_clean": stage_path(OUTPUT_DIR / "apollo_final.csv"),
+    "apollo_upload": OUTPUT_DIR / "apollo_final.csv",
     "apollo_verified": OUTPUT_DIR / "apollo_verified.csv",
 }
 
@@ -51,6 +62,9 @@ output_verified_subsetted_file_path = f'{OUTPUT_DIR}/apollo_verified.csv'
 # Output file paths - S previous customers
 output_rechecked_previous_customers_file_path = f'{OUTPUT_DIR}/apollo_excluding_previous_customers.csv'
 
+# Launch and poll all industry runs at once instead of one after another
+APOLLO_CONCURRENT_SCRAPE = os.getenv("APOLLO_CONCURRENT_SCRAPE", "true").lower() == "true"
+
 
 
 
@@ -65,42 +79,54 @@ def run_apollo_pipeline(skip_steps: List[int] = None) -> Dict:
     Returns structured result for Flask / monitoring.
     """
     skip_steps = skip_steps or []
+    llm_cache_snapshot = get_llm_cache_stats()
+    tier_snapshot = get_scoring_tier_stats()
+    http_snapshot = get_http_stats()
 
     result = {
         "pipeline": "apollo",
         "started_at": datetime.now().isoformat(),
         "steps": {},
         "industries": {},
+        "scrape_cache": {},
         "status": "running",
     }
 
     try:
         # STEP 0: Export Instantly leads
         if 0 not in skip_steps:
-            if should_export_instantly_leads(FILES["instantly"]):
-                log("STEP 0", "Exporting Instantly leads for deduplication")
-                export_paginated_instantly_leads(-1)
-                result["steps"]["export_instantly"] = "completed"
-            else:
-                log("STEP 0", "Skipping Instantly leads export (already run today)")
-                result["steps"]["export_instantly"] = "skipped"
+            log("STEP 0", "Exporting Instantly leads for deduplication (shared with concurrent pipelines)")
+            result["steps"]["export_instantly"] = ensure_instantly_leads_exported(FILES["instantly"])
+            if result["steps"]["export_instantly"] == "skipped":
+                log("STEP 0", "Instantly leads already exported today, reusing the file")
 
         # STEP 1: Apollo scraping (industry-safe)
         if 1 not in skip_steps:
             log("STEP 1", "Starting Apollo scraping")
-            for industry_obj in industries:
-                for industry_key, config in industry_obj.items():
-                    try:
-                        log("SCRAPE", f"{industry_key}")
-                        apify_apollo_scraper(
-                            industry_key,
-                            config,
-                            str(FILES["apollo_scraped"]),
-                        )
-                        result["industries"][industry_key] = "completed"
-                    except Exception as e:
-                        result["industries"][industry_key] = f"failed: {str(e)}"
-                        log("SCRAPE ERROR", f"{industry_key} → {e}")
+            if APOLLO_CONCURRENT_SCRAPE:
+                log("SCRAPE", f"Running {len(industries)} industries concurrently")
+                result["industries"].update(
+                    apify_apollo_scrape_all(
+                        industries,
+                        str(FILES["apollo_scraped"]),
+                        cache_report=result["scrape_cache"],
+                    )
+                )
+            else:
+                for industry_obj in industries:
+                    for industry_key, config in industry_obj.items():
+                        try:
+                            log("SCRAPE", f"{industry_key}")
+                            apify_apollo_scraper(
+                                industry_key,
+                                config,
+                                str(FILES["apollo_scraped"]),
+                                cache_report=result["scrape_cache"],
+                            )
+                            result["industries"][industry_key] = "completed"
+                        except Exception as e:
+                            result["industries"][industry_key] = f"failed: {str(e)}"
+                            log("SCRAPE ERROR", f"{industry_key} → {e}")
 
             result["steps"]["apollo_scraping"] = "completed"
 
@@ -112,6 +138,14 @@ def run_apollo_pipeline(skip_steps: List[int] = None) -> Dict:
                 str(FILES["instantly"]),
                 str(FILES["apollo_deduped"]),
             )
+            if FILES["previous_customers"].exists():
+                log("STEP 2", "Removing previous customers")
+                result["previous_customers"] = check_against_previous_customers(
+                    str(FILES["apollo_deduped"]),
+                    str(FILES["previous_customers"]),
+                    str(FILES["instantly"]),
+                    str(FILES["apollo_deduped"]),
+                )
             result["steps"]["dedupe"] = "completed"
 
         # STEP 3: Cleaning
@@ -139,7 +173,120 @@ def run_apollo_pipeline(skip_steps: List[int] = None) -> Dict:
         if 6 not in skip_steps:
             log("STEP 6", "Uploading final file to Google Drive")
             upload_csv_to_google_drive(
-                str(FILES["apollo_clean"]),
+                export_stage_csv(FILES["apollo_clean"], FILES["apollo_upload"]),
+                filename=f"apollo_final-{date.today().isoformat()}",
+                delete_after_upload=True,
+            )
+            result["steps"]["upload"] = "completed"
+
+        result["status"] = "completed"
+
+    except Exception as e:
+        result["status"] = "failed"
+        result["error"] = str(e)
+        log("PIPELINE ERROR", str(e))
+
+    finally:
+        result["llm_cache"] = llm_cache_stats_since(llm_cache_snapshot)
+        result["scoring_tiers"] = scoring_tier_stats_since(tier_snapshot)
+        result["http"] = http_stats_since(http_snapshot)
+        result["completed_at"] = datetime.now().isoformat()
+
+    return result
+
+
+async def run_apollo_pipeline_async(skip_steps: List[int] = None) -> Dict:
+    """
+    Run the Apollo pipeline on one event loop.
+    Same steps and result dict as run_apollo_pipeline, but vendor calls use the
+    shared async client, and the Instantly export (step 0) runs alongside the
+    Apollo scraping (step 1). Local pandas steps run in worker threads.
+    """
+    skip_steps = skip_steps or []
+    llm_cache_snapshot = get_llm_cache_stats()
+    tier_snapshot = get_scoring_tier_stats()
+    http_snapshot = get_http_stats()
+
+    result = {
+        "pipeline": "apollo",
+        "started_at": datetime.now().isoformat(),
+        "steps": {},
+        "industries": {},
+        "scrape_cache": {},
+        "status": "running",
+    }
+
+    async def export_instantly():
+        log("STEP 0", "Exporting Instantly leads for deduplication (shared with concurrent pipelines)")
+        result["steps"]["export_instantly"] = await async_ensure_instantly_leads_exported(FILES["instantly"])
+        if result["steps"]["export_instantly"] == "skipped":
+            log("STEP 0", "Instantly leads already exported today, reusing the file")
+
+    async def scrape_apollo():
+        log("STEP 1", f"Scraping {len(industries)} industries")
+        result["industries"].update(
+            await async_apify_apollo_scrape_all(
+                industries,
+                str(FILES["apollo_scraped"]),
+                cache_report=result["scrape_cache"],
+            )
+        )
+        result["steps"]["apollo_scraping"] = "completed"
+
+    try:
+        # STEPS 0-1: Instantly export and Apollo scraping are independent
+        first_steps = []
+        if 0 not in skip_steps:
+            first_steps.append(export_instantly())
+        if 1 not in skip_steps:
+            first_steps.append(scrape_apollo())
+        await asyncio.gather(*first_steps)
+
+        # STEP 2: Deduplication
+        if 2 not in skip_steps:
+            log("STEP 2", "Deduplicating Apollo leads")
+            await asyncio.to_thread(
+                filter_apollo_with_instantly_and_dedupe,
+                str(FILES["apollo_scraped"]),
+                str(FILES["instantly"]),
+                str(FILES["apollo_deduped"]),
+            )
+            if FILES["previous_customers"].exists():
+                log("STEP 2", "Removing previous customers")
+                result["previous_customers"] = await asyncio.to_thread(
+                    check_against_previous_customers,
+                    str(FILES["apollo_deduped"]),
+                    str(FILES["previous_customers"]),
+                    str(FILES["instantly"]),
+                    str(FILES["apollo_deduped"]),
+                )
+            result["steps"]["dedupe"] = "completed"
+
+        # STEP 3: Cleaning
+        if 3 not in skip_steps:
+            log("STEP 3", "Cleaning data")
+            await asyncio.to_thread(clean_data, str(FILES["apollo_deduped"]), str(FILES["apollo_clean"]))
+            result["steps"]["cleaning"] = "completed"
+
+        # STEP 4: Email verification
+        if 4 not in skip_steps:
+            log("STEP 4", "Verifying emails")
+            await async_verify_apollo_final_emails(str(FILES["apollo_clean"]))
+            result["steps"]["email_verification"] = "completed"
+
+        # STEP 5: Perplexity evaluation
+        if 5 not in skip_steps:
+            log("STEP 5", "Evaluating leads with Perplexity")
+            await async_evaluate_leads_with_perplexity(str(FILES["apollo_clean"]))
+            result["steps"]["perplexity"] = "completed"
+
+        # STEP 6: Upload
+        if 6 not in skip_steps:
+            log("STEP 6", "Uploading final file to Google Drive")
+            upload_csv = await asyncio.to_thread(export_stage_csv, FILES["apollo_clean"], FILES["apollo_upload"])
+            await asyncio.to_thread(
+                upload_csv_to_google_drive,
+                upload_csv,
                 filename=f"apollo_final-{date.today().isoformat()}",
                 delete_after_upload=True,
             )
@@ -153,6 +300,10 @@ def run_apollo_pipeline(skip_steps: List[int] = None) -> Dict:
         log("PIPELINE ERROR", str(e))
 
     finally:
+        await close_async_client()
+        result["llm_cache"] = llm_cache_stats_since(llm_cache_snapshot)
+        result["scoring_tiers"] = scoring_tier_stats_since(tier_snapshot)
+        result["http"] = http_stats_since(http_snapshot)
         result["completed_at"] = datetime.now().isoformat()
 
     return result
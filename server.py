@@ -2,6 +2,7 @@
 
 from flask import Flask, jsonify
 from flask_cors import CORS
+import asyncio
 import threading
 import os
 from datetime import datetime
@@ -24,11 +25,19 @@ CORS(app, origins=ALLOWED_ORIGINS)
 running_pipelines = {}
 
 
+def use_async_pipelines():
+    """ASYNC_PIPELINES=true runs each pipeline's async runner on its own event loop"""
+    return os.environ.get('ASYNC_PIPELINES', 'false').lower() == 'true'
+
+
 def run_apollo_pipeline():
     """Execute Apollo pipeline"""
     try:
-        from pipeline.pipeline_importing import run_apollo_pipeline
-        run_apollo_pipeline()
+        from pipeline.pipeline_importing import run_apollo_pipeline, run_apollo_pipeline_async
+        if use_async_pipelines():
+            asyncio.run(run_apollo_pipeline_async())
+        else:
+            run_apollo_pipeline()
         running_pipelines['apollo']['status'] = 'completed'
         running_pipelines['apollo']['completed_at'] = datetime.now().isoformat()
     except Exception as e:
@@ -40,8 +49,11 @@ def run_apollo_pipeline():
 def run_googlemaps_pipeline():
     """Execute Google Maps pipeline"""
     try:
-        from pipeline.pipeline_googlemaps import run_googlemaps_pipeline
-        run_googlemaps_pipeline()
+        from pipeline.pipeline_googlemaps import run_googlemaps_pipeline, run_googlemaps_pipeline_async
+        if use_async_pipelines():
+            asyncio.run(run_googlemaps_pipeline_async())
+        else:
+            run_googlemaps_pipeline()
         running_pipelines['googlemaps']['status'] = 'completed'
         running_pipelines['googlemaps']['completed_at'] = datetime.now().isoformat()
     except Exception as e:
@@ -53,8 +65,11 @@ def run_googlemaps_pipeline():
 def run_hubspot_pipeline():
     """Execute HubSpot pipeline"""
     try:
-        from pipeline.pipeline_hubspot import run_hubspot_pipeline
-        run_hubspot_pipeline()
+        from pipeline.pipeline_hubspot import run_hubspot_pipeline, run_hubspot_pipeline_async
+        if use_async_pipelines():
+            asyncio.run(run_hubspot_pipeline_async())
+        else:
+            run_hubspot_pipeline()
         running_pipelines['hubspot']['status'] = 'completed'
         running_pipelines['hubspot']['completed_at'] = datetime.now().isoformat()
     except Exception as e:
@@ -0,0 +1,50 @@
+import unittest
+
+from toolkit.fuzzyMatch import CompanyNameMatcher, jaccard, lsh_bands, normalize_company_name, shingles
+
+
+class CompanyNameMatcherTest(unittest.TestCase):
+    def test_find_matches_returns_every_spelling_above_threshold(self):
+        matcher = CompanyNameMatcher()
+        matcher.add_many([
+            "Riverside Family Fun Center",
+            "Riverside Family Fun Centers",
+            "RIVERSIDE FAMILY FUN CENTER, LLC",
+            "Lakeside Bowling",
+        ])
+
+        matched = matcher.find_matches(["Riverside Family Fun Center Inc"])
+
+        self.assertEqual(matched, {
+            "Riverside Family Fun Center",
+            "Riverside Family Fun Centers",
+            "RIVERSIDE FAMILY FUN CENTER, LLC",
+        })
+
+    def test_plural_spelling_is_above_threshold_on_its_own(self):
+        a = shingles(normalize_company_name("Riverside Family Fun Centers"))
+        b = shingles(normalize_company_name("Riverside Family Fun Center Inc"))
+        self.assertGreaterEqual(jaccard(a, b), 0.8)
+
+        matcher = CompanyNameMatcher()
+        matcher.add_many(["Riverside Family Fun Centers"])
+        self.assertEqual(matcher.find_matches(["Riverside Family Fun Center Inc"]), {"Riverside Family Fun Centers"})
+
+    def test_match_keeps_only_the_best_name(self):
+        matcher = CompanyNameMatcher()
+        matcher.add_many(["Riverside Family Fun Center", "Riverside Family Fun Centers"])
+        self.assertEqual(matcher.match("Riverside Family Fun Center Inc"), "riverside family fun center")
+
+    def test_unrelated_names_do_not_match(self):
+        matcher = CompanyNameMatcher()
+        matcher.add_many(["Riverside Family Fun Center"])
+        self.assertEqual(matcher.find_matches(["Lakeside Bowling", "", None]), set())
+
+    def test_bands_favour_recall_at_the_threshold(self):
+        bands, rows = lsh_bands(0.8, 128)
+        self.assertLessEqual(bands * rows, 128)
+        self.assertGreaterEqual(1 - (1 - 0.8 ** rows) ** bands, 0.95)
+
+
+if __name__ == "__main__":
+    unittest.main()
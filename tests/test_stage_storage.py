@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from functions.stage_storage import read_stage, update_stage, write_stage
+
+
+def _leads():
+    return pd.DataFrame({
+        "email": ["A@x.com", "b@y.com", "c@z.com", "d@w.com"],
+        "company_name": ["Acme", "Beta", "Gamma", "Delta"],
+        "company_description": ["one", "two", None, "four"],
+        "company_size": [10, None, 30, 40],
+    })
+
+
+class UpdateStageTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def test_matches_full_read_and_write(self):
+        for ext in ("parquet", "arrow", "csv"):
+            with self.subTest(ext=ext):
+                path = self._path(f"leads.{ext}")
+                write_stage(_leads(), path)
+
+                # What the step used to do: load everything, change a column, keep some rows, reorder
+                expected = read_stage(path)
+                expected["email"] = expected["email"].str.lower()
+                expected["icp_score"] = [3.0, 9.0, None, 7.0]
+                expected = expected.iloc[[1, 3, 0]]
+                write_stage(expected, self._path(f"expected.{ext}"))
+
+                df = read_stage(path, columns=["email"])
+                df["email"] = df["email"].str.lower()
+                df["icp_score"] = [3.0, 9.0, None, 7.0]
+                update_stage(path, df.iloc[[1, 3, 0]], self._path(f"out.{ext}"))
+
+                pd.testing.assert_frame_equal(
+                    read_stage(self._path(f"out.{ext}")),
+                    read_stage(self._path(f"expected.{ext}")),
+                )
+
+    def test_row_selection_only_copies_every_column(self):
+        path = self._path("leads.parquet")
+        write_stage(_leads(), path)
+
+        keys = read_stage(path, columns=["email"])
+        update_stage(path, keys.loc[keys["email"] != "b@y.com", []])
+
+        result = read_stage(path)
+        self.assertEqual(list(result.columns), list(_leads().columns))
+        self.assertEqual(list(result["company_name"]), ["Acme", "Gamma", "Delta"])
+        self.assertTrue(pd.isna(result.loc[1, "company_description"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
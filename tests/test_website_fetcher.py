@@ -0,0 +1,104 @@
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from toolkit import websiteFetcher
+from toolkit.websiteFetcher import WebsiteFetcher
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    """Local stand-in for venue sites; behaviour is picked by path, the venue host comes in the Host header"""
+
+    def do_GET(self):
+        server = self.server
+        host = self.headers.get("Host")
+        with server.lock:
+            server.hits[self.path] = server.hits.get(self.path, 0) + 1
+            server.in_flight[host] = server.in_flight.get(host, 0) + 1
+            server.max_in_flight[host] = max(server.max_in_flight.get(host, 0), server.in_flight[host])
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.end_headers()
+            if self.path.startswith("/slow-"):
+                time.sleep(0.2)
+                self.wfile.write(b"<p>slow page</p>")
+            elif self.path == "/large":
+                self.wfile.write(b"<p>" + b"x" * 50000 + b"</p>")
+            elif self.path == "/stall":
+                self.wfile.write(b"<p>before stall ")
+                self.wfile.flush()
+                time.sleep(1.5)
+                self.wfile.write(b"after stall</p>")
+            else:
+                self.wfile.write(b"<html><head><title>Venue</title></head><body><p>Family fun center</p></body></html>")
+        finally:
+            with server.lock:
+                server.in_flight[host] -= 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+class WebsiteFetcherTest(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _StandInHandler)
+        self.server.daemon_threads = True
+        self.server.lock = threading.Lock()
+        self.server.hits = {}
+        self.server.in_flight = {}
+        self.server.max_in_flight = {}
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+        self.cache_dir = tempfile.mkdtemp()
+        self.original_cache = (websiteFetcher.WEBSITE_CACHE_DIR, websiteFetcher.WEBSITE_CACHE_TTL_HOURS)
+        websiteFetcher.WEBSITE_CACHE_DIR = self.cache_dir
+        websiteFetcher.WEBSITE_CACHE_TTL_HOURS = 1
+
+    def tearDown(self):
+        websiteFetcher.WEBSITE_CACHE_DIR, websiteFetcher.WEBSITE_CACHE_TTL_HOURS = self.original_cache
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def _fetcher(self, **kwargs):
+        fetcher = WebsiteFetcher(base_url=self.base_url, **kwargs)
+        self.addCleanup(fetcher.shutdown)
+        return fetcher
+
+    def test_pages_are_served_from_the_disk_cache(self):
+        text = self._fetcher().get_text("venue.example/home")
+        self.assertIn("Family fun center", text)
+
+        fetcher = self._fetcher()
+        self.assertEqual(fetcher.get_text("http://venue.example/home"), text)
+        self.assertEqual(self.server.hits["/home"], 1)
+        self.assertEqual(fetcher.stats["cached"], 1)
+
+    def test_concurrent_requests_per_host_are_capped(self):
+        fetcher = self._fetcher(max_workers=8, per_host=2)
+        urls = [f"http://{host}/slow-{i}" for host in ("a.example", "b.example") for i in range(4)]
+        fetcher.prefetch(urls)
+        for url in urls:
+            self.assertEqual(fetcher.get_text(url), "slow page")
+
+        self.assertEqual(self.server.max_in_flight["a.example"], 2)
+        self.assertEqual(self.server.max_in_flight["b.example"], 2)
+
+    def test_body_is_truncated_at_max_bytes(self):
+        text = self._fetcher(max_bytes=1000).get_text("http://venue.example/large")
+        self.assertEqual(text, "x" * (1000 - len("<p>")))
+
+    def test_body_is_truncated_when_the_read_times_out(self):
+        started = time.monotonic()
+        text = self._fetcher(timeout=0.5).get_text("http://venue.example/stall")
+        self.assertEqual(text, "before stall")
+        self.assertLess(time.monotonic() - started, 1.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,394 @@
+"""
+Shared Apify helpers
+Waiting on actor runs and fetching their datasets, used by the Apollo and Google Maps scrapers
+"""
+
+import asyncio
+import csv
+import os
+import random
+import time
+import httpx
+import requests
+from contextlib import nullcontext
+from dotenv import load_dotenv
+from toolkit.asyncHttp import async_get, async_post
+from toolkit.httpClient import http_get
+from toolkit.runJournal import record_run, find_resumable_run, mark_run, record_collected, collected_items
+
+# Load environment variables
+load_dotenv()
+
+APIFY_TOKEN = os.getenv("APIFY_API_TOKEN")
+APIFY_API_BASE = "https://api.apify.com/v2"
+
+# Apify holds a status request open for at most 60 seconds while the run is unfinished
+APIFY_WAIT_FOR_FINISH_SECONDS = 60
+# Give up on a run that has not finished after this many seconds
+APIFY_RUN_DEADLINE_SECONDS = int(os.getenv("APIFY_RUN_DEADLINE_SECONDS", "7200"))
+# Backoff between retries of a failed status request
+APIFY_BACKOFF_BASE_SECONDS = 2
+APIFY_BACKOFF_MAX_SECONDS = 60
+# Items fetched per dataset request when streaming a dataset to disk
+APIFY_DATASET_PAGE_SIZE = int(os.getenv("APIFY_DATASET_PAGE_SIZE", "1000"))
+
+FAILED_STATUSES = {"FAILED", "ABORTED", "TIMED-OUT"}
+
+
+def _backoff_delay(attempt):
+    """Exponential backoff with full jitter"""
+    cap = min(APIFY_BACKOFF_MAX_SECONDS, APIFY_BACKOFF_BASE_SECONDS * (2 ** attempt))
+    return random.uniform(0, cap)
+
+
+def wait_for_apify_run(run_id, label="Apify run", deadline_seconds=None):
+    """
+    Wait for an Apify actor run to finish using the `waitForFinish` long-poll
+
+    Each status request is held open by Apify until the run finishes (or 60s pass),
+    so a finished run is noticed within about a second instead of after a fixed sleep.
+    Failed status requests are retried with exponential backoff and jitter.
+
+    Args:
+        run_id: The Apify run ID to wait for
+        label: Name used in log and error messages
+        deadline_seconds: Max seconds to wait (default: APIFY_RUN_DEADLINE_SECONDS)
+
+    Returns:
+        The run data dict of the SUCCEEDED run
+    """
+    status_url = f"{APIFY_API_BASE}/actor-runs/{run_id}"
+    deadline = time.monotonic() + (deadline_seconds or APIFY_RUN_DEADLINE_SECONDS)
+    attempt = 0
+    last_status = None
+
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError(f"{label} did not finish in time. Last status: {last_status}. Run ID: {run_id}")
+
+        wait_for_finish = int(min(APIFY_WAIT_FOR_FINISH_SECONDS, max(1, remaining)))
+        try:
+            status_resp = http_get(
+                status_url,
+                params={"token": APIFY_TOKEN, "waitForFinish": wait_for_finish},
+                timeout=wait_for_finish + 30,
+                retries=0,
+            )
+            status_resp.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            response = getattr(e, "response", None)
+            # Client errors other than rate limiting will not fix themselves
+            if response is not None and 400 <= response.status_code < 500 and response.status_code != 429:
+                raise
+            delay = min(_backoff_delay(attempt), max(0, deadline - time.monotonic()))
+            attempt += 1
+            print(f"⚠️ Status check failed ({e}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+            continue
+
+        attempt = 0
+        run_data = status_resp.json()["data"]
+        status = run_data["status"]
+        if status != last_status:
+            print(f"⏳ Status: {status}")
+        last_status = status
+
+        if status == "SUCCEEDED":
+            return run_data
+
+        if status in FAILED_STATUSES:
+            error_info = run_data.get("statusMessage", "No error message available")
+            print(f"Error details: {error_info}")
+            raise RuntimeError(f"{label} failed with status: {status}. Error: {error_info}")
+
+        # Long-poll returned without the run finishing; small jitter avoids lockstep polling
+        time.sleep(random.uniform(0, 1))
+
+
+def start_or_resume_run(actor_id, config, start_run, label="Apify run"):
+    """
+    Reattach to a journaled run for this config, or start a new one, and wait for it
+
+    Run and dataset IDs are journaled as soon as Apify returns them, so after a
+    restart an in-flight or already finished run is picked up instead of relaunched.
+    A reattached run that turns out to have failed, or that Apify no longer knows
+    (a 4xx on its status, e.g. expired or deleted), is replaced by a fresh one.
+    A reattached run that is still unfinished at the deadline raises TimeoutError.
+
+    Args:
+        actor_id: Apify actor id
+        config: Actor input config dict
+        start_run: Callable taking the config and returning the new run's data dict
+        label: Name used in log and error messages
+
+    Returns:
+        The run data dict of the SUCCEEDED run
+    """
+    entry = find_resumable_run(actor_id, config)
+    if entry:
+        print(f"🔁 Reattaching to journaled run {entry['run_id']}")
+        try:
+            return wait_for_apify_run(entry["run_id"], label=label)
+        # wait_for_apify_run only lets 4xx responses (other than 429) through
+        except (RuntimeError, requests.exceptions.HTTPError) as e:
+            print(f"⚠️ Journaled run {entry['run_id']} is unusable ({e}), starting a new run")
+            mark_run(actor_id, config, "failed")
+
+    run = start_run(config)
+    record_run(actor_id, config, run["id"], run.get("defaultDatasetId"))
+    try:
+        return wait_for_apify_run(run["id"], label=label)
+    except RuntimeError:
+        mark_run(actor_id, config, "failed")
+        raise
+
+
+def fetch_dataset_items(dataset_id):
+    """Fetch all items of an Apify dataset"""
+    dataset_url = f"{APIFY_API_BASE}/datasets/{dataset_id}/items"
+    data_resp = http_get(
+        dataset_url,
+        params={"token": APIFY_TOKEN, "format": "json"},
+        timeout=300,
+    )
+    data_resp.raise_for_status()
+
+    return data_resp.json()
+
+
+def iter_dataset_pages(dataset_id, fields=None, page_size=None, offset=0, on_progress=None):
+    """
+    Stream an Apify dataset page by page using offset/limit
+
+    Only one page of items is held in memory at a time, so memory stays flat no
+    matter how large the dataset is.
+
+    Args:
+        dataset_id: The Apify dataset ID
+        fields: Optional list of fields to project server-side
+        page_size: Items per request (default: APIFY_DATASET_PAGE_SIZE)
+        offset: Item to start from
+        on_progress: Optional callable taking the number of items consumed so far;
+            called once the caller has finished with a page and asks for the next
+
+    Yields:
+        Lists of item dicts
+    """
+    page_size = page_size or APIFY_DATASET_PAGE_SIZE
+    dataset_url = f"{APIFY_API_BASE}/datasets/{dataset_id}/items"
+
+    while True:
+        params = {
+            "token": APIFY_TOKEN,
+            "format": "json",
+            "offset": offset,
+            "limit": page_size,
+        }
+        if fields:
+            params["fields"] = ",".join(fields)
+
+        data_resp = http_get(dataset_url, params=params, timeout=120)
+        data_resp.raise_for_status()
+
+        page = data_resp.json()
+        if not page:
+            break
+
+        print(f"📥 Fetched items {offset}-{offset + len(page)}")
+        yield page
+
+        offset += len(page)
+        if on_progress is not None:
+            on_progress(offset)
+        if len(page) < page_size:
+            break
+
+
+def iter_run_pages(actor_id, config, run_data, fields=None):
+    """
+    Stream a journaled run's dataset, resuming after the items already appended
+
+    Progress is journaled after each page the caller has written, so a pipeline
+    that crashed mid-stream and reattached to the run does not append the earlier
+    pages again (at most the page in flight at the crash is repeated).
+
+    Returns:
+        (pages, resumed_at): page generator and the item offset it starts from
+    """
+    resumed_at = collected_items(actor_id, config)
+    if resumed_at:
+        print(f"⏩ Resuming dataset {run_data['defaultDatasetId']} at item {resumed_at}")
+    pages = iter_dataset_pages(
+        run_data["defaultDatasetId"],
+        fields=fields,
+        offset=resumed_at,
+        on_progress=lambda count: record_collected(actor_id, config, count),
+    )
+    return pages, resumed_at
+
+
+def append_rows_to_csv(df, path, lock=None):
+    """
+    Append a DataFrame to a CSV, writing the header only when creating the file
+
+    When the file already exists the rows are aligned to its header so pages with
+    missing or reordered keys never shift columns.
+
+    Args:
+        df: Rows to append
+        path: CSV file path
+        lock: Optional lock held while writing (for concurrent writers)
+    """
+    output_dir = os.path.dirname(path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    with lock or nullcontext():
+        file_exists = os.path.exists(path) and os.path.getsize(path) > 0
+        if file_exists:
+            with open(path, newline="", encoding="utf-8") as f:
+                header = next(csv.reader(f), [])
+            dropped = [c for c in df.columns if c not in header]
+            if dropped:
+                print(f"⚠️ Dropping columns not in {path} header: {dropped}")
+            df = df.reindex(columns=header)
+
+        df.to_csv(
+            path,
+            mode="a",
+            header=not file_exists,
+            index=False
+        )
+
+
+async def async_start_actor_run(actor_id, config):
+    """Start an actor run without waiting for it and return the Apify run data"""
+    start_resp = await async_post(
+        f"{APIFY_API_BASE}/acts/{actor_id}/runs",
+        params={"token": APIFY_TOKEN},
+        json=config,
+    )
+    if not start_resp.is_success:
+        print(f"❌ Error response ({start_resp.status_code}): {start_resp.text}")
+        start_resp.raise_for_status()
+
+    run = start_resp.json()["data"]
+    print(f"🆔 Run ID: {run['id']}")
+    return run
+
+
+async def async_wait_for_apify_run(run_id, label="Apify run", deadline_seconds=None):
+    """Async counterpart of wait_for_apify_run (same long-poll, backoff and deadline rules)"""
+    status_url = f"{APIFY_API_BASE}/actor-runs/{run_id}"
+    deadline = time.monotonic() + (deadline_seconds or APIFY_RUN_DEADLINE_SECONDS)
+    attempt = 0
+    last_status = None
+
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError(f"{label} did not finish in time. Last status: {last_status}. Run ID: {run_id}")
+
+        wait_for_finish = int(min(APIFY_WAIT_FOR_FINISH_SECONDS, max(1, remaining)))
+        try:
+            status_resp = await async_get(
+                status_url,
+                params={"token": APIFY_TOKEN, "waitForFinish": wait_for_finish},
+                timeout=wait_for_finish + 30,
+                retries=0,
+            )
+            status_resp.raise_for_status()
+        except httpx.HTTPError as e:
+            response = getattr(e, "response", None) if isinstance(e, httpx.HTTPStatusError) else None
+            # Client errors other than rate limiting will not fix themselves
+            if response is not None and 400 <= response.status_code < 500 and response.status_code != 429:
+                raise
+            delay = min(_backoff_delay(attempt), max(0, deadline - time.monotonic()))
+            attempt += 1
+            print(f"⚠️ Status check failed ({e}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            continue
+
+        attempt = 0
+        run_data = status_resp.json()["data"]
+        status = run_data["status"]
+        if status != last_status:
+            print(f"⏳ Status: {status}")
+        last_status = status
+
+        if status == "SUCCEEDED":
+            return run_data
+
+        if status in FAILED_STATUSES:
+            error_info = run_data.get("statusMessage", "No error message available")
+            print(f"Error details: {error_info}")
+            raise RuntimeError(f"{label} failed with status: {status}. Error: {error_info}")
+
+        await asyncio.sleep(random.uniform(0, 1))
+
+
+async def async_start_or_resume_run(actor_id, config, label="Apify run"):
+    """Async counterpart of start_or_resume_run, journaling runs the same way"""
+    entry = find_resumable_run(actor_id, config)
+    if entry:
+        print(f"🔁 Reattaching to journaled run {entry['run_id']}")
+        try:
+            return await async_wait_for_apify_run(entry["run_id"], label=label)
+        except (RuntimeError, httpx.HTTPStatusError) as e:
+            print(f"⚠️ Journaled run {entry['run_id']} is unusable ({e}), starting a new run")
+            mark_run(actor_id, config, "failed")
+
+    run = await async_start_actor_run(actor_id, config)
+    record_run(actor_id, config, run["id"], run.get("defaultDatasetId"))
+    try:
+        return await async_wait_for_apify_run(run["id"], label=label)
+    except RuntimeError:
+        mark_run(actor_id, config, "failed")
+        raise
+
+
+async def async_iter_dataset_pages(dataset_id, fields=None, page_size=None, offset=0, on_progress=None):
+    """Async generator counterpart of iter_dataset_pages (on_progress runs in a worker thread)"""
+    page_size = page_size or APIFY_DATASET_PAGE_SIZE
+    dataset_url = f"{APIFY_API_BASE}/datasets/{dataset_id}/items"
+
+    while True:
+        params = {
+            "token": APIFY_TOKEN,
+            "format": "json",
+            "offset": offset,
+            "limit": page_size,
+        }
+        if fields:
+            params["fields"] = ",".join(fields)
+
+        data_resp = await async_get(dataset_url, params=params, timeout=120)
+        data_resp.raise_for_status()
+
+        page = data_resp.json()
+        if not page:
+            break
+
+        print(f"📥 Fetched items {offset}-{offset + len(page)}")
+        yield page
+
+        offset += len(page)
+        if on_progress is not None:
+            await asyncio.to_thread(on_progress, offset)
+        if len(page) < page_size:
+            break
+
+
+async def async_iter_run_pages(actor_id, config, run_data, fields=None):
+    """Async counterpart of iter_run_pages"""
+    resumed_at = await asyncio.to_thread(collected_items, actor_id, config)
+    if resumed_at:
+        print(f"⏩ Resuming dataset {run_data['defaultDatasetId']} at item {resumed_at}")
+    pages = async_iter_dataset_pages(
+        run_data["defaultDatasetId"],
+        fields=fields,
+        offset=resumed_at,
+        on_progress=lambda count: record_collected(actor_id, config, count),
+    )
+    return pages, resumed_at
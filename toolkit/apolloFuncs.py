@@ -1,10 +1,24 @@
+import asyncio
 import json
+import httpx
 import requests
 import os
-import time
+import threading
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
-from datetime import date
+from toolkit.httpClient import http_post
+from toolkit.apifyFuncs import (
+    wait_for_apify_run,
+    start_or_resume_run,
+    fetch_dataset_items,
+    iter_run_pages,
+    append_rows_to_csv,
+    async_start_or_resume_run,
+    async_iter_run_pages,
+)
+from toolkit.scrapeCache import get_cached_pages, ScrapeCacheWriter
+from toolkit.runJournal import mark_run
 
 # Load environment variables
 load_dotenv()
@@ -12,64 +26,96 @@ load_dotenv()
 APIFY_TOKEN = os.getenv("APIFY_API_TOKEN")
 ACTOR_ID = "code_crafter~leads-finder"
 
-def apify_apollo_scraper(industry_key, config, output_apollo_scraped_file_path):
+# Fields kept from each Apollo item (projected server-side when streaming the dataset)
+APOLLO_FIELDS = [
+    "first_name", "last_name", "email", "personal_email", "mobile_number", "full_name",
+    "job_title", "linkedin", "company_name", "company_website", "industry", "company_size",
+    "headline", "seniority_level", "functional_level", "city", "state", "country",
+    "company_linkedin", "company_linkedin_uid", "company_founded_year", "company_domain",
+    "company_phone", "company_street_address", "company_full_address", "company_state",
+    "company_city", "company_country", "company_postal_code", "keywords",
+    "company_description", "company_annual_revenue", "company_annual_revenue_clean",
+    "company_total_funding", "company_total_funding_clean", "company_technologies",
+]
+
+# Max number of Apify runs in flight at once when scraping all industries concurrently
+APOLLO_MAX_IN_FLIGHT = int(os.getenv("APOLLO_MAX_IN_FLIGHT", "5"))
+
+# Serialises appends to the shared master CSV when several runs finish together
+_output_lock = threading.Lock()
+
+
+def start_apollo_run(config):
+    """Start the Apollo actor asynchronously and return the Apify run data"""
+    start_url = f"https://api.apify.com/v2/acts/{ACTOR_ID}/runs"
+
+    print(f"🔗 Calling Apify API: {start_url}")
+
+    start_resp = http_post(
+        start_url,
+        params={"token": APIFY_TOKEN},
+        json=config,
+        headers={"Content-Type": "application/json"},
+    )
+
+    start_resp.raise_for_status()
+
+    run = start_resp.json()["data"]
+    print(f"🆔 Run ID: {run['id']}")
+    return run
+
+
+def save_apollo_pages(pages, industry_key, output_apollo_scraped_file_path):
+    """Tag each page of items with its industry and append it to the master CSV as it arrives"""
+    # Single master CSV
+    path = output_apollo_scraped_file_path
+    print(f"📝 Streaming rows to: {path}")
+
+    saved = 0
+    for page in pages:
+        saved += _append_apollo_page(page, industry_key, path)
+
+    print(f"✅ Saved {saved} records to {path}")
+    return saved
+
+
+def _append_apollo_page(page, industry_key, path, cache_writer=None):
+    """Write one page to the scrape cache (if given) and append it, tagged with its industry, to the master CSV"""
+    if cache_writer is not None:
+        cache_writer.write_page(page)
+    df = pd.DataFrame(page, columns=APOLLO_FIELDS)
+    # Add industry column to each row
+    df["industry"] = industry_key
+    append_rows_to_csv(df, path, lock=_output_lock)
+    return len(df)
+
+
+def apify_apollo_scraper(industry_key, config, output_apollo_scraped_file_path, cache_report=None):
     print("🚀 Starting Apollo scraper (async)")
     print(f"📊 Industry: {industry_key}")
     print(f"📁 Output path: {output_apollo_scraped_file_path}")
 
     try:
-        # 1️⃣ Start actor asynchronously
-        start_url = f"https://api.apify.com/v2/acts/{ACTOR_ID}/runs"
-        
-        print(f"🔗 Calling Apify API: {start_url}")
-
-        
-        start_resp = requests.post(
-            start_url,
-            params={"token": APIFY_TOKEN},
-            json=config,
-            headers={"Content-Type": "application/json"},
-        )
-        
-        
-        start_resp.raise_for_status()
-
-        run_id = start_resp.json()["data"]["id"]
-        print(f"🆔 Run ID: {run_id}")
-
+        # 0️⃣ Serve identical configs from the local scrape cache
+        cached_pages = get_cached_pages(ACTOR_ID, config)
+        if cache_report is not None:
+            cache_report[industry_key] = "hit" if cached_pages is not None else "miss"
+        if cached_pages is not None:
+            print(f"♻️ Scrape cache hit for '{industry_key}', skipping Apify run")
+            save_apollo_pages(cached_pages, industry_key, output_apollo_scraped_file_path)
+            return True
+
+        # 1️⃣ Start actor asynchronously (or reattach to a journaled run after a restart)
         # 2️⃣ Poll run status for the apify worker
-        print(f"⏳ Polling status for run {run_id}...")
-        items = apify_actor_status(run_id)
-
-        # Add industry column to each field
-        for item in items:
-            item["industry"] = industry_key
-
-        # Single master CSV
-        path = output_apollo_scraped_file_path
-        output_dir = os.path.dirname(path)
-        
-        if output_dir:  # Only create directory if path has a directory component
-            print(f"📂 Creating directory: {output_dir}")
-            os.makedirs(output_dir, exist_ok=True)
-
-        df = pd.DataFrame(items)
-        print(f"📊 DataFrame shape: {df.shape}")
-
-        # Append if file exists, else create
-        file_exists = os.path.exists(path)
-        print(f"📝 {'Appending to' if file_exists else 'Creating'} file: {path}")
-        
-        df.to_csv(
-            path,
-            mode="a",
-            header=not file_exists,
-            index=False
-        )
-
-        print(f"✅ Saved {len(df)} records to {path}")
+        run_data = start_or_resume_run(ACTOR_ID, config, start_apollo_run, label="Apollo scraper")
+
+        # 3️⃣ Stream dataset items to disk page by page (and into the scrape cache)
+        pages, resumed_at = iter_run_pages(ACTOR_ID, config, run_data, fields=APOLLO_FIELDS)
+        with ScrapeCacheWriter(ACTOR_ID, config, enabled=not resumed_at) as cache_writer:
+            save_apollo_pages(cache_writer.tee(pages), industry_key, output_apollo_scraped_file_path)
+        mark_run(ACTOR_ID, config, "collected")
         return True
-        
+
     except requests.exceptions.HTTPError as e:
         print(f"❌ HTTP Error for industry '{industry_key}':")
         print(f"   Status Code: {e.response.status_code}")
@@ -78,37 +124,126 @@ def apify_apollo_scraper(industry_key, config, output_apollo_scraped_file_path):
         return False
 
 
+def apify_apollo_scrape_all(industries, output_apollo_scraped_file_path, max_in_flight=None, cache_report=None):
+    """
+    Scrape every industry concurrently instead of one actor run after another.
+
+    Up to `max_in_flight` runs are started up front and polled in parallel; as
+    soon as a run finishes its rows are appended to the master CSV and the next
+    queued industry is started. Wall time is roughly the longest single run
+    rather than the sum of all runs.
+
+    Args:
+        industries: List of {industry_key: config} dicts (see apollo_input_data.py)
+        output_apollo_scraped_file_path: Path of the master CSV
+        max_in_flight: Max concurrent Apify runs (default: APOLLO_MAX_IN_FLIGHT)
+        cache_report: Optional dict filled with "hit"/"miss" per industry
+
+    Returns:
+        Dict mapping industry_key to "completed" or "failed: <reason>"
+    """
+    max_in_flight = max_in_flight or APOLLO_MAX_IN_FLIGHT
+    jobs = [
+        (industry_key, config)
+        for industry_obj in industries
+        for industry_key, config in industry_obj.items()
+    ]
+    print(f"🚀 Starting {len(jobs)} Apollo runs ({max_in_flight} in flight max)")
+
+    statuses = {}
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        futures = {
+            executor.submit(
+                apify_apollo_scraper,
+                industry_key,
+                config,
+                output_apollo_scraped_file_path,
+                cache_report,
+            ): industry_key
+            for industry_key, config in jobs
+        }
+
+        for future in as_completed(futures):
+            industry_key = futures[future]
+            try:
+                if future.result():
+                    statuses[industry_key] = "completed"
+                else:
+                    statuses[industry_key] = "failed: HTTP error"
+            except Exception as e:
+                statuses[industry_key] = f"failed: {str(e)}"
+                print(f"❌ {industry_key} → {e}")
+
+    return statuses
+
+
+
+
+async def async_apify_apollo_scraper(industry_key, config, output_apollo_scraped_file_path, cache_report=None):
+    """Async counterpart of apify_apollo_scraper (same cache, run journal and streaming)"""
+    print(f"🚀 Starting Apollo scraper for {industry_key}")
 
+    try:
+        # Cache reads, parquet/CSV writes and the CSV lock run in worker threads so the loop keeps polling other runs
+        cached_pages = await asyncio.to_thread(get_cached_pages, ACTOR_ID, config)
+        if cache_report is not None:
+            cache_report[industry_key] = "hit" if cached_pages is not None else "miss"
+        if cached_pages is not None:
+            print(f"♻️ Scrape cache hit for '{industry_key}', skipping Apify run")
+            await asyncio.to_thread(save_apollo_pages, cached_pages, industry_key, output_apollo_scraped_file_path)
+            return True
+
+        run_data = await async_start_or_resume_run(ACTOR_ID, config, label="Apollo scraper")
+
+        saved = 0
+        pages, resumed_at = await async_iter_run_pages(ACTOR_ID, config, run_data, fields=APOLLO_FIELDS)
+        cache_writer = await asyncio.to_thread(ScrapeCacheWriter(ACTOR_ID, config, enabled=not resumed_at).__enter__)
+        try:
+            async for page in pages:
+                saved += await asyncio.to_thread(
+                    _append_apollo_page, page, industry_key, output_apollo_scraped_file_path, cache_writer
+                )
+        except BaseException as e:
+            await asyncio.to_thread(cache_writer.__exit__, type(e), e, e.__traceback__)
+            raise
+        await asyncio.to_thread(cache_writer.__exit__, None, None, None)
+        await asyncio.to_thread(mark_run, ACTOR_ID, config, "collected")
+        print(f"✅ {industry_key}: {saved} records")
+        return True
 
-def apify_actor_status(run_id):
-    status_url = f"https://api.apify.com/v2/actor-runs/{run_id}"
-    
-   #Checking the status in 30 sec to cehck if  actor is completed
-   
-    while True:
-        status_resp = requests.get(status_url, params={"token": APIFY_TOKEN})
-        status_resp.raise_for_status()
+    except httpx.HTTPStatusError as e:
+        print(f"❌ HTTP Error for industry '{industry_key}':")
+        print(f"   Status Code: {e.response.status_code}")
+        print(f"   Response: {e.response.text}")
+        print(f"   Config used: {json.dumps(config, indent=2)}")
+        return False
 
-        run_data = status_resp.json()["data"]
-        status = run_data["status"]
-        print(f"⏳ Status: {status}")
 
-        if status == "SUCCEEDED":
-            dataset_id = run_data["defaultDatasetId"]
-            break
+async def async_apify_apollo_scrape_all(industries, output_apollo_scraped_file_path, max_in_flight=None, cache_report=None):
+    """Async counterpart of apify_apollo_scrape_all; returns the same per-industry statuses"""
+    semaphore = asyncio.Semaphore(max_in_flight or APOLLO_MAX_IN_FLIGHT)
+    jobs = [
+        (industry_key, config)
+        for industry_obj in industries
+        for industry_key, config in industry_obj.items()
+    ]
 
-        if status in {"FAILED", "ABORTED", "TIMED-OUT"}:
-            raise RuntimeError(f"Apollo scraper failed with status: {status}")
+    async def scrape(industry_key, config):
+        async with semaphore:
+            try:
+                if await async_apify_apollo_scraper(industry_key, config, output_apollo_scraped_file_path, cache_report):
+                    return industry_key, "completed"
+                return industry_key, "failed: HTTP error"
+            except Exception as e:
+                print(f"❌ {industry_key} → {e}")
+                return industry_key, f"failed: {str(e)}"
 
-        time.sleep(30)
+    return dict(await asyncio.gather(*(scrape(key, config) for key, config in jobs)))
 
-    # 3️⃣ Fetch dataset items (REAL DATA)
-    dataset_url = f"https://api.apify.com/v2/datasets/{dataset_id}/items"
-    data_resp = requests.get(
-        dataset_url,
-        params={"token": APIFY_TOKEN, "format": "json"},
-    )
-    data_resp.raise_for_status()
 
-    items = data_resp.json()
-    return items
+def apify_actor_status(run_id):
+    # Long-poll until the actor is completed
+    run_data = wait_for_apify_run(run_id, label="Apollo scraper")
+
+    # 3️⃣ Fetch dataset items (REAL DATA)
+    return fetch_dataset_items(run_data["defaultDatasetId"])
@@ -0,0 +1,111 @@
+"""
+Async HTTP Client
+One shared httpx.AsyncClient per event loop, with the same retry rules and metrics as httpClient
+"""
+
+import asyncio
+import os
+import time
+import weakref
+import httpx
+from dotenv import load_dotenv
+from toolkit.httpClient import (
+    HTTP_MAX_RETRIES,
+    HTTP_MAX_RETRY_AFTER_SECONDS,
+    HTTP_TIMEOUT_SECONDS,
+    IDEMPOTENT_METHODS,
+    RETRY_STATUSES,
+    backoff_delay,
+    host_of,
+    record_http_call,
+    retry_after_seconds,
+)
+from toolkit.vendorQuota import async_vendor_slot, drain_vendor
+
+load_dotenv()
+
+# Requests one event loop may have open at once, across every vendor
+ASYNC_HTTP_MAX_CONNECTIONS = int(os.getenv("ASYNC_HTTP_MAX_CONNECTIONS", "200"))
+ASYNC_HTTP_MAX_KEEPALIVE = int(os.getenv("ASYNC_HTTP_MAX_KEEPALIVE", "50"))
+
+# httpx clients are bound to the loop they were first used on
+_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_client():
+    """Shared AsyncClient for the running event loop, created on first use"""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=HTTP_TIMEOUT_SECONDS,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=ASYNC_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=ASYNC_HTTP_MAX_KEEPALIVE,
+            ),
+        )
+        _clients[loop] = client
+    return client
+
+
+async def close_async_client():
+    """Close the running loop's client; call before the loop exits (e.g. at the end of an async runner)"""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+async def async_request(method, url, timeout=None, retries=None, retry_post=False, **kwargs):
+    """
+    Async counterpart of httpClient.http_request
+
+    Transport errors and 429/5xx responses are retried with jittered backoff (or
+    Retry-After) for idempotent methods, and for POST only with retry_post=True.
+    Attempts share the same process-wide vendor budgets as the sync client.
+
+    Returns:
+        The final httpx.Response (callers still check status / raise_for_status)
+    """
+    method = method.upper()
+    timeout = HTTP_TIMEOUT_SECONDS if timeout is None else timeout
+    retries = HTTP_MAX_RETRIES if retries is None else retries
+    if method not in IDEMPOTENT_METHODS and not retry_post:
+        retries = 0
+
+    client = get_async_client()
+    host = host_of(url)
+
+    for attempt in range(retries + 1):
+        try:
+            async with async_vendor_slot(url):
+                started = time.monotonic()
+                response = await client.request(method, url, timeout=timeout, **kwargs)
+        except httpx.TransportError:
+            record_http_call(host, time.monotonic() - started, None)
+            if attempt >= retries:
+                raise
+            await asyncio.sleep(backoff_delay(attempt))
+            continue
+
+        record_http_call(host, time.monotonic() - started, response.status_code)
+        if response.status_code == 429:
+            drain_vendor(url)
+        if response.status_code not in RETRY_STATUSES or attempt >= retries:
+            return response
+
+        delay = retry_after_seconds(response)
+        if delay is None:
+            delay = backoff_delay(attempt)
+        elif delay > HTTP_MAX_RETRY_AFTER_SECONDS:
+            return response
+        print(f"⏳ {host} returned {response.status_code}, retrying in {delay:.1f}s")
+        await asyncio.sleep(delay)
+
+
+async def async_get(url, **kwargs):
+    return await async_request("GET", url, **kwargs)
+
+
+async def async_post(url, **kwargs):
+    return await async_request("POST", url, **kwargs)
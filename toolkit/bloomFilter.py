@@ -0,0 +1,115 @@
+"""
+Bloom Filter
+Memory-mapped on-disk Bloom filter for probing large suppression key sets in bulk
+"""
+
+import math
+import os
+import struct
+import threading
+import mmh3
+import numpy as np
+
+# magic, bit count, hash count, generation of the data it was built from
+HEADER_FORMAT = "<4sQIQ"
+HEADER_SIZE = 32
+MAGIC = b"BLM1"
+
+
+def bloom_parameters(capacity, fp_rate):
+    """Bit count and hash count for `capacity` keys at the target false-positive rate"""
+    capacity = max(1, int(capacity))
+    bits = math.ceil(-capacity * math.log(fp_rate) / (math.log(2) ** 2))
+    bits = max(64, (bits + 7) // 8 * 8)
+    hashes = max(1, round(bits / capacity * math.log(2)))
+    return bits, hashes
+
+
+def _hash_pairs(keys):
+    """Two independent 64-bit hashes per key (Kirsch-Mitzenmacher double hashing)"""
+    pairs = np.array([mmh3.hash64(key, signed=False) for key in keys], dtype=np.uint64)
+    return pairs.reshape(-1, 2)
+
+
+class BloomFilter:
+    """
+    Bit array memory-mapped from `path`, so only the pages a probe touches are read
+
+    A hit means "probably present" and must be confirmed against the real store;
+    a miss is definite.
+    """
+
+    def __init__(self, path, mode="r"):
+        with open(path, "rb") as f:
+            magic, bits, hashes, generation = struct.unpack(HEADER_FORMAT, f.read(struct.calcsize(HEADER_FORMAT)))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a Bloom filter file")
+        self.path = path
+        self.bits = bits
+        self.hashes = hashes
+        self.generation = generation
+        self.array = np.memmap(path, dtype=np.uint8, mode=mode, offset=HEADER_SIZE, shape=(bits // 8,))
+
+    @classmethod
+    def create(cls, path, capacity, fp_rate, generation=0):
+        """Write an empty filter sized for `capacity` keys and open it for writing"""
+        bits, hashes = bloom_parameters(capacity, fp_rate)
+        with open(path, "wb") as f:
+            f.write(struct.pack(HEADER_FORMAT, MAGIC, bits, hashes, generation).ljust(HEADER_SIZE, b"\0"))
+            f.truncate(HEADER_SIZE + bits // 8)
+        return cls(path, mode="r+")
+
+    def _positions(self, keys):
+        pairs = _hash_pairs(keys)
+        steps = np.arange(self.hashes, dtype=np.uint64)
+        # uint64 arithmetic wraps, which is fine for hashing
+        return (pairs[:, :1] + steps * pairs[:, 1:]) % np.uint64(self.bits)
+
+    def add_many(self, keys):
+        keys = list(keys)
+        if not keys:
+            return
+        positions = self._positions(keys).ravel()
+        masks = np.left_shift(1, (positions & np.uint64(7)).astype(np.uint8)).astype(np.uint8)
+        np.bitwise_or.at(self.array, (positions >> np.uint64(3)).astype(np.int64), masks)
+
+    def contains_many(self, keys):
+        """Boolean array, True where the key may be present"""
+        keys = list(keys)
+        if not keys:
+            return np.zeros(0, dtype=bool)
+        positions = self._positions(keys)
+        masks = np.left_shift(1, (positions & np.uint64(7)).astype(np.uint8)).astype(np.uint8)
+        found = self.array[(positions >> np.uint64(3)).astype(np.int64)] & masks
+        return (found != 0).all(axis=1)
+
+    def flush(self):
+        self.array.flush()
+
+
+def build_bloom_filter(path, key_batches, capacity, fp_rate, generation):
+    """
+    Build a filter from batches of keys into a temp file and move it into place
+
+    Args:
+        path: Destination file
+        key_batches: Iterable of key lists (streamed, so the full key set is never in memory)
+        capacity: Expected number of keys
+        fp_rate: Target false-positive rate
+        generation: Version of the source data, stored in the header
+
+    Returns:
+        The filter, opened read-only
+    """
+    tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    try:
+        bloom = BloomFilter.create(tmp_path, capacity, fp_rate, generation)
+        for keys in key_batches:
+            bloom.add_many(keys)
+        bloom.flush()
+        del bloom
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return BloomFilter(path)
@@ -1,5 +1,7 @@
 import pandas as pd
 from toolkit.llmFuncs import llmCall
+from functions.stage_storage import read_stage, write_stage
+from functions.apollo_icp_definitions import EXCLUDED_TITLE_KEYWORDS
 import time
 
 def normalize_apollo_columns(df):
@@ -16,14 +18,14 @@ def normalize_apollo_columns(df):
 
 
 def clean_data(input_apollo_scraped_file_path, output_cleaned_file_path):
-    df = pd.read_csv(input_apollo_scraped_file_path)
+    df = read_stage(input_apollo_scraped_file_path)
     df = normalize_apollo_columns(df)
     df = clean_website_links(df) 
     df = clean_titles(df)
     df = clean_emails(df)
     df = clean_company_names(df)
 
-    df.to_csv(output_cleaned_file_path, index=False)
+    write_stage(df, output_cleaned_file_path)
 
 def clean_titles(df):
     # Cleaning the title column
@@ -89,18 +91,8 @@ def clean_titles(df):
         else:
             newTitle.append(row["title"])
 
-        # Drop assistant, member, research fellow, chief of staff, secretary
-        if("assistant" in row["title"].lower()):
-            dropIndices.append(index)
-        elif("member" in row["title"].lower()):
-            dropIndices.append(index)
-        elif("research fellow" in row["title"].lower()):
-            dropIndices.append(index)
-        elif("chief of staff" in row["title"].lower()):
-            dropIndices.append(index)
-        elif("secretary" in row["title"].lower()):
-            dropIndices.append(index)
-        elif("personal wealth executive" in row["title"].lower()):
+        # Drop assistant, member, research fellow, chief of staff, secretary, ...
+        if any(keyword in row["title"].lower() for keyword in EXCLUDED_TITLE_KEYWORDS):
             dropIndices.append(index)
 
 
@@ -3,11 +3,16 @@ Email Finder Main
 Orchestrates email finding across multiple providers
 """
 
+import asyncio
 import pandas as pd
 import time
 import os
 from urllib.parse import urlparse
-from functions.email_provider import find_email_with_fallback
+from functions.email_provider import find_email_with_fallback, async_find_email_with_fallback
+from toolkit.resultJournal import ResultJournal, journal_path_for
+
+# Domains looked up at once by async_find_emails_for_leads
+EMAIL_FINDER_MAX_IN_FLIGHT = int(os.getenv("EMAIL_FINDER_MAX_IN_FLIGHT", "10"))
 
 
 def extract_domain(website_url):
@@ -46,11 +51,19 @@ def find_emails_for_leads(
         if 'email_source' not in df.columns:
             df['email_source'] = None
 
+        # Restore lookups checkpointed by an earlier run that did not finish
+        journal = ResultJournal(journal_path_for(file_path, "emails"), ['url', 'title', 'address'])
+        resumed = journal.merge_into(df, ['email', 'email_source'])
+
         emails_found = 0
         skipped = 0
         provider_stats = {}
         
         for index, row in df.iterrows():
+            if index in resumed:
+                skipped += 1
+                continue
+
             if pd.notna(row.get('email')) and row.get('email'):
                 skipped += 1
                 continue
@@ -67,6 +80,7 @@ def find_emails_for_leads(
             print(f"🔍 [{index + 1}/{len(df)}] {title} - {domain}")
 
             email, provider = find_email_with_fallback(domain)
+            journal.record(row, {'email': email, 'email_source': provider})
 
             if email:
                 df.at[index, 'email'] = email
@@ -81,11 +95,12 @@ def find_emails_for_leads(
                 time.sleep(delay_between_requests)
 
         df.to_csv(file_path, index=False)
+        journal.remove()
         
         print("=" * 50)
         print(f"✅ Complete! Found {emails_found} new emails")
         if skipped > 0:
-            print(f"⏭️ Skipped {skipped} (already had emails)")
+            print(f"⏭️ Skipped {skipped} (already had emails or restored from journal)")
         
         if provider_stats:
             print("\n📊 Provider Statistics:")
@@ -99,4 +114,65 @@ def find_emails_for_leads(
 
     except Exception as e:
         print(f"❌ Error: {e}")
-        return None
\ No newline at end of file
+        return None
+
+
+def _load_for_lookup(file_path):
+    """Read the leads file and restore lookups checkpointed by an earlier run"""
+    df = pd.read_csv(file_path)
+    print(f"📊 Processing {len(df)} leads\n")
+    if 'email' not in df.columns:
+        df['email'] = None
+    if 'email_source' not in df.columns:
+        df['email_source'] = None
+
+    journal = ResultJournal(journal_path_for(file_path, "emails"), ['url', 'title', 'address'])
+    resumed = journal.merge_into(df, ['email', 'email_source'])
+    return df, journal, resumed
+
+
+def _save_lookups(df, file_path, journal):
+    df.to_csv(file_path, index=False)
+    journal.remove()
+
+
+async def async_find_emails_for_leads(file_path="outputs/google_maps_results.csv", max_in_flight=None):
+    """
+    Async counterpart of find_emails_for_leads
+
+    Up to max_in_flight (default: EMAIL_FINDER_MAX_IN_FLIGHT) leads are looked up
+    at once; each lead still tries the providers one after another.
+    """
+    if not os.path.exists(file_path):
+        print(f"❌ File not found: {file_path}")
+        return None
+
+    df, journal, resumed = await asyncio.to_thread(_load_for_lookup, file_path)
+    semaphore = asyncio.Semaphore(max_in_flight or EMAIL_FINDER_MAX_IN_FLIGHT)
+    provider_stats = {}
+
+    async def lookup(index, row, domain):
+        async with semaphore:
+            email, provider = await async_find_email_with_fallback(domain)
+        await asyncio.to_thread(journal.record, row, {'email': email, 'email_source': provider})
+        if email:
+            df.at[index, 'email'] = email
+            df.at[index, 'email_source'] = provider
+            provider_stats[provider] = provider_stats.get(provider, 0) + 1
+            print(f"✅ {row.get('title', 'Unknown')}: {email} (via {provider})")
+
+    lookups = []
+    for index, row in df.iterrows():
+        if index in resumed or (pd.notna(row.get('email')) and row.get('email')):
+            continue
+        domain = extract_domain(row.get('website'))
+        if domain:
+            lookups.append(lookup(index, row, domain))
+
+    await asyncio.gather(*lookups)
+
+    await asyncio.to_thread(_save_lookups, df, file_path, journal)
+    print(f"✅ Complete! Found {sum(provider_stats.values())} new emails from {len(lookups)} lookups")
+    for provider, count in sorted(provider_stats.items(), key=lambda x: x[1], reverse=True):
+        print(f"   {provider}: {count} emails")
+    return df
@@ -0,0 +1,156 @@
+"""
+Fuzzy Company Matching
+MinHash signatures over character shingles of cleaned company names, bucketed with LSH bands
+so near-duplicate names ("Acme Parks, Inc." / "ACME Parks") are found without pairwise comparison
+"""
+
+import os
+import re
+from collections import defaultdict
+import mmh3
+import numpy as np
+from dotenv import load_dotenv
+from toolkit.cleaning import clean_single_company_name
+
+load_dotenv()
+
+FUZZY_COMPANY_MATCH = os.getenv("FUZZY_COMPANY_MATCH", "true").lower() == "true"
+# Shingle Jaccard similarity at or above which two names are the same company
+FUZZY_COMPANY_THRESHOLD = float(os.getenv("FUZZY_COMPANY_THRESHOLD", "0.8"))
+FUZZY_COMPANY_NUM_PERM = int(os.getenv("FUZZY_COMPANY_NUM_PERM", "128"))
+FUZZY_COMPANY_SHINGLE_SIZE = int(os.getenv("FUZZY_COMPANY_SHINGLE_SIZE", "3"))
+
+# Legal-form words clean_single_company_name misses once a name is lower-cased
+LEGAL_SUFFIXES = {"inc", "llc", "ltd", "co", "corp", "corporation", "company", "pvt", "plc", "gmbh", "limited"}
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+# Fixed seed so signatures are comparable across runs
+PERMUTATION_SEED = 1
+# Probability that two names exactly at the threshold share an LSH band (and get compared)
+LSH_TARGET_RECALL = 0.95
+
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_company_name(name):
+    """clean_single_company_name, then lower-case, punctuation to spaces and trailing legal forms dropped"""
+    if name is None:
+        return ""
+    name = str(name).strip()
+    if not name or name.lower() in ("nan", "none"):
+        return ""
+    tokens = _NON_ALNUM_RE.sub(" ", clean_single_company_name(name).lower()).split()
+    while len(tokens) > 1 and tokens[-1] in LEGAL_SUFFIXES:
+        tokens.pop()
+    return " ".join(tokens)
+
+
+def shingles(name, size=None):
+    """Character shingles of a normalized name (the whole name when it is shorter than one shingle)"""
+    size = size or FUZZY_COMPANY_SHINGLE_SIZE
+    padded = f" {name} "
+    if len(padded) <= size:
+        return {padded}
+    return {padded[i:i + size] for i in range(len(padded) - size + 1)}
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+def lsh_bands(threshold, num_perm, recall=None):
+    """
+    (bands, rows) with bands * rows <= num_perm for the LSH index
+
+    Picks the most selective split (most rows per band) that still makes a pair at
+    exactly `threshold` a candidate with probability >= recall, 1 - (1 - t^r)^b.
+    Centring the S-curve on the threshold instead would miss about half of those pairs.
+    """
+    recall = LSH_TARGET_RECALL if recall is None else recall
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        if 1 - (1 - threshold ** rows) ** bands >= recall:
+            best = (bands, rows)
+    return best
+
+
+class CompanyNameMatcher:
+    """
+    LSH index of the company names to check (e.g. one run's Apollo leads)
+
+        matcher = CompanyNameMatcher()
+        matcher.add_many(apollo_company_names)
+        matched = set()
+        for batch in instantly_company_name_batches:
+            matched |= matcher.find_matches(batch)  # Apollo names close to a name in the batch
+
+    Only the indexed side is kept in memory; reference names are streamed through
+    find_matches() and dropped. Both steps are linear in the number of names; only
+    names sharing an LSH band are compared, and every candidate is confirmed by
+    exact shingle Jaccard similarity against the threshold.
+    """
+
+    def __init__(self, threshold=None, num_perm=None, shingle_size=None):
+        self.threshold = FUZZY_COMPANY_THRESHOLD if threshold is None else threshold
+        self.shingle_size = shingle_size or FUZZY_COMPANY_SHINGLE_SIZE
+        num_perm = num_perm or FUZZY_COMPANY_NUM_PERM
+        self.bands, self.rows = lsh_bands(self.threshold, num_perm)
+        generator = np.random.RandomState(PERMUTATION_SEED)
+        self.a = generator.randint(1, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self.b = generator.randint(0, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self.buckets = [defaultdict(list) for _ in range(self.bands)]
+        # normalized name -> shingles, and -> the raw spellings that normalize to it
+        self.indexed = {}
+        self.raw_names = defaultdict(set)
+
+    def _signature(self, name_shingles):
+        hashes = np.array([mmh3.hash(s, signed=False) for s in name_shingles], dtype=np.uint64)
+        # uint64 products wrap, which keeps this a valid hash family
+        permuted = (np.outer(hashes, self.a) + self.b) % MERSENNE_PRIME & MAX_HASH
+        return permuted.min(axis=0)
+
+    def _band_keys(self, signature):
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def add_many(self, names):
+        """Index names to check (raw; normalized here)"""
+        for raw in names:
+            name = normalize_company_name(raw)
+            if not name:
+                continue
+            self.raw_names[name].add(raw)
+            if name in self.indexed:
+                continue
+            name_shingles = shingles(name, self.shingle_size)
+            self.indexed[name] = name_shingles
+            for band, key in enumerate(self._band_keys(self._signature(name_shingles))):
+                self.buckets[band][key].append(name)
+
+    def _scored_candidates(self, raw):
+        """(indexed name, Jaccard score) of every indexed name sharing an LSH band with `raw`"""
+        name = normalize_company_name(raw)
+        if not name or not self.indexed:
+            return []
+        name_shingles = shingles(name, self.shingle_size)
+        candidates = {name} if name in self.indexed else set()
+        for band, key in enumerate(self._band_keys(self._signature(name_shingles))):
+            candidates.update(self.buckets[band].get(key, ()))
+        return [(candidate, jaccard(name_shingles, self.indexed[candidate])) for candidate in candidates]
+
+    def match(self, raw):
+        """Indexed name most similar to `raw` at or above the threshold, or None"""
+        best, best_score = None, self.threshold
+        for candidate, score in self._scored_candidates(raw):
+            if score >= best_score:
+                best, best_score = candidate, score
+        return best
+
+    def find_matches(self, names):
+        """Raw spellings of every indexed name at or above the threshold for at least one of `names`"""
+        matched = set()
+        for raw in set(names):
+            for candidate, score in self._scored_candidates(raw):
+                if score >= self.threshold:
+                    matched.update(self.raw_names[candidate])
+        return matched
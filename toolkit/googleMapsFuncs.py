@@ -5,9 +5,20 @@ Uses compass/crawler-google-places actor
 
 import requests
 import os
-import time
+import threading
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from toolkit.httpClient import http_post
+from toolkit.apifyFuncs import (
+    wait_for_apify_run,
+    start_or_resume_run,
+    fetch_dataset_items,
+    iter_run_pages,
+    append_rows_to_csv,
+)
+from toolkit.scrapeCache import get_cached_pages, ScrapeCacheWriter
+from toolkit.runJournal import mark_run
 
 # Load environment variables
 load_dotenv()
@@ -32,7 +43,87 @@ essential_fields = [
 APIFY_TOKEN = os.getenv("APIFY_API_TOKEN")
 ACTOR_ID="compass~crawler-google-places"
 
-def apify_google_maps_scraper(config, output_file_path, icp=None,location="us"):
+# Search strings per actor run in batched mode (0 = all searches in a single run)
+GOOGLE_MAPS_BATCH_SHARD_SIZE = int(os.getenv("GOOGLE_MAPS_BATCH_SHARD_SIZE", "0"))
+
+# Serialises appends to the shared CSV when several sharded runs finish together
+_output_lock = threading.Lock()
+
+
+def prepare_google_maps_items(items, icp=None, location=None, search_lookup=None):
+    """
+    Keep only essential fields, tag rows with ICP/location and drop closed businesses
+
+    Args:
+        items: List of place dicts returned by the actor
+        icp: Ideal Customer Profile identifier
+        location: Location the search was run for
+        search_lookup: Optional {lowercased search string: (icp, location)} used to tag
+            items of a batched run through the `searchString` the actor echoes back
+
+    Returns:
+        DataFrame ready to be appended to the output CSV
+    """
+    filtered_items = []
+    for item in items:
+        filtered_item = {field: item.get(field) for field in essential_fields}
+
+        if search_lookup:
+            search_key = str(item.get('searchString') or '').strip().lower()
+            icp, location = search_lookup.get(search_key, (None, None))
+
+        # Add ICP column if provided
+        if icp:
+            filtered_item['icp'] = icp
+        if location:
+            filtered_item['location'] = location
+
+        filtered_items.append(filtered_item)
+
+    df = pd.DataFrame(filtered_items)
+    print(f"📊 DataFrame shape: {df.shape}")
+
+    # Filter out permanently or temporarily closed businesses
+    if 'permanentlyClosed' in df.columns:
+        initial_count = len(df)
+        df = df[df['permanentlyClosed'] != True]
+        removed = initial_count - len(df)
+        if removed > 0:
+            print(f"🚫 Filtered out {removed} permanently closed businesses")
+
+    if 'temporarilyClosed' in df.columns:
+        initial_count = len(df)
+        df = df[df['temporarilyClosed'] != True]
+        removed = initial_count - len(df)
+        if removed > 0:
+            print(f"⏸️ Filtered out {removed} temporarily closed businesses")
+
+    return df
+
+
+def start_google_maps_run(config):
+    """Start the Google Maps actor asynchronously and return the Apify run data"""
+    start_url = f"https://api.apify.com/v2/acts/{ACTOR_ID}/runs"
+
+    print(f"🔗 Calling Apify API: {start_url}")
+
+    start_resp = http_post(
+        start_url,
+        params={"token": APIFY_TOKEN},
+        json=config,
+        headers={"Content-Type": "application/json"},
+    )
+
+    if not start_resp.ok:
+        print(f"❌ Error response ({start_resp.status_code}): {start_resp.text}")
+        start_resp.raise_for_status()
+
+    run = start_resp.json()["data"]
+    print(f"🆔 Run ID: {run['id']}")
+    return run
+
+
+def apify_google_maps_scraper(config, output_file_path, icp=None,location="us", search_lookup=None, cache_report=None):
     """
     Scrape Google Maps using Apify actor (compass/crawler-google-places)
 
@@ -40,87 +131,52 @@ def apify_google_maps_scraper(config, output_file_path, icp=None,location="us"):
         config: Configuration dict for the Google Maps scraper
         output_file_path: Path to save the scraped data CSV
         icp: Ideal Customer Profile identifier (e.g., "Search for stadium")
+        search_lookup: Optional {search string: (icp, location)} for batched runs
+        cache_report: Optional dict filled with "hit"/"miss" per search string
+
+    Returns:
+        Number of records saved, or None on error
     """
     print("🗺️ Starting Google Maps scraper (async)")
     
   
     
     try:
-        # 1. Start actor asynchronously
-        start_url = f"https://api.apify.com/v2/acts/{ACTOR_ID}/runs"
-        
-        print(f"🔗 Calling Apify API: {start_url}")
-        
-        start_resp = requests.post(
-            start_url,
-            params={"token": APIFY_TOKEN},
-            json=config,
-            headers={"Content-Type": "application/json"},
-        )
-        
-        if not start_resp.ok:
-            print(f"❌ Error response ({start_resp.status_code}): {start_resp.text}")
-            start_resp.raise_for_status()
-        
-        run_id = start_resp.json()["data"]["id"]
-        print(f"🆔 Run ID: {run_id}")
-        
-        # 2. Poll run status until completed
-        print(f"⏳ Polling status for run {run_id}...")
-        items = apify_actor_status(run_id)
-        print(f"✅ Received {len(items)} items from Apify")
-        
-        # 3. Filter to only essential fields
-        filtered_items = []
-        for item in items:
-            filtered_item = {field: item.get(field) for field in essential_fields}
-            
-            # Add ICP column if provided
-            if icp:
-                filtered_item['icp'] = icp
-            if location:
-                filtered_item['location']=location    
-            
-            filtered_items.append(filtered_item)
-        
-        # 4. Save results to CSV
         path = output_file_path
-        output_dir = os.path.dirname(path)
-        if output_dir:
-            print(f"📂 Creating directory: {output_dir}")
-            os.makedirs(output_dir, exist_ok=True)
-        
-        df = pd.DataFrame(filtered_items)
-        print(f"📊 DataFrame shape: {df.shape}")
-        
-        # Filter out permanently or temporarily closed businesses
-        if 'permanentlyClosed' in df.columns:
-            initial_count = len(df)
-            df = df[df['permanentlyClosed'] != True]
-            removed = initial_count - len(df)
-            if removed > 0:
-                print(f"🚫 Filtered out {removed} permanently closed businesses")
-        
-        if 'temporarilyClosed' in df.columns:
-            initial_count = len(df)
-            df = df[df['temporarilyClosed'] != True]
-            removed = initial_count - len(df)
-            if removed > 0:
-                print(f"⏸️ Filtered out {removed} temporarily closed businesses")
-        
-        # Append if file exists, else create
-        file_exists = os.path.exists(path)
-        print(f"📝 {'Appending to' if file_exists else 'Creating'} file: {path}")
-        
-        df.to_csv(
-            path,
-            mode="a",
-            header=not file_exists,
-            index=False
-        )
-        
-        print(f"✅ Saved {len(df)} records to {path}")
-        return df
+        fields = essential_fields + ['searchString'] if search_lookup else essential_fields
+
+        # 0. Serve identical configs from the local scrape cache
+        cached_pages = get_cached_pages(ACTOR_ID, config)
+        if cache_report is not None:
+            for search in config.get("searchStringsArray", []):
+                cache_report[search] = "hit" if cached_pages is not None else "miss"
+        if cached_pages is not None:
+            print("♻️ Scrape cache hit, skipping Apify run")
+            saved = 0
+            for items in cached_pages:
+                df = prepare_google_maps_items(items, icp=icp, location=location, search_lookup=search_lookup)
+                append_rows_to_csv(df, path, lock=_output_lock)
+                saved += len(df)
+            print(f"✅ Saved {saved} records to {path}")
+            return saved
+
+        # 1. Start actor asynchronously (or reattach to a journaled run after a restart)
+        # 2. Poll run status until completed
+        run_data = start_or_resume_run(ACTOR_ID, config, start_google_maps_run, label="Google Maps scraper")
+
+        # 3. Stream essential fields page by page and append each page to the CSV (and the scrape cache)
+        print(f"📝 Streaming rows to: {path}")
+        saved = 0
+        pages, resumed_at = iter_run_pages(ACTOR_ID, config, run_data, fields=fields)
+        with ScrapeCacheWriter(ACTOR_ID, config, enabled=not resumed_at) as cache_writer:
+            for items in cache_writer.tee(pages):
+                df = prepare_google_maps_items(items, icp=icp, location=location, search_lookup=search_lookup)
+                append_rows_to_csv(df, path, lock=_output_lock)
+                saved += len(df)
+        mark_run(ACTOR_ID, config, "collected")
+
+        print(f"✅ Saved {saved} records to {path}")
+        return saved
         
     except requests.exceptions.HTTPError as e:
         print(f"❌ HTTP Error:")
@@ -140,50 +196,22 @@ def apify_google_maps_scraper(config, output_file_path, icp=None,location="us"):
 
 def apify_actor_status(run_id):
     """
-    Poll Apify actor status until completion and return results
-    
+    Wait for the Apify actor run to complete and return results
+
     Args:
         run_id: The Apify run ID to check
-        
+
     Returns:
         List of items from the completed run
     """
-    status_url = f"https://api.apify.com/v2/actor-runs/{run_id}"
-    
-    # Checking the status every 30 seconds until actor is completed
-    while True:
-        status_resp = requests.get(status_url, params={"token": APIFY_TOKEN})
-        status_resp.raise_for_status()
-        
-        run_data = status_resp.json()["data"]
-        status = run_data["status"]
-        print(f"Status: {status}")
-        
-        if status == "SUCCEEDED":
-            dataset_id = run_data["defaultDatasetId"]
-            break
-        
-        if status in {"FAILED", "ABORTED", "TIMED-OUT"}:
-            # Get error details
-            error_info = run_data.get("statusMessage", "No error message available")
-            print(f"Error details: {error_info}")
-            raise RuntimeError(f"Google Maps scraper failed with status: {status}. Error: {error_info}")
-        
-        time.sleep(30)
-    
+    # Long-poll until actor is completed
+    run_data = wait_for_apify_run(run_id, label="Google Maps scraper")
+
     # 3. Fetch dataset items (REAL DATA)
-    dataset_url = f"https://api.apify.com/v2/datasets/{dataset_id}/items"
-    data_resp = requests.get(
-        dataset_url,
-        params={"token": APIFY_TOKEN, "format": "json"},
-    )
-    data_resp.raise_for_status()
-    
-    items = data_resp.json()
-    return items
+    return fetch_dataset_items(run_data["defaultDatasetId"])
 
 
-def scrape_google_maps_by_query(query, max_results=100, output_file_path="outputs/google_maps_results.csv", language="en", country_code="us", icp=None,location="us"):
+def scrape_google_maps_by_query(query, max_results=100, output_file_path="outputs/google_maps_results.csv", language="en", country_code="us", icp=None,location="us", cache_report=None):
     """
     Scrape Google Maps by search query
 
@@ -194,9 +222,10 @@ def scrape_google_maps_by_query(query, max_results=100, output_file_path="output
         language: Language code (default: "en")
         country_code: Country code in lowercase (default: "us")
         icp: Ideal Customer Profile identifier (e.g., "Search for stadium")
+        cache_report: Optional dict filled with "hit"/"miss" per search string
 
     Returns:
-        DataFrame with scraped results
+        Number of records saved, or None on error
     """
     config = {
         "searchStringsArray": [query],  # Actor expects searchStringsArray, not queries
@@ -206,5 +235,55 @@ def scrape_google_maps_by_query(query, max_results=100, output_file_path="output
     }
     
 
-    return apify_google_maps_scraper(config, output_file_path, icp=icp,location=location)
+    return apify_google_maps_scraper(config, output_file_path, icp=icp,location=location, cache_report=cache_report)
+
+
+
+def scrape_google_maps_batch(searches, max_results=100, output_file_path="outputs/google_maps_results.csv", language="en", country_code="us", shard_size=None, cache_report=None):
+    """
+    Scrape many query/location searches in one actor run (or a few sharded runs)
+
+    Every search string goes into a single `searchStringsArray`, so actor cold start
+    and polling are paid once per shard instead of once per location. Each returned
+    place is mapped back to its ICP and location through the `searchString` the
+    actor echoes back.
+
+    Args:
+        searches: List of (icp, location) pairs; the search string is "<icp> <location>"
+        max_results: Maximum number of results per search string
+        output_file_path: Path to save results
+        language: Language code (default: "en")
+        country_code: Country code in lowercase (default: "us")
+        shard_size: Search strings per run (default: GOOGLE_MAPS_BATCH_SHARD_SIZE, 0 = one run)
+        cache_report: Optional dict filled with "hit"/"miss" per search string
+
+    Returns:
+        Dict of {icp: {location: "completed" | "failed: <reason>"}}
+    """
+    search_lookup = {f"{icp} {location}": (icp, location) for icp, location in searches}
+    search_strings = list(search_lookup)
+
+    shard_size = GOOGLE_MAPS_BATCH_SHARD_SIZE if shard_size is None else shard_size
+    if not shard_size:
+        shard_size = len(search_strings) or 1
+    shards = [search_strings[i:i + shard_size] for i in range(0, len(search_strings), shard_size)]
+    print(f"🗺️ Batching {len(search_strings)} searches into {len(shards)} actor run(s)")
+
+    def run_shard(shard):
+        config = {
+            "searchStringsArray": shard,
+            "maxCrawledPlacesPerSearch": max_results,
+            "language": language,
+            "countryCode": country_code.lower()  # Must be lowercase
+        }
+        shard_lookup = {search.strip().lower(): search_lookup[search] for search in shard}
+        return apify_google_maps_scraper(config, output_file_path, search_lookup=shard_lookup, cache_report=cache_report)
+
+    statuses = {}
+    with ThreadPoolExecutor(max_workers=len(shards) or 1) as executor:
+        for shard, saved in zip(shards, executor.map(run_shard, shards)):
+            for search in shard:
+                icp, location = search_lookup[search]
+                statuses.setdefault(icp, {})[location] = "completed" if saved is not None else "failed: actor run failed"
 
+    return statuses
@@ -0,0 +1,193 @@
+"""
+HTTP Client
+Shared keep-alive sessions per host with default timeouts, Retry-After aware retries and per-host metrics
+"""
+
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+from toolkit.vendorQuota import drain_vendor, vendor_slot
+
+load_dotenv()
+
+HTTP_TIMEOUT_SECONDS = float(os.getenv("HTTP_TIMEOUT_SECONDS", "30"))
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+# Connections kept alive per host (should cover the largest worker pool hitting one host)
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "32"))
+# Least recently used host sessions are closed beyond this many hosts
+HTTP_MAX_SESSIONS = int(os.getenv("HTTP_MAX_SESSIONS", "256"))
+# Longest Retry-After we are willing to honour before giving up on the retry
+HTTP_MAX_RETRY_AFTER_SECONDS = 120
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+_lock = threading.Lock()
+_sessions = OrderedDict()
+_stats = {}
+
+
+def host_of(url):
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+def get_session(url):
+    """Keep-alive session for the URL's scheme + host, created on first use"""
+    host = host_of(url)
+    with _lock:
+        session = _sessions.get(host)
+        if session is not None:
+            _sessions.move_to_end(host)
+            return session
+
+        session = requests.Session()
+        # Retries are handled in http_request so they can honour Retry-After and be counted
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE, max_retries=0)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _sessions[host] = session
+
+        while len(_sessions) > HTTP_MAX_SESSIONS:
+            _, evicted = _sessions.popitem(last=False)
+            evicted.close()
+        return session
+
+
+def record_http_call(host, seconds, status):
+    """Add one call to the per-host metrics (status None = connection error / timeout)"""
+    with _lock:
+        stats = _stats.setdefault(host, {"calls": 0, "errors": 0, "seconds": 0.0, "statuses": {}})
+        stats["calls"] += 1
+        stats["seconds"] += seconds
+        if status is None:
+            stats["errors"] += 1
+        else:
+            stats["statuses"][status] = stats["statuses"].get(status, 0) + 1
+
+
+def retry_after_seconds(response):
+    """Parse a Retry-After header (seconds or HTTP date), or None if absent / unparseable"""
+    value = response.headers.get("Retry-After") if response is not None else None
+    if not value:
+        return None
+    value = value.strip()
+    if value.replace(".", "", 1).isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def backoff_delay(attempt, base=1.0, cap=60.0):
+    """Full-jitter exponential backoff"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def http_request(method, url, timeout=None, retries=None, retry_post=False, **kwargs):
+    """
+    Send a request through the host's pooled session
+
+    Connection errors, timeouts and 429/5xx responses are retried with jittered
+    backoff (or the server's Retry-After) for idempotent methods. POST is only
+    retried when retry_post=True, i.e. for read-only endpoints such as searches.
+    Every attempt holds a slot of the host's vendor budget (see vendorQuota), and
+    a 429 drains that budget for every pipeline in the process.
+
+    Args:
+        method: HTTP method
+        url: Absolute URL
+        timeout: Seconds (default: HTTP_TIMEOUT_SECONDS)
+        retries: Extra attempts (default: HTTP_MAX_RETRIES; 0 when the caller retries itself)
+        retry_post: Allow retrying a POST
+        **kwargs: Passed to requests (params, json, data, headers, files, stream, ...)
+
+    Returns:
+        The final requests.Response (callers still check status / raise_for_status)
+    """
+    method = method.upper()
+    timeout = HTTP_TIMEOUT_SECONDS if timeout is None else timeout
+    retries = HTTP_MAX_RETRIES if retries is None else retries
+    if method not in IDEMPOTENT_METHODS and not retry_post:
+        retries = 0
+
+    session = get_session(url)
+    host = host_of(url)
+
+    for attempt in range(retries + 1):
+        try:
+            with vendor_slot(url):
+                started = time.monotonic()
+                response = session.request(method, url, timeout=timeout, **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            record_http_call(host, time.monotonic() - started, None)
+            if attempt >= retries:
+                raise
+            time.sleep(backoff_delay(attempt))
+            continue
+
+        record_http_call(host, time.monotonic() - started, response.status_code)
+        if response.status_code == 429:
+            drain_vendor(url)
+        if response.status_code not in RETRY_STATUSES or attempt >= retries:
+            return response
+
+        delay = retry_after_seconds(response)
+        if delay is None:
+            delay = backoff_delay(attempt)
+        elif delay > HTTP_MAX_RETRY_AFTER_SECONDS:
+            return response
+        print(f"⏳ {host} returned {response.status_code}, retrying in {delay:.1f}s")
+        response.close()
+        time.sleep(delay)
+
+
+def http_get(url, **kwargs):
+    return http_request("GET", url, **kwargs)
+
+
+def http_post(url, **kwargs):
+    return http_request("POST", url, **kwargs)
+
+
+def get_http_stats():
+    """Snapshot of the process-wide per-host call counts, errors, latency and status codes"""
+    with _lock:
+        return {
+            host: {**stats, "statuses": dict(stats["statuses"])}
+            for host, stats in _stats.items()
+        }
+
+
+def http_stats_since(snapshot):
+    """Per-host calls, average latency and status counts since an earlier get_http_stats() snapshot"""
+    report = {}
+    for host, stats in get_http_stats().items():
+        before = snapshot.get(host, {"calls": 0, "errors": 0, "seconds": 0.0, "statuses": {}})
+        calls = stats["calls"] - before["calls"]
+        if not calls:
+            continue
+        statuses = {
+            status: count - before["statuses"].get(status, 0)
+            for status, count in stats["statuses"].items()
+            if count - before["statuses"].get(status, 0)
+        }
+        report[host] = {
+            "calls": calls,
+            "errors": stats["errors"] - before["errors"],
+            "avg_seconds": round((stats["seconds"] - before["seconds"]) / calls, 3),
+            "statuses": statuses,
+        }
+    return report
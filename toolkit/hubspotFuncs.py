@@ -1,5 +1,9 @@
+import asyncio
+import httpx
 import requests
 from dotenv import load_dotenv
+from toolkit.asyncHttp import async_get
+from toolkit.httpClient import http_get
 import os
 import pandas as pd
 
@@ -9,15 +13,17 @@ HUBSPOT_CONTACTS_URL = "https://api.hubapi.com/crm/v3/objects/contacts"
 HUBSPOT_TOKEN = os.getenv("HUBSPOT_API_KEY")
 
 
-def get_contacts(output_hubspot_leads: str):
-    headers = {
+def _headers():
+    return {
         "Authorization": f"Bearer {HUBSPOT_TOKEN}",
         "Content-Type": "application/json"
     }
 
-    response = requests.get(
+
+def get_contacts(output_hubspot_leads: str):
+    response = http_get(
         HUBSPOT_CONTACTS_URL,
-        headers=headers,
+        headers=_headers(),
         timeout=30
     )
 
@@ -29,7 +35,25 @@ def get_contacts(output_hubspot_leads: str):
             "error": response.text
         }
 
-    data = response.json()
+    return _save_contacts(response.json(), output_hubspot_leads)
+
+
+async def async_get_contacts(output_hubspot_leads: str):
+    """Async counterpart of get_contacts"""
+    response = await async_get(HUBSPOT_CONTACTS_URL, headers=_headers(), timeout=30)
+
+    try:
+        response.raise_for_status()
+    except httpx.HTTPStatusError:
+        return {
+            "status_code": response.status_code,
+            "error": response.text
+        }
+
+    return await asyncio.to_thread(_save_contacts, response.json(), output_hubspot_leads)
+
+
+def _save_contacts(data, output_hubspot_leads):
     # data["results"] is a list of objects with a nested "properties" dict
 
     # 1) Normalize nested JSON to pull properties.*
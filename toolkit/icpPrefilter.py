@@ -0,0 +1,178 @@
+"""
+ICP Pre-filter
+Cheap, vectorized rule scoring that settles obvious accepts/rejects before paid LLM scoring
+"""
+
+import os
+import re
+import pandas as pd
+from dotenv import load_dotenv
+from functions.apollo_icp_definitions import (
+    EXCLUDED_TITLE_KEYWORDS,
+    get_industry_config,
+    get_size_ranges_for_industry,
+)
+from functions.gmaps_icp_definitions import get_min_reviews_for_gmaps_search
+from functions.hubspot_icp_defination import PERSONAL_EMAIL_DOMAINS
+
+load_dotenv()
+
+ICP_PREFILTER_ENABLED = os.getenv("ICP_PREFILTER_ENABLED", "true").lower() == "true"
+# The pre-filter only rejects by default; auto-accepting skips the LLM ranking, so it is opt-in
+ICP_PREFILTER_ACCEPT = os.getenv("ICP_PREFILTER_ACCEPT", "false").lower() == "true"
+# Seniorities an opt-in accept requires (the scraper filters by title, not seniority)
+PREFILTER_ACCEPT_SENIORITIES = [
+    s.strip().lower() for s in os.getenv("ICP_PREFILTER_ACCEPT_SENIORITIES", "c_suite,founder").split(",") if s.strip()
+]
+# Deterministic scores given to clear rejects / accepts
+PREFILTER_REJECT_SCORE = float(os.getenv("ICP_PREFILTER_REJECT_SCORE", "1.0"))
+PREFILTER_ACCEPT_SCORE = float(os.getenv("ICP_PREFILTER_ACCEPT_SCORE", "8.0"))
+# Venues with fewer reviews than this fraction of their ICP's minimum are rejected
+GMAPS_REJECT_REVIEW_FRACTION = 0.1
+
+
+def _text(series):
+    return series.astype(str).str.strip().str.lower().replace("nan", "")
+
+
+def _empty_result(df):
+    return pd.DataFrame({"score": pd.Series(float("nan"), index=df.index), "reason": pd.Series(None, index=df.index, dtype=object)})
+
+
+def _keyword_pattern(keywords):
+    return "|".join(re.escape(k.lower()) for k in keywords)
+
+
+def prefilter_apollo_leads(df):
+    """
+    Rules from the industry configs in apollo_input_data.py:
+    - reject: company size outside every configured `size` bucket
+    - reject: title containing an excluded keyword (same list clean_titles drops)
+    - accept (only with ICP_PREFILTER_ACCEPT=true): on top of the scraper's own
+      title and size filters, a seniority in ICP_PREFILTER_ACCEPT_SENIORITIES and a
+      company description that mentions one of the industry's company_keywords
+
+    Returns:
+        DataFrame with `score` (NaN = ambiguous) and `reason`, indexed like df
+    """
+    result = _empty_result(df)
+    if df.empty:
+        return result
+
+    titles = _text(df.get("job_title", pd.Series("", index=df.index)))
+    seniorities = _text(df.get("seniority_level", pd.Series("", index=df.index)))
+    descriptions = _text(df.get("company_description", pd.Series("", index=df.index)))
+    sizes = pd.to_numeric(df.get("company_size", pd.Series(index=df.index, dtype=float)), errors="coerce")
+    industries = df.get("industry", pd.Series("", index=df.index)).astype(str).str.strip()
+
+    size_known = sizes.notna()
+    size_in_bucket = pd.Series(False, index=df.index)
+    size_configured = pd.Series(False, index=df.index)
+    target_title = pd.Series(False, index=df.index)
+    described = pd.Series(False, index=df.index)
+
+    for industry in industries.unique():
+        rows = industries == industry
+        ranges = get_size_ranges_for_industry(industry)
+        if ranges:
+            size_configured |= rows
+            in_any = pd.Series(False, index=df.index)
+            for low, high in ranges:
+                in_any |= sizes.between(low, high)
+            size_in_bucket |= rows & in_any
+
+        targets = get_industry_config(industry).get("contact_job_title", [])
+        if targets:
+            target_title |= rows & titles.str.contains(_keyword_pattern(targets), regex=True)
+
+        keywords = get_industry_config(industry).get("company_keywords", [])
+        if keywords:
+            described |= rows & descriptions.str.contains(_keyword_pattern(keywords), regex=True)
+
+    excluded_title = titles.str.contains(_keyword_pattern(EXCLUDED_TITLE_KEYWORDS), regex=True)
+    size_rejected = size_configured & size_known & ~size_in_bucket
+
+    if ICP_PREFILTER_ACCEPT:
+        senior = seniorities.isin(PREFILTER_ACCEPT_SENIORITIES)
+        accept = target_title & size_in_bucket & senior & described & ~excluded_title
+        result.loc[accept, "score"] = PREFILTER_ACCEPT_SCORE
+        result.loc[accept, "reason"] = "senior target title, size in bucket and description matches the industry keywords"
+
+    result.loc[size_rejected, "score"] = PREFILTER_REJECT_SCORE
+    result.loc[size_rejected, "reason"] = "company size outside the industry's configured buckets"
+
+    result.loc[excluded_title, "score"] = PREFILTER_REJECT_SCORE
+    result.loc[excluded_title, "reason"] = "job title is on the excluded list"
+    return result
+
+
+def prefilter_gmaps_venues(df):
+    """
+    Rules from gmaps_icp_definitions.py:
+    - reject: review count far below what the search intent's ICP expects
+
+    Website content matters for venues, so nothing is auto-accepted.
+    """
+    result = _empty_result(df)
+    if df.empty:
+        return result
+
+    reviews = pd.to_numeric(df.get("reviewsCount", pd.Series(index=df.index, dtype=float)), errors="coerce")
+    min_reviews = df.get("icp", pd.Series("", index=df.index)).astype(str).map(get_min_reviews_for_gmaps_search)
+
+    rejected = reviews.notna() & (reviews < min_reviews * GMAPS_REJECT_REVIEW_FRACTION)
+    result.loc[rejected, "score"] = PREFILTER_REJECT_SCORE
+    result.loc[rejected, "reason"] = "review count far below the ICP's size indicator"
+    return result
+
+
+def prefilter_hubspot_leads(df):
+    """
+    Rules from hubspot_icp_defination.py:
+    - reject: missing/invalid email
+    - reject: personal email provider (gmail.com, yahoo.com, ...)
+    """
+    result = _empty_result(df)
+    if df.empty:
+        return result
+
+    emails = _text(df.get("email", pd.Series("", index=df.index)))
+    domains = emails.str.split("@").str[-1]
+
+    invalid = ~emails.str.contains("@", regex=False)
+    personal = ~invalid & domains.isin(PERSONAL_EMAIL_DOMAINS)
+
+    result.loc[personal, "score"] = PREFILTER_REJECT_SCORE
+    result.loc[personal, "reason"] = "personal email provider"
+    result.loc[invalid, "score"] = 0.0
+    result.loc[invalid, "reason"] = "missing or invalid email"
+    return result
+
+
+def apply_prefilter(df, prefilter, noun="lead"):
+    """
+    Score the clear cases among df's unscored rows in place
+
+    Args:
+        df: DataFrame with icp_score / icp_evaluation columns
+        prefilter: One of the prefilter_* functions above
+        noun: Word used in log messages
+
+    Returns:
+        Number of rows settled without an LLM call
+    """
+    if not ICP_PREFILTER_ENABLED:
+        return 0
+
+    unscored = df['icp_score'].isna() | (df['icp_score'] == '')
+    result = prefilter(df[unscored])
+    decided = result["score"].notna()
+    decided_index = result.index[decided]
+
+    df.loc[decided_index, 'icp_score'] = result.loc[decided, "score"]
+    df.loc[decided_index, 'icp_evaluation'] = "Pre-filter: " + result.loc[decided, "reason"]
+
+    accepted = int((result.loc[decided, "score"] >= PREFILTER_ACCEPT_SCORE).sum())
+    print(f"Pre-filter settled {len(decided_index)}/{int(unscored.sum())} {noun}s "
+          f"({accepted} accepted, {len(decided_index) - accepted} rejected) without an API call")
+    return len(decided_index)
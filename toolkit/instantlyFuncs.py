@@ -1,28 +1,59 @@
-import requests
+import asyncio
+import fcntl
 import pandas as pd
 import os
+import threading
+import time
+from pathlib import Path
 from dotenv import load_dotenv
+from functions.helper import should_export_instantly_leads
+from toolkit.asyncHttp import async_post
+from toolkit.httpClient import http_post
+from toolkit import instantlyStore
 
 # Load environment variables from .env file
 load_dotenv()
 
-def export_instantly_leads(bool_starting_index_present, starting_index, selected_fields=None):
-    apiKey = os.getenv("INSTANTLY_API_KEY")
-    output_dir = os.getenv("OUTPUT_DIR", "outputs")
-    url = "https://api.instantly.ai/api/v2/leads/list"
+INSTANTLY_LEADS_URL = "https://api.instantly.ai/api/v2/leads/list"
 
+# "incremental" only pages through leads created since the newest stored one (lead ids are
+# time-ordered UUIDv7 and the list is sorted by id); "full" sweeps every page each run
+INSTANTLY_SYNC_MODE = os.getenv("INSTANTLY_SYNC_MODE", "incremental").lower()
+# Run a full sweep (picks up edits and deletions) when the last completed one is older than this
+INSTANTLY_FULL_SYNC_DAYS = float(os.getenv("INSTANTLY_FULL_SYNC_DAYS", "7"))
+# Incremental runs start this far before the newest stored lead, for ids minted before a slow insert committed
+INSTANTLY_SYNC_OVERLAP_MINUTES = float(os.getenv("INSTANTLY_SYNC_OVERLAP_MINUTES", "60"))
+
+
+def _leads_request(bool_starting_index_present, starting_index):
+    """Payload and headers for one page of the leads list"""
     payload = {"limit": 100}
     if bool_starting_index_present:
         payload["starting_after"] = starting_index
 
     headers = {
         "Content-Type": "application/json",
-        "Authorization": f"Bearer {apiKey}"
+        "Authorization": f"Bearer {os.getenv('INSTANTLY_API_KEY')}"
     }
+    return payload, headers
+
+
+def default_instantly_leads_path():
+    return f"{os.getenv('OUTPUT_DIR', 'outputs')}/instantly_leads.csv"
+
 
-    response = requests.post(url, json=payload, headers=headers)
-    data = response.json()
+def _temp_path_for(output_path):
+    return f"{output_path}.tmp-{os.getpid()}-{threading.get_ident()}"
 
+
+def export_instantly_leads(bool_starting_index_present, starting_index, selected_fields=None, output_path=None):
+    payload, headers = _leads_request(bool_starting_index_present, starting_index)
+    response = http_post(INSTANTLY_LEADS_URL, json=payload, headers=headers, retry_post=True)
+    return _save_leads_page(response.json(), bool_starting_index_present, selected_fields, output_path)
+
+
+def _save_leads_page(data, bool_starting_index_present, selected_fields, output_path=None):
+    output_path = output_path or default_instantly_leads_path()
     df = pd.DataFrame(data["items"])
     
     # Auto-detect fields on first page
@@ -35,30 +66,369 @@ def export_instantly_leads(bool_starting_index_present, starting_index, selected
     df = df[selected_fields]
     
     if bool_starting_index_present:
-        df.to_csv(f"{output_dir}/instantly_leads.csv", mode="a", index=False, header=False)
+        df.to_csv(output_path, mode="a", index=False, header=False)
     else:
-        df.to_csv(f"{output_dir}/instantly_leads.csv", mode="w", index=False, header=True)
+        df.to_csv(output_path, mode="w", index=False, header=True)
 
     return data.get("next_starting_after"), selected_fields
 
-def export_paginated_instantly_leads(num_pages):
+def export_paginated_instantly_leads(num_pages, output_path=None):
+    """
+    Export Instantly leads page by page
+
+    Pages are written to a private temp file that replaces output_path only once
+    the export finishes, so readers never see a half-written file.
+    """
+    output_path = output_path or default_instantly_leads_path()
+    tmp_path = _temp_path_for(output_path)
     next_starting_after = None
     selected_fields = None
     
     if num_pages == -1:
         num_pages = 10000
     
-    count = 0
-    while count < num_pages:
-        print("Page: ", count)
-        next_starting_after, selected_fields = export_instantly_leads(
-            next_starting_after is not None, 
-            next_starting_after,
-            selected_fields
-        )
-        if next_starting_after is None:
+    try:
+        count = 0
+        while count < num_pages:
+            print("Page: ", count)
+            next_starting_after, selected_fields = export_instantly_leads(
+                next_starting_after is not None, 
+                next_starting_after,
+                selected_fields,
+                tmp_path,
+            )
+            if next_starting_after is None:
+                break
+            count += 1
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+async def async_export_instantly_leads(bool_starting_index_present, starting_index, selected_fields=None, output_path=None):
+    """Async counterpart of export_instantly_leads"""
+    payload, headers = _leads_request(bool_starting_index_present, starting_index)
+    response = await async_post(INSTANTLY_LEADS_URL, json=payload, headers=headers, retry_post=True)
+    return _save_leads_page(response.json(), bool_starting_index_present, selected_fields, output_path)
+
+
+async def async_export_paginated_instantly_leads(num_pages, output_path=None):
+    """Async counterpart of export_paginated_instantly_leads (pages stay sequential: each needs the previous cursor)"""
+    output_path = output_path or default_instantly_leads_path()
+    tmp_path = _temp_path_for(output_path)
+    next_starting_after = None
+    selected_fields = None
+
+    if num_pages == -1:
+        num_pages = 10000
+
+    try:
+        count = 0
+        while count < num_pages:
+            print("Page: ", count)
+            next_starting_after, selected_fields = await async_export_instantly_leads(
+                next_starting_after is not None,
+                next_starting_after,
+                selected_fields,
+                tmp_path,
+            )
+            if next_starting_after is None:
+                break
+            count += 1
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def uuid7_prefix(epoch_ms):
+    """First 13 characters of a UUIDv7 minted at epoch_ms (its 48-bit millisecond timestamp)"""
+    digits = f"{int(epoch_ms):012x}"
+    return f"{digits[:8]}-{digits[8:]}"
+
+
+def uuid7_epoch_ms(lead_id):
+    """Creation time encoded in a UUIDv7 id, or None for other id versions"""
+    if not lead_id or len(lead_id) < 15 or lead_id[14] != "7":
+        return None
+    return int(lead_id[:8] + lead_id[9:13], 16)
+
+
+def _full_plan(state):
+    # An interrupted sweep resumes from its cursor; otherwise a new pass starts at the first page
+    if state["cursor"] is not None:
+        return {"full": True, "pass": state["pass"], "cursor": state["cursor"], "stop_after": None}
+    return {"full": True, "pass": state["pass"] + 1, "cursor": None, "stop_after": None}
+
+
+def _sync_plan():
+    """
+    Where this run starts and stops, from the persisted sync state
+
+    An incremental run starts just before the newest stored UUIDv7 lead (minus
+    INSTANTLY_SYNC_OVERLAP_MINUTES) and stops once a page passes the ids that can
+    have been minted by now; everything after that is older, randomly-id'd leads.
+    """
+    state = instantlyStore.get_sync_state()
+    stale = time.time() - state["pass_completed_at"] > INSTANTLY_FULL_SYNC_DAYS * 86400
+    newest_ms = uuid7_epoch_ms(instantlyStore.newest_lead_id())
+    if INSTANTLY_SYNC_MODE != "incremental" or stale or state["cursor"] is not None or newest_ms is None:
+        return _full_plan(state)
+
+    start_prefix = uuid7_prefix(newest_ms - INSTANTLY_SYNC_OVERLAP_MINUTES * 60000)
+    stop_prefix = uuid7_prefix(time.time() * 1000 + 60000)
+    return {
+        "full": False,
+        "pass": state["pass"],
+        "cursor": instantlyStore.newest_lead_id(before=start_prefix),
+        "stop_after": f"{stop_prefix}-ffff-ffff-ffffffffffff",
+    }
+
+
+def _merge_page(data, plan, summary):
+    """Upsert one API page and advance the cursor; returns True when the run reached its last page"""
+    items = data.get("items", [])
+    for key, count in instantlyStore.upsert_leads(items, plan["pass"]).items():
+        summary[key] += count
+    summary["pages"] += 1
+    cursor = data.get("next_starting_after")
+
+    if not plan["full"]:
+        return cursor is None or not items or str(items[-1].get("id", "")) > plan["stop_after"]
+
+    if cursor is None:
+        summary["removed"] = instantlyStore.finish_pass(plan["pass"])
+        summary["pass_completed"] = True
+        return True
+    instantlyStore.set_sync_state(**{"pass": plan["pass"], "cursor": cursor})
+    return False
+
+
+def _cursor_rejected(response, plan, summary):
+    """An incremental start cursor the API refuses (e.g. that lead was deleted) falls back to a full sweep"""
+    if plan["full"] or summary["pages"] or response.status_code not in (400, 404):
+        return False
+    print(f"⚠️ Instantly rejected sync cursor {plan['cursor']} ({response.status_code}), running a full sweep")
+    plan.update(_full_plan(instantlyStore.get_sync_state()))
+    return True
+
+
+def _finish_sync(summary, output_path):
+    """Refresh instantly_leads.csv from the store (only rewritten when leads changed)"""
+    summary["total"] = instantlyStore.count_leads()
+    if summary["new"] or summary["changed"] or summary["removed"] or not os.path.exists(output_path):
+        instantlyStore.write_leads_csv(output_path)
+    else:
+        # Keep the file's date current so the daily check sees today's sync
+        os.utime(output_path)
+    print(f"📇 Instantly sync ({'full' if summary['pass_completed'] else 'incremental'}): {summary['pages']} pages, {summary['new']} new, {summary['changed']} changed, "
+          f"{summary['removed']} removed, {summary['total']} leads stored")
+    return summary
+
+
+def sync_instantly_leads(output_path=None):
+    """
+    Merge new and changed Instantly leads into the local lead store
+
+    The leads list has no updated-since filter but is sorted by id, and Instantly
+    mints lead ids as UUIDv7, whose leading bits are the creation time. So the
+    default "incremental" mode starts paging just before the newest stored lead and
+    stops after the ids that can exist by now, which is a few pages per day of new
+    leads. Leads with older random (UUIDv4) ids, edits and deletions are picked up
+    by a full sweep, which runs when the store is empty, when no sweep has completed
+    in INSTANTLY_FULL_SYNC_DAYS, or on every run with INSTANTLY_SYNC_MODE=full.
+    Leads are keyed by id and only rewritten when timestamp_updated moved, and
+    instantly_leads.csv is only regenerated when something changed.
+
+    Returns:
+        Dict with pages fetched and new / changed / unchanged / removed / total lead counts
+    """
+    output_path = output_path or default_instantly_leads_path()
+    plan = _sync_plan()
+    summary = {"pages": 0, "new": 0, "changed": 0, "unchanged": 0, "removed": 0, "pass_completed": False}
+
+    while True:
+        payload, headers = _leads_request(plan["cursor"] is not None, plan["cursor"])
+        response = http_post(INSTANTLY_LEADS_URL, json=payload, headers=headers, retry_post=True)
+        if _cursor_rejected(response, plan, summary):
+            continue
+        response.raise_for_status()
+        data = response.json()
+        if _merge_page(data, plan, summary):
             break
-        count += 1
+        plan["cursor"] = data["next_starting_after"]
+
+    return _finish_sync(summary, str(output_path))
+
+
+async def async_sync_instantly_leads(output_path=None):
+    """Async counterpart of sync_instantly_leads"""
+    output_path = output_path or default_instantly_leads_path()
+    plan = await asyncio.to_thread(_sync_plan)
+    summary = {"pages": 0, "new": 0, "changed": 0, "unchanged": 0, "removed": 0, "pass_completed": False}
+
+    while True:
+        payload, headers = _leads_request(plan["cursor"] is not None, plan["cursor"])
+        response = await async_post(INSTANTLY_LEADS_URL, json=payload, headers=headers, retry_post=True)
+        if await asyncio.to_thread(_cursor_rejected, response, plan, summary):
+            continue
+        response.raise_for_status()
+        data = response.json()
+        if await asyncio.to_thread(_merge_page, data, plan, summary):
+            break
+        plan["cursor"] = data["next_starting_after"]
+
+    return await asyncio.to_thread(_finish_sync, summary, str(output_path))
+
+
+class _ExportFlight:
+    """One in-progress export that later callers wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.error = None
+
+
+_export_lock = threading.Lock()
+_export_flight = None
+# How often an async leader retries the cross-process export lock
+EXPORT_LOCK_POLL_SECONDS = 1.0
+
+
+def _join_or_start_export(instantly_file):
+    """
+    Returns (flight, is_leader), or (None, False) when today's file already exists.
+    The leader runs the export; everyone else waits on flight.done.
+    """
+    global _export_flight
+    with _export_lock:
+        if _export_flight is not None:
+            return _export_flight, False
+        if not should_export_instantly_leads(Path(instantly_file)):
+            return None, False
+        _export_flight = _ExportFlight()
+        return _export_flight, True
+
+
+def _finish_export(flight, error=None):
+    global _export_flight
+    with _export_lock:
+        flight.error = error
+        _export_flight = None
+    flight.done.set()
+
+
+def _lock_export_file(instantly_file, blocking=True):
+    """
+    Take the cross-process export lock, an flock on a sidecar next to the leads file
+
+    Returns:
+        The open lock file (closing it releases the lock), or None when blocking is
+        False and another process holds it
+    """
+    lock_path = f"{instantly_file}.lock"
+    lock_dir = os.path.dirname(lock_path)
+    if lock_dir:
+        os.makedirs(lock_dir, exist_ok=True)
+    lock_file = open(lock_path, "a")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock_file.close()
+        return None
+    except BaseException:
+        lock_file.close()
+        raise
+    return lock_file
+
+
+def _follower_result(flight):
+    if flight.error is not None:
+        raise RuntimeError(f"Shared Instantly export failed: {flight.error}")
+    return "shared"
+
+
+def ensure_instantly_leads_exported(instantly_file):
+    """
+    Single-flight daily Instantly sync shared by every pipeline on the host
+
+    The first caller of the day runs sync_instantly_leads(); callers that arrive
+    while it is running wait for it and reuse its file instead of paging the
+    account again. Within a process the callers share one flight; across
+    processes (e.g. several server workers) the flight's leader holds a file lock
+    on the export and re-checks the file once it gets it, so a process that waited
+    on another one's export reuses that file too.
+
+    Returns:
+        "completed" (this call exported), "shared" (waited on another caller's
+        export) or "skipped" (today's file already exists)
+    """
+    flight, is_leader = _join_or_start_export(instantly_file)
+    if flight is None:
+        return "skipped"
+    if not is_leader:
+        print("⏳ Instantly export already running in another pipeline, waiting for it")
+        flight.done.wait()
+        return _follower_result(flight)
+
+    try:
+        lock_file = _lock_export_file(instantly_file, blocking=False)
+        if lock_file is None:
+            print("⏳ Instantly export already running in another process, waiting for it")
+            lock_file = _lock_export_file(instantly_file)
+        try:
+            status = _export_if_stale(instantly_file)
+        finally:
+            lock_file.close()
+    except BaseException as e:
+        _finish_export(flight, e)
+        raise
+    _finish_export(flight)
+    return status
+
+
+def _export_if_stale(instantly_file):
+    # Another process may have exported while this one waited for the lock
+    if not should_export_instantly_leads(Path(instantly_file)):
+        return "shared"
+    sync_instantly_leads(instantly_file)
+    return "completed"
+
+
+async def async_ensure_instantly_leads_exported(instantly_file):
+    """Async counterpart of ensure_instantly_leads_exported (shares the same single flight)"""
+    flight, is_leader = _join_or_start_export(instantly_file)
+    if flight is None:
+        return "skipped"
+    if not is_leader:
+        print("⏳ Instantly export already running in another pipeline, waiting for it")
+        await asyncio.to_thread(flight.done.wait)
+        return _follower_result(flight)
+
+    try:
+        # Poll instead of blocking a worker thread in flock, so a cancelled task never
+        # ends up holding the lock from a thread nobody waits on
+        lock_file = await asyncio.to_thread(_lock_export_file, instantly_file, False)
+        if lock_file is None:
+            print("⏳ Instantly export already running in another process, waiting for it")
+        while lock_file is None:
+            await asyncio.sleep(EXPORT_LOCK_POLL_SECONDS)
+            lock_file = await asyncio.to_thread(_lock_export_file, instantly_file, False)
+        try:
+            if should_export_instantly_leads(Path(instantly_file)):
+                await async_sync_instantly_leads(instantly_file)
+                status = "completed"
+            else:
+                status = "shared"
+        finally:
+            lock_file.close()
+    except BaseException as e:
+        _finish_export(flight, e)
+        raise
+    _finish_export(flight)
+    return status
+
 
 if __name__ == "__main__":
     export_paginated_instantly_leads(-1)
\ No newline at end of file
@@ -0,0 +1,331 @@
+"""
+Instantly Lead Store
+On-disk SQLite copy of the Instantly workspace's leads keyed by lead id, the sync cursor,
+and a suppression index of normalized emails, domains and company names for dedupe
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import pandas as pd
+from dotenv import load_dotenv
+
+load_dotenv()
+
+INSTANTLY_STORE_PATH = os.getenv("INSTANTLY_STORE_PATH", "outputs/.instantly_leads.sqlite")
+
+# Suppression key kind -> lead field it is read from
+SUPPRESSION_FIELDS = {"email": "email", "domain": "company_domain", "company": "company_name"}
+# Bump when normalize_key() changes so existing indexes are rebuilt
+SUPPRESSION_INDEX_VERSION = "1"
+
+# Optional memory-mapped Bloom filters in front of the email / domain index; hits are confirmed in SQLite
+INSTANTLY_BLOOM_FILTER = os.getenv("INSTANTLY_BLOOM_FILTER", "false").lower() == "true"
+INSTANTLY_BLOOM_FP_RATE = float(os.getenv("INSTANTLY_BLOOM_FP_RATE", "0.001"))
+BLOOM_KINDS = ("email", "domain")
+# Filters are sized for this much growth over the current key count
+BLOOM_HEADROOM = 1.25
+
+_lock = threading.Lock()
+_connection = None
+_blooms = {}
+
+
+def _connect():
+    global _connection
+    if _connection is None:
+        store_dir = os.path.dirname(INSTANTLY_STORE_PATH)
+        if store_dir:
+            os.makedirs(store_dir, exist_ok=True)
+        _connection = sqlite3.connect(INSTANTLY_STORE_PATH, check_same_thread=False, timeout=30)
+        _connection.execute("PRAGMA journal_mode=WAL")
+        _connection.execute(
+            """CREATE TABLE IF NOT EXISTS leads (
+                id TEXT PRIMARY KEY,
+                timestamp_updated TEXT,
+                data TEXT,
+                last_seen_pass INTEGER
+            )"""
+        )
+        _connection.execute("CREATE INDEX IF NOT EXISTS idx_leads_last_seen ON leads(last_seen_pass)")
+        _connection.execute("CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value TEXT)")
+        _connection.execute(
+            """CREATE TABLE IF NOT EXISTS suppression (
+                kind TEXT,
+                key TEXT,
+                lead_id TEXT,
+                PRIMARY KEY (kind, key, lead_id)
+            ) WITHOUT ROWID"""
+        )
+        _connection.execute("CREATE INDEX IF NOT EXISTS idx_suppression_lead ON suppression(lead_id)")
+        _connection.commit()
+        _rebuild_suppression_if_stale(_connection)
+    return _connection
+
+
+def normalize_key(value):
+    """Same normalization the CSV-based dedupe applied: str, stripped, lower-cased; '' for missing"""
+    if value is None:
+        return ""
+    key = str(value).strip().lower()
+    return "" if key in ("nan", "none") else key
+
+
+def _suppression_rows(lead_id, item):
+    rows = []
+    for kind, field in SUPPRESSION_FIELDS.items():
+        key = normalize_key(item.get(field))
+        if key:
+            rows.append((kind, key, lead_id))
+    return rows
+
+
+def _index_lead(conn, lead_id, item):
+    conn.execute("DELETE FROM suppression WHERE lead_id = ?", (lead_id,))
+    conn.executemany("INSERT OR IGNORE INTO suppression VALUES (?, ?, ?)", _suppression_rows(lead_id, item))
+
+
+def _rebuild_suppression_if_stale(conn):
+    """Index every stored lead when the index is missing or was built by an older normalize_key()"""
+    row = conn.execute("SELECT value FROM sync_state WHERE key = 'suppression_version'").fetchone()
+    if row is not None and row[0] == SUPPRESSION_INDEX_VERSION:
+        return
+    conn.execute("DELETE FROM suppression")
+    for lead_id, data in conn.execute("SELECT id, data FROM leads").fetchall():
+        conn.executemany("INSERT OR IGNORE INTO suppression VALUES (?, ?, ?)", _suppression_rows(lead_id, json.loads(data)))
+    conn.execute("INSERT OR REPLACE INTO sync_state VALUES ('suppression_version', ?)", (SUPPRESSION_INDEX_VERSION,))
+    _bump_generation(conn)
+    conn.commit()
+
+
+def _bump_generation(conn):
+    """Mark the suppression index as changed so Bloom filters built from it are rebuilt"""
+    conn.execute(
+        """INSERT INTO sync_state VALUES ('suppression_generation', '1')
+           ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"""
+    )
+
+
+def _generation(conn):
+    row = conn.execute("SELECT value FROM sync_state WHERE key = 'suppression_generation'").fetchone()
+    return int(row[0]) if row else 0
+
+
+def get_sync_state():
+    """
+    Persisted sync position
+
+    Returns:
+        Dict with `pass` (number of the current sweep over the lead list), `cursor`
+        (starting_after to resume the sweep from, None = start a new sweep) and
+        `pass_completed_at` (epoch seconds of the last finished sweep)
+    """
+    with _lock:
+        rows = dict(_connect().execute("SELECT key, value FROM sync_state").fetchall())
+    return {
+        "pass": int(rows.get("pass", 0)),
+        "cursor": rows.get("cursor") or None,
+        "pass_completed_at": float(rows.get("pass_completed_at", 0)),
+    }
+
+
+def set_sync_state(**values):
+    """Persist any of the keys returned by get_sync_state()"""
+    with _lock:
+        conn = _connect()
+        conn.executemany(
+            "INSERT OR REPLACE INTO sync_state VALUES (?, ?)",
+            [(key, "" if value is None else str(value)) for key, value in values.items()],
+        )
+        conn.commit()
+
+
+def count_leads():
+    with _lock:
+        return _connect().execute("SELECT COUNT(*) FROM leads").fetchone()[0]
+
+
+def newest_lead_id(before=None):
+    """Largest stored UUIDv7 lead id (optionally below `before`), i.e. the most recently created lead; None if none"""
+    query = "SELECT MAX(id) FROM leads WHERE substr(id, 15, 1) = '7'"
+    params = ()
+    if before is not None:
+        query += " AND id < ?"
+        params = (before,)
+    with _lock:
+        return _connect().execute(query, params).fetchone()[0]
+
+
+def upsert_leads(items, sync_pass):
+    """
+    Merge one page of leads from the API into the store
+
+    A lead is only rewritten when its timestamp_updated moved; every lead in the
+    page is marked as seen in sync_pass so finish_pass() can drop deleted ones.
+
+    Returns:
+        Dict with counts of `new`, `changed` and `unchanged` leads
+    """
+    counts = {"new": 0, "changed": 0, "unchanged": 0}
+    with _lock:
+        conn = _connect()
+        for item in items:
+            lead_id = item.get("id")
+            if not lead_id:
+                continue
+            updated = item.get("timestamp_updated") or item.get("timestamp_created") or ""
+            row = conn.execute("SELECT timestamp_updated FROM leads WHERE id = ?", (lead_id,)).fetchone()
+            if row is not None and row[0] == updated:
+                conn.execute("UPDATE leads SET last_seen_pass = ? WHERE id = ?", (sync_pass, lead_id))
+                counts["unchanged"] += 1
+                continue
+            conn.execute(
+                "INSERT OR REPLACE INTO leads VALUES (?, ?, ?, ?)",
+                (lead_id, updated, json.dumps(item), sync_pass),
+            )
+            _index_lead(conn, lead_id, item)
+            counts["new" if row is None else "changed"] += 1
+
+        if counts["new"] or counts["changed"]:
+            _bump_generation(conn)
+        conn.commit()
+    return counts
+
+
+def finish_pass(sync_pass):
+    """Close a full sweep: drop leads it never saw (deleted in Instantly) and return how many"""
+    with _lock:
+        conn = _connect()
+        removed = conn.execute("DELETE FROM leads WHERE last_seen_pass < ?", (sync_pass,)).rowcount
+        if removed:
+            conn.execute("DELETE FROM suppression WHERE lead_id NOT IN (SELECT id FROM leads)")
+            _bump_generation(conn)
+        conn.executemany(
+            "INSERT OR REPLACE INTO sync_state VALUES (?, ?)",
+            [("pass", str(sync_pass)), ("cursor", ""), ("pass_completed_at", str(time.time()))],
+        )
+        conn.commit()
+    return removed
+
+
+def iter_leads(batch_size=5000):
+    """Yield every stored lead as the dict the API returned, in id order"""
+    last_id = ""
+    while True:
+        with _lock:
+            rows = _connect().execute(
+                "SELECT id, data FROM leads WHERE id > ? ORDER BY id LIMIT ?", (last_id, batch_size)
+            ).fetchall()
+        if not rows:
+            return
+        for _, data in rows:
+            yield json.loads(data)
+        last_id = rows[-1][0]
+
+
+def write_leads_csv(output_path):
+    """Materialise the store as instantly_leads.csv (same columns as a full export), replacing it atomically"""
+    df = pd.DataFrame(list(iter_leads()))
+    tmp_path = f"{output_path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    try:
+        df.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return len(df)
+
+
+def bloom_path(kind):
+    return f"{os.path.splitext(INSTANTLY_STORE_PATH)[0]}.bloom-{kind}.bin"
+
+
+def _iter_suppression_keys(conn, kind, batch_size=50000):
+    last_key = ""
+    while True:
+        rows = conn.execute(
+            "SELECT DISTINCT key FROM suppression WHERE kind = ? AND key > ? ORDER BY key LIMIT ?",
+            (kind, last_key, batch_size),
+        ).fetchall()
+        if not rows:
+            return
+        yield [row[0] for row in rows]
+        last_key = rows[-1][0]
+
+
+def iter_suppressed_keys(kind, batch_size=50000):
+    """Yield batches of every normalized key of one kind (e.g. all company names in Instantly)"""
+    with _lock:
+        batches = _iter_suppression_keys(_connect(), kind, batch_size)
+    while True:
+        with _lock:
+            batch = next(batches, None)
+        if batch is None:
+            return
+        yield batch
+
+
+def _bloom_filter(conn, kind):
+    """Must hold _lock. Bloom filter of one key kind, rebuilt when the index changed since it was built"""
+    from toolkit.bloomFilter import BloomFilter, build_bloom_filter
+
+    generation = _generation(conn)
+    bloom = _blooms.get(kind)
+    if bloom is None and os.path.exists(bloom_path(kind)):
+        try:
+            bloom = BloomFilter(bloom_path(kind))
+        except (OSError, ValueError):
+            bloom = None
+    if bloom is None or bloom.generation != generation:
+        count = conn.execute("SELECT COUNT(DISTINCT key) FROM suppression WHERE kind = ?", (kind,)).fetchone()[0]
+        print(f"🧮 Building {kind} Bloom filter for {count} keys")
+        bloom = build_bloom_filter(
+            bloom_path(kind),
+            _iter_suppression_keys(conn, kind),
+            capacity=max(1000, count * BLOOM_HEADROOM),
+            fp_rate=INSTANTLY_BLOOM_FP_RATE,
+            generation=generation,
+        )
+    _blooms[kind] = bloom
+    return bloom
+
+
+def find_suppressed(kind, values):
+    """
+    Bulk probe of the suppression index
+
+    Args:
+        kind: "email", "domain" or "company"
+        values: Iterable of raw values (normalized here; empty ones never match)
+
+    With INSTANTLY_BLOOM_FILTER=true, email and domain keys are screened by the
+    memory-mapped Bloom filter first and only its hits are confirmed in SQLite,
+    so a false positive costs one lookup and never drops a lead.
+
+    Returns:
+        Set of the normalized keys that belong to a lead already in Instantly
+    """
+    keys = {normalize_key(value) for value in values}
+    keys.discard("")
+    if not keys:
+        return set()
+    with _lock:
+        conn = _connect()
+        if INSTANTLY_BLOOM_FILTER and kind in BLOOM_KINDS:
+            keys = list(keys)
+            hits = _bloom_filter(conn, kind).contains_many(keys)
+            keys = [key for key, hit in zip(keys, hits) if hit]
+            if not keys:
+                return set()
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS probe (key TEXT PRIMARY KEY)")
+        conn.execute("DELETE FROM probe")
+        conn.executemany("INSERT INTO probe VALUES (?)", [(key,) for key in keys])
+        rows = conn.execute(
+            "SELECT DISTINCT probe.key FROM probe JOIN suppression ON suppression.kind = ? AND suppression.key = probe.key",
+            (kind,),
+        ).fetchall()
+        conn.execute("DELETE FROM probe")
+        conn.commit()
+    return {row[0] for row in rows}
@@ -0,0 +1,128 @@
+"""
+LLM Response Cache
+On-disk SQLite cache of LLM responses keyed by model, system prompt and a hash of the user prompt
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dotenv import load_dotenv
+
+load_dotenv()
+
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "outputs/.llm_cache.sqlite")
+# Entries older than this are treated as misses (0 disables the cache)
+LLM_CACHE_TTL_HOURS = float(os.getenv("LLM_CACHE_TTL_HOURS", "168"))
+# Least recently used entries are evicted beyond this many rows
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "50000"))
+# Run eviction every N writes rather than on every write
+EVICT_EVERY_WRITES = 200
+
+_lock = threading.Lock()
+_connection = None
+_writes_since_evict = 0
+_stats = {"hits": 0, "misses": 0, "time_saved_seconds": 0.0}
+
+
+def _connect():
+    global _connection
+    if _connection is None:
+        cache_dir = os.path.dirname(LLM_CACHE_PATH)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        _connection = sqlite3.connect(LLM_CACHE_PATH, check_same_thread=False, timeout=30)
+        _connection.execute("PRAGMA journal_mode=WAL")
+        _connection.execute(
+            """CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                response TEXT,
+                latency_seconds REAL,
+                created_at REAL,
+                last_used_at REAL
+            )"""
+        )
+        _connection.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache(last_used_at)")
+        _connection.commit()
+    return _connection
+
+
+def llm_cache_key(model, system_prompt, prompt, max_tokens=None):
+    """Hash of everything that determines the response"""
+    prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    payload = json.dumps([model, system_prompt, prompt_hash, max_tokens])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get_cached_response(model, system_prompt, prompt, max_tokens=None):
+    """Return the cached response for this call, or None on a miss"""
+    if LLM_CACHE_TTL_HOURS <= 0:
+        return None
+
+    key = llm_cache_key(model, system_prompt, prompt, max_tokens)
+    cutoff = time.time() - LLM_CACHE_TTL_HOURS * 3600
+    with _lock:
+        conn = _connect()
+        row = conn.execute(
+            "SELECT response, latency_seconds FROM llm_cache WHERE key = ? AND created_at >= ?",
+            (key, cutoff),
+        ).fetchone()
+        if row is None:
+            _stats["misses"] += 1
+            return None
+
+        conn.execute("UPDATE llm_cache SET last_used_at = ? WHERE key = ?", (time.time(), key))
+        conn.commit()
+        _stats["hits"] += 1
+        _stats["time_saved_seconds"] += row[1] or 0.0
+        return row[0]
+
+
+def store_response(model, system_prompt, prompt, response, latency_seconds, max_tokens=None):
+    """Store a successful response and occasionally evict expired / least recently used rows"""
+    global _writes_since_evict
+    if LLM_CACHE_TTL_HOURS <= 0 or not response:
+        return
+
+    key = llm_cache_key(model, system_prompt, prompt, max_tokens)
+    now = time.time()
+    with _lock:
+        conn = _connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?, ?, ?, ?)",
+            (key, model, response, latency_seconds, now, now),
+        )
+        _writes_since_evict += 1
+        if _writes_since_evict >= EVICT_EVERY_WRITES:
+            _writes_since_evict = 0
+            conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - LLM_CACHE_TTL_HOURS * 3600,))
+            conn.execute(
+                """DELETE FROM llm_cache WHERE key IN (
+                    SELECT key FROM llm_cache ORDER BY last_used_at DESC LIMIT -1 OFFSET ?
+                )""",
+                (LLM_CACHE_MAX_ENTRIES,),
+            )
+        conn.commit()
+
+
+def get_llm_cache_stats():
+    """Snapshot of the process-wide hit/miss counters"""
+    with _lock:
+        return dict(_stats)
+
+
+def llm_cache_stats_since(snapshot):
+    """Hit/miss counts, hit rate and time saved since an earlier get_llm_cache_stats() snapshot"""
+    current = get_llm_cache_stats()
+    hits = current["hits"] - snapshot["hits"]
+    misses = current["misses"] - snapshot["misses"]
+    lookups = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+        "time_saved_seconds": round(current["time_saved_seconds"] - snapshot["time_saved_seconds"], 1),
+    }
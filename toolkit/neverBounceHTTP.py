@@ -1,8 +1,11 @@
+import asyncio
 import os
 import time
-import requests
 import pandas as pd
 from dotenv import load_dotenv
+from toolkit.asyncHttp import async_get, async_post
+from toolkit.httpClient import http_get, http_post
+from functions.stage_storage import read_stage, update_stage
 
 load_dotenv()
 API_KEY = os.getenv("NEVERBOUNCE_API_KEY")
@@ -10,9 +13,9 @@ API_KEY = os.getenv("NEVERBOUNCE_API_KEY")
 BASE_URL = "https://api.neverbounce.com/v4/jobs"
 
 
-def start_job(emails):
+def _job_payload(emails):
     # Format according to NeverBounce docs - just array of email strings
-    payload = {
+    return {
         "key": API_KEY,
         "input_location": "supplied",
         "auto_start": 1,
@@ -20,16 +23,20 @@ def start_job(emails):
         "input": [{"email": e} for e in emails],  # Changed format
     }
 
+
+def start_job(emails):
     print(f"Sending request to create job with {len(emails)} emails...")
-    r = requests.post(f"{BASE_URL}/create", json=payload)
+    r = http_post(f"{BASE_URL}/create", json=_job_payload(emails), timeout=120)
     
     # Print raw response for debugging
     print(f"Response status code: {r.status_code}")
     print(f"Response body: {r.text}")
     
     r.raise_for_status()
-    response = r.json()
-    
+    return _job_id_from(r.json())
+
+
+def _job_id_from(response):
     # Check for errors in response
     if "status" in response and response["status"] != "success":
         error_msg = response.get("message", "Unknown error")
@@ -42,7 +49,7 @@ def start_job(emails):
 
 
 def get_status(job_id):
-    r = requests.get(
+    r = http_get(
         f"{BASE_URL}/status",
         params={"key": API_KEY, "job_id": job_id},
     )
@@ -51,8 +58,10 @@ def get_status(job_id):
     print(f"Status check response: {r.text}")
     
     r.raise_for_status()
-    response = r.json()
-    
+    return _job_status_from(r.json())
+
+
+def _job_status_from(response):
     # Check for errors in response
     if "status" in response and response["status"] != "success":
         error_msg = response.get("message", "Unknown error")
@@ -65,9 +74,10 @@ def get_status(job_id):
 def download_results(job_id, output_path):
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
 
-    r = requests.get(
+    r = http_get(
         f"{BASE_URL}/download",
         params={"key": API_KEY, "job_id": job_id},
+        timeout=300,
     )
     
     print(f"Download response status: {r.status_code}")
@@ -96,48 +106,76 @@ def verify_emails(emails, output_path="outputs/verified.csv", max_wait_minutes=3
     while True:
         iteration += 1
         status, full_response = get_status(job_id)
-        
-        # Print detailed status info
-        total = full_response.get("total", {})
-        print(f"Job status (check {iteration}/{max_iterations}): {status}")
-        if isinstance(total, dict):
-            print(f"  Progress: {total.get('processed', 0)}/{total.get('records', 0)} records")
-        
-        if status == "complete":
-            print("Job completed! Downloading results...")
+        if _job_finished(status, full_response, iteration, max_iterations, max_wait_minutes, job_id):
             break
-        elif status in ["failed", "error"]:
-            raise Exception(f"NeverBounce job failed with status: {status}. Full response: {full_response}")
-        elif status in ["uploading", "parsing", "running", "under_review", "waiting"]:
-            # Job is still processing, continue waiting
-            if iteration >= max_iterations:
-                raise TimeoutError(
-                    f"NeverBounce job timed out after {max_wait_minutes} minutes. "
-                    f"Last status: {status}. Job ID: {job_id}"
-                )
-            time.sleep(30)  # Increased from 15 to 30 seconds
-        else:
-            # Unknown status - log warning but continue
-            print(f"Warning: Unknown status '{status}', continuing to wait...")
-            if iteration >= max_iterations:
-                raise TimeoutError(
-                    f"NeverBounce job timed out after {max_wait_minutes} minutes. "
-                    f"Last status: {status}. Job ID: {job_id}"
-                )
-            time.sleep(30)
+        time.sleep(30)  # Increased from 15 to 30 seconds
     
     download_results(job_id, output_path)
     print(f"Results downloaded to {output_path}")
 
 
+def _job_finished(status, full_response, iteration, max_iterations, max_wait_minutes, job_id):
+    """Log one status check; True when complete, raises on failure or timeout"""
+    # Print detailed status info
+    total = full_response.get("total", {})
+    print(f"Job status (check {iteration}/{max_iterations}): {status}")
+    if isinstance(total, dict):
+        print(f"  Progress: {total.get('processed', 0)}/{total.get('records', 0)} records")
+    
+    if status == "complete":
+        print("Job completed! Downloading results...")
+        return True
+    elif status in ["failed", "error"]:
+        raise Exception(f"NeverBounce job failed with status: {status}. Full response: {full_response}")
+    elif status in ["uploading", "parsing", "running", "under_review", "waiting"]:
+        # Job is still processing, continue waiting
+        if iteration >= max_iterations:
+            raise TimeoutError(
+                f"NeverBounce job timed out after {max_wait_minutes} minutes. "
+                f"Last status: {status}. Job ID: {job_id}"
+            )
+    else:
+        # Unknown status - log warning but continue
+        print(f"Warning: Unknown status '{status}', continuing to wait...")
+        if iteration >= max_iterations:
+            raise TimeoutError(
+                f"NeverBounce job timed out after {max_wait_minutes} minutes. "
+                f"Last status: {status}. Job ID: {job_id}"
+            )
+    return False
+
+
+# Temporary file for NeverBounce results
+TEMP_VERIFIED_PATH = "outputs/temp_neverbounce_results.csv"
+
+
 def verify_apollo_final_emails(file_path):
     """
     Verify emails in apollo_final.csv using NeverBounce and add verification status column
+
+    Returns:
+        DataFrame with the email and email_verification_status columns (the other
+        columns stay in the stage file and are not loaded)
     """
     print("Loading apollo_final.csv...")
-    df = pd.read_csv(file_path)
+    # Only the email column is needed while NeverBounce runs
+    df = read_stage(file_path, columns=["email"])
     print(f"Total leads: {len(df)}")
+
+    unique_emails = _emails_to_verify(df)
+    if len(unique_emails) == 0:
+        print("No emails to verify!")
+        return df
     
+    # Verify emails using NeverBounce
+    print("Starting NeverBounce email verification...")
+    print("This may take a few minutes...")
+    verify_emails(unique_emails, TEMP_VERIFIED_PATH)
+
+    return _apply_verification_results(file_path, TEMP_VERIFIED_PATH)
+
+
+def _emails_to_verify(df):
     # Extract emails
     email_list = df["email"].dropna().astype(str).tolist()
     # Filter out empty strings and invalid emails
@@ -146,19 +184,10 @@ def verify_apollo_final_emails(file_path):
     # Remove duplicates to avoid redundant checks
     unique_emails = list(set(email_list))
     print(f"Total unique emails to verify: {len(unique_emails)} (from {len(email_list)} total)")
-    
-    if len(unique_emails) == 0:
-        print("No emails to verify!")
-        return df
-    
-    # Create temporary file for NeverBounce results
-    temp_verified_path = "outputs/temp_neverbounce_results.csv"
-    
-    # Verify emails using NeverBounce
-    print("Starting NeverBounce email verification...")
-    print("This may take a few minutes...")
-    verify_emails(unique_emails, temp_verified_path)
-    
+    return unique_emails
+
+
+def _apply_verification_results(file_path, temp_verified_path):
     # Read verification results
     print("Reading verification results...")
     try:
@@ -180,13 +209,14 @@ def verify_apollo_final_emails(file_path):
     email_status_map = dict(zip(verified_df["email"], verified_df["status"]))
     
     # Add verification status column to original dataframe
+    df = read_stage(file_path, columns=["email"])
     df["email_verification_status"] = df["email"].astype(str).str.strip().str.lower().map(email_status_map)
     
     # Fill NaN values (emails that weren't verified) with "unknown"
     df["email_verification_status"] = df["email_verification_status"].fillna("unknown")
     
-    # Save back to the same file
-    df.to_csv(file_path, index=False)
+    # Save back to the same file; only the new column is written, the rest is copied over
+    update_stage(file_path, df[["email_verification_status"]])
     
     # Print summary
     status_counts = df["email_verification_status"].value_counts()
@@ -200,4 +230,65 @@ def verify_apollo_final_emails(file_path):
     
     print(f"\nUpdated {file_path} with email verification status")
     
-    return df
\ No newline at end of file
+    return df
+
+
+# Async variants (used by the pipelines' async runners)
+
+async def async_start_job(emails):
+    print(f"Sending request to create job with {len(emails)} emails...")
+    r = await async_post(f"{BASE_URL}/create", json=_job_payload(emails), timeout=120)
+    print(f"Response status code: {r.status_code}")
+    r.raise_for_status()
+    return _job_id_from(r.json())
+
+
+async def async_get_status(job_id):
+    r = await async_get(f"{BASE_URL}/status", params={"key": API_KEY, "job_id": job_id})
+    r.raise_for_status()
+    return _job_status_from(r.json())
+
+
+async def async_download_results(job_id, output_path):
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    r = await async_get(f"{BASE_URL}/download", params={"key": API_KEY, "job_id": job_id}, timeout=300)
+    print(f"Download response status: {r.status_code}")
+    r.raise_for_status()
+
+    await asyncio.to_thread(_write_results, output_path, r.content)
+
+
+def _write_results(output_path, content):
+    with open(output_path, "wb") as f:
+        f.write(content)
+
+
+async def async_verify_emails(emails, output_path="outputs/verified.csv", max_wait_minutes=30):
+    """Async counterpart of verify_emails; the 30 second status polls do not block the event loop"""
+    print(f"Creating NeverBounce job for {len(emails)} emails...")
+    job_id = await async_start_job(emails)
+    print(f"Job created with ID: {job_id}")
+
+    max_iterations = (max_wait_minutes * 60) // 30
+    iteration = 0
+    while True:
+        iteration += 1
+        status, full_response = await async_get_status(job_id)
+        if _job_finished(status, full_response, iteration, max_iterations, max_wait_minutes, job_id):
+            break
+        await asyncio.sleep(30)
+
+    await async_download_results(job_id, output_path)
+    print(f"Results downloaded to {output_path}")
+
+
+async def async_verify_apollo_final_emails(file_path):
+    """Async counterpart of verify_apollo_final_emails; stage file I/O runs in worker threads"""
+    df = await asyncio.to_thread(read_stage, file_path, columns=["email"])
+    unique_emails = _emails_to_verify(df)
+    if len(unique_emails) == 0:
+        print("No emails to verify!")
+        return df
+
+    await async_verify_emails(unique_emails, TEMP_VERIFIED_PATH)
+    return await asyncio.to_thread(_apply_verification_results, file_path, TEMP_VERIFIED_PATH)
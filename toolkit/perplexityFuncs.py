@@ -1,22 +1,111 @@
+import asyncio
+import inspect
+import httpx
 import requests
 import os
+import json
 import pandas as pd
+import random
+import threading
 import time
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
-from functions.apollo_icp_definitions import get_icp_for_industry
+from toolkit.asyncHttp import async_post
+from toolkit.httpClient import http_post
+from functions.apollo_icp_definitions import get_icp_for_industry, is_target_title
 from functions.gmaps_icp_definitions import get_icp_for_gmaps_search
 from functions.hubspot_icp_defination import get_hubspot_icp
+from toolkit.llmCache import get_cached_response, store_response
+from toolkit.resultJournal import ResultJournal, journal_path_for
+from functions.stage_storage import read_stage, update_stage
+from toolkit.websiteFetcher import WebsiteFetcher
+from toolkit.icpPrefilter import (
+    apply_prefilter,
+    prefilter_apollo_leads,
+    prefilter_gmaps_venues,
+    prefilter_hubspot_leads,
+)
 # Load environment variables
 load_dotenv()
 
 PERPLEXITY_API_KEY = os.getenv("PERPLEXITY_API_KEY")
 PERPLEXITY_API_URL = "https://api.perplexity.ai/chat/completions"
 
-def call_perplexity_api(prompt, model="sonar"):
-    """
-    Call Perplexity API to get a response
-    """
+# Requests per minute allowed by our Perplexity tier; the default of the "perplexity"
+# vendor budget, which every pipeline in the process shares (see vendorQuota)
+PERPLEXITY_REQUESTS_PER_MINUTE = int(os.getenv("PERPLEXITY_REQUESTS_PER_MINUTE", "50"))
+# Number of evaluation requests in flight at once
+PERPLEXITY_MAX_WORKERS = int(os.getenv("PERPLEXITY_MAX_WORKERS", "8"))
+# Retries for rate-limited (429) or temporarily failing (5xx) requests
+PERPLEXITY_MAX_RETRIES = int(os.getenv("PERPLEXITY_MAX_RETRIES", "4"))
+
+# Leads of the same industry scored per request in batched mode (0 = one lead per request)
+PERPLEXITY_BATCH_SIZE = int(os.getenv("PERPLEXITY_BATCH_SIZE", "0"))
+# Output tokens budgeted per lead in a batched response
+PERPLEXITY_BATCH_TOKENS_PER_LEAD = 80
+# Score each Apollo company once and share it across contacts with an equivalent title/seniority
+APOLLO_SHARE_COMPANY_SCORES = os.getenv("APOLLO_SHARE_COMPANY_SCORES", "false").lower() == "true"
+# Fetch each venue's website and include its text in the Google Maps prompt
+GMAPS_FETCH_WEBSITES = os.getenv("GMAPS_FETCH_WEBSITES", "true").lower() == "true"
+
+# Tiered scoring: a cheap short-answer pass for everyone, a stronger model for borderline leads
+PERPLEXITY_TIERED_SCORING = os.getenv("PERPLEXITY_TIERED_SCORING", "false").lower() == "true"
+PERPLEXITY_TIER1_MODEL = os.getenv("PERPLEXITY_TIER1_MODEL", "sonar")
+PERPLEXITY_TIER1_MAX_TOKENS = int(os.getenv("PERPLEXITY_TIER1_MAX_TOKENS", "60"))
+PERPLEXITY_TIER2_MODEL = os.getenv("PERPLEXITY_TIER2_MODEL", "sonar-pro")
+PERPLEXITY_TIER2_MAX_TOKENS = int(os.getenv("PERPLEXITY_TIER2_MAX_TOKENS", "500"))
+# Tier 1 scores in this inclusive range are escalated to tier 2
+PERPLEXITY_ESCALATE_MIN_SCORE = float(os.getenv("PERPLEXITY_ESCALATE_MIN_SCORE", "4"))
+PERPLEXITY_ESCALATE_MAX_SCORE = float(os.getenv("PERPLEXITY_ESCALATE_MAX_SCORE", "7"))
+
+# Structured output: the model must answer {"score": number, "reason": "one line"}
+PERPLEXITY_STRUCTURED_OUTPUT = os.getenv("PERPLEXITY_STRUCTURED_OUTPUT", "false").lower() == "true"
+# Enough for the JSON object with a one-line reason
+PERPLEXITY_STRUCTURED_MAX_TOKENS = int(os.getenv("PERPLEXITY_STRUCTURED_MAX_TOKENS", "80"))
+STRUCTURED_REASON_MAX_CHARS = 200
+
+SCORE_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "schema": {
+            "type": "object",
+            "properties": {
+                "score": {"type": "number", "minimum": 0, "maximum": 10},
+                "reason": {"type": "string", "maxLength": STRUCTURED_REASON_MAX_CHARS},
+            },
+            "required": ["score", "reason"],
+        }
+    },
+}
+
+TIER1_PROMPT_SUFFIX = "\nKeep it short: reply only with \"Score: X/10 - [one short sentence]\"."
+
+_tier_stats_lock = threading.Lock()
+_tier_stats = {
+    "tier1": {"calls": 0, "seconds": 0.0},
+    "tier2": {"calls": 0, "seconds": 0.0},
+}
+
+DEFAULT_SYSTEM_PROMPT = "You are an expert at evaluating B2B leads and determining if they match an Ideal Customer Profile (ICP). Always respond with a score from 0-10 and a brief explanation."
+STRUCTURED_SYSTEM_PROMPT = "You are an expert at evaluating B2B leads and determining if they match an Ideal Customer Profile (ICP). Always respond with a JSON object only: {\"score\": <0-10>, \"reason\": \"<one short sentence>\"}."
+STRUCTURED_PROMPT_SUFFIX = "\nIgnore the response format above and reply with the JSON object only."
+BATCH_SYSTEM_PROMPT = "You are an expert at evaluating B2B leads and determining if they match an Ideal Customer Profile (ICP). Always respond with a JSON array only, no prose."
+
+# Precompiled score parsers
+_SCORE_PATTERNS = [
+    re.compile(r'score[:\s]+(\d+(?:\.\d+)?)'),
+    re.compile(r'(\d+(?:\.\d+)?)\s*/\s*10'),
+    re.compile(r'rating[:\s]+(\d+(?:\.\d+)?)'),
+    re.compile(r'(\d+(?:\.\d+)?)\s*out\s*of\s*10'),
+    re.compile(r'\b([0-9]|10)\b'),  # Last resort: any number 0-10
+]
+_JSON_OBJECT_RE = re.compile(r'\{.*\}', re.DOTALL)
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def _perplexity_request(prompt, model, system_prompt, max_tokens, response_format):
+    """Headers and JSON payload of one chat completion request"""
     headers = {
         "Authorization": f"Bearer {PERPLEXITY_API_KEY}",
         "Content-Type": "application/json"
@@ -27,7 +116,7 @@ def call_perplexity_api(prompt, model="sonar"):
         "messages": [
             {
                 "role": "system",
-                "content": "You are an expert at evaluating B2B leads and determining if they match an Ideal Customer Profile (ICP). Always respond with a score from 0-10 and a brief explanation."
+                "content": system_prompt
             },
             {
                 "role": "user",
@@ -35,25 +124,59 @@ def call_perplexity_api(prompt, model="sonar"):
             }
         ],
         "temperature": 0.2,
-        "max_tokens": 500
+        "max_tokens": max_tokens
     }
-    
-    try:
-        response = requests.post(PERPLEXITY_API_URL, headers=headers, json=payload, timeout=30)
-        response.raise_for_status()
-        return response.json()["choices"][0]["message"]["content"]
-    except requests.exceptions.HTTPError as e:
-        error_detail = ""
+    if response_format:
+        payload["response_format"] = response_format
+    return headers, payload
+
+
+def _retry_delay(response, attempt):
+    retry_after = response.headers.get("Retry-After")
+    return float(retry_after) if retry_after and retry_after.isdigit() else random.uniform(0, 2 ** (attempt + 1))
+
+
+def call_perplexity_api(prompt, model="sonar", system_prompt=DEFAULT_SYSTEM_PROMPT, max_tokens=500, response_format=None):
+    """
+    Call Perplexity API to get a response
+
+    response_format is passed through as-is (e.g. SCORE_RESPONSE_FORMAT) to
+    constrain the answer to a JSON schema.
+    """
+    headers, payload = _perplexity_request(prompt, model, system_prompt, max_tokens, response_format)
+
+    # Identical prompts are served from the on-disk LLM cache
+    cached = get_cached_response(model, system_prompt, prompt, max_tokens)
+    if cached is not None:
+        return cached
+
+    for attempt in range(PERPLEXITY_MAX_RETRIES + 1):
         try:
-            error_detail = response.json()
-        except:
-            error_detail = response.text
-        print(f"Error calling Perplexity API: {e}")
-        print(f"Response: {error_detail}")
-        return None
-    except Exception as e:
-        print(f"Error calling Perplexity API: {e}")
-        return None
+            started = time.monotonic()
+            response = http_post(PERPLEXITY_API_URL, headers=headers, json=payload, timeout=30, retries=0)
+            if response.status_code == 429 or response.status_code >= 500:
+                if attempt < PERPLEXITY_MAX_RETRIES:
+                    # A 429 has already paused the shared Perplexity budget (see vendorQuota)
+                    delay = _retry_delay(response, attempt)
+                    print(f"Perplexity returned {response.status_code}, retrying in {delay:.1f}s")
+                    time.sleep(delay)
+                    continue
+            response.raise_for_status()
+            content = response.json()["choices"][0]["message"]["content"]
+            store_response(model, system_prompt, prompt, content, time.monotonic() - started, max_tokens)
+            return content
+        except requests.exceptions.HTTPError as e:
+            error_detail = ""
+            try:
+                error_detail = response.json()
+            except:
+                error_detail = response.text
+            print(f"Error calling Perplexity API: {e}")
+            print(f"Response: {error_detail}")
+            return None
+        except Exception as e:
+            print(f"Error calling Perplexity API: {e}")
+            return None
 
 def extract_score_from_response(response_text):
     """
@@ -65,16 +188,9 @@ def extract_score_from_response(response_text):
     
     # Try to find a number between 0-10 in the response
     # Look for patterns like "Score: 8", "8/10", "rating of 7", etc.
-    patterns = [
-        r'score[:\s]+(\d+(?:\.\d+)?)',
-        r'(\d+(?:\.\d+)?)\s*/\s*10',
-        r'rating[:\s]+(\d+(?:\.\d+)?)',
-        r'(\d+(?:\.\d+)?)\s*out\s*of\s*10',
-        r'\b([0-9]|10)\b'  # Last resort: any number 0-10
-    ]
-    
-    for pattern in patterns:
-        matches = re.findall(pattern, response_text.lower())
+    text = response_text.lower()
+    for pattern in _SCORE_PATTERNS:
+        matches = pattern.findall(text)
         if matches:
             try:
                 score = float(matches[0])
@@ -87,9 +203,68 @@ def extract_score_from_response(response_text):
     # If no score found, return default
     return 5.0
 
-def create_icp_evaluation_prompt(lead_data):
+def parse_structured_score(response_text):
     """
-    Create a prompt to evaluate if a lead matches the ICP
+    Validate a structured-output answer against SCORE_RESPONSE_FORMAT
+
+    Returns:
+        (score, reason) tuple, or None if the answer is not a valid score object
+    """
+    if not response_text:
+        return None
+
+    match = _JSON_OBJECT_RE.search(response_text)
+    if not match:
+        return None
+    try:
+        data = json.loads(match.group(0))
+    except ValueError:
+        return None
+
+    if not isinstance(data, dict):
+        return None
+    score = data.get("score")
+    reason = data.get("reason")
+    if isinstance(score, bool) or not isinstance(score, (int, float)) or not 0 <= score <= 10:
+        return None
+    if not isinstance(reason, str):
+        return None
+
+    reason = _WHITESPACE_RE.sub(" ", reason).strip()[:STRUCTURED_REASON_MAX_CHARS]
+    return round(float(score), 1), reason
+
+
+def read_score(response_text, structured=False):
+    """
+    Score and evaluation text to store for one response
+
+    Structured answers are validated first; anything else falls back to the
+    free-text extract_score_from_response.
+    """
+    if structured:
+        parsed = parse_structured_score(response_text)
+        if parsed:
+            return parsed
+    # Store first 500 chars of evaluation
+    return extract_score_from_response(response_text), response_text[:500]
+
+
+def call_perplexity_for_score(prompt, model="sonar", max_tokens=500, structured=False):
+    """Single-lead scoring call, in structured-output mode if requested"""
+    if structured:
+        return call_perplexity_api(
+            prompt + STRUCTURED_PROMPT_SUFFIX,
+            model=model,
+            system_prompt=STRUCTURED_SYSTEM_PROMPT,
+            max_tokens=min(max_tokens, PERPLEXITY_STRUCTURED_MAX_TOKENS),
+            response_format=SCORE_RESPONSE_FORMAT,
+        )
+    return call_perplexity_api(prompt, model=model, max_tokens=max_tokens)
+
+
+def format_apollo_lead_details(lead_data):
+    """
+    Format the lead attributes block shared by the single and batched Apollo prompts
     """
     # Helper function to safely get and format values
     def safe_get(key, default='N/A', max_len=None):
@@ -101,14 +276,7 @@ def create_icp_evaluation_prompt(lead_data):
             return value_str[:max_len] + '...'
         return value_str
 
-    # Get industry-specific ICP
-    industry = safe_get('industry')
-    icp_criteria = get_icp_for_industry(industry)
-
-    prompt = f"""Evaluate if this B2B lead matches our Ideal Customer Profile (ICP) and provide a score from 0-10.
-
-Lead Information:
-- Name: {safe_get('full_name')}
+    return f"""- Name: {safe_get('full_name')}
 - Job Title: {safe_get('job_title')}
 - Company: {safe_get('company_name')}
 - Industry: {safe_get('industry')}
@@ -117,7 +285,27 @@ Lead Information:
 - Company Description: {safe_get('company_description', max_len=500)}
 - Location: {safe_get('city')}, {safe_get('state')}, {safe_get('country')}
 - Seniority Level: {safe_get('seniority_level')}
-- Company Technologies: {safe_get('company_technologies', max_len=300)}
+- Company Technologies: {safe_get('company_technologies', max_len=300)}"""
+
+
+def _industry_of(lead_data):
+    industry = lead_data.get('industry', 'N/A')
+    if pd.isna(industry) or industry == '' or industry == 'nan':
+        return 'N/A'
+    return str(industry)
+
+
+def create_icp_evaluation_prompt(lead_data):
+    """
+    Create a prompt to evaluate if a lead matches the ICP
+    """
+    # Get industry-specific ICP
+    icp_criteria = get_icp_for_industry(_industry_of(lead_data))
+
+    prompt = f"""Evaluate if this B2B lead matches our Ideal Customer Profile (ICP) and provide a score from 0-10.
+
+Lead Information:
+{format_apollo_lead_details(lead_data)}
 
 ICP Criteria:
 {icp_criteria}
@@ -131,6 +319,67 @@ Format your response as: "Score: X/10 - [explanation]"
     return prompt
 
 
+def create_icp_batch_evaluation_prompt(leads, icp_criteria):
+    """
+    Create one prompt scoring several leads against the same ICP
+
+    Args:
+        leads: List of (lead_id, lead_details_text) tuples
+        icp_criteria: ICP text shared by every lead in the batch
+    """
+    lead_blocks = "\n\n".join(
+        f"Lead ID: {lead_id}\n{details}" for lead_id, details in leads
+    )
+
+    prompt = f"""Evaluate if each of the following B2B leads matches our Ideal Customer Profile (ICP) and score each one from 0-10.
+
+ICP Criteria:
+{icp_criteria}
+
+Leads:
+{lead_blocks}
+
+For every lead return:
+1. "id": the Lead ID exactly as given
+2. "score": a number from 0-10 (where 10 is a perfect ICP match)
+3. "explanation": a brief 1-2 sentence explanation
+
+Respond with only a JSON array, for example: [{{"id": "1", "score": 7, "explanation": "..."}}]
+"""
+    return prompt
+
+
+def parse_batch_scores(response_text):
+    """
+    Parse a batched response into {id: (score, explanation)}
+
+    Entries that are missing or malformed are simply absent from the result.
+    """
+    if not response_text:
+        return {}
+
+    start = response_text.find('[')
+    end = response_text.rfind(']')
+    if start == -1 or end <= start:
+        return {}
+
+    try:
+        entries = json.loads(response_text[start:end + 1])
+    except ValueError:
+        return {}
+
+    scores = {}
+    for entry in entries if isinstance(entries, list) else []:
+        if not isinstance(entry, dict) or 'id' not in entry:
+            continue
+        try:
+            score = round(max(0, min(10, float(entry.get('score')))), 1)
+        except (TypeError, ValueError):
+            continue
+        scores[str(entry['id'])] = (score, str(entry.get('explanation', '')).strip())
+    return scores
+
+
 def create_icp_evaluation_prompt_gmaps(lead_data, scraped_website_text: str = ""):
     """
     Create a prompt to evaluate if a Google Maps venue matches the ICP
@@ -232,120 +481,423 @@ Format your response as: "Score: X/10 - [explanation]"
     return prompt
 6
 
-def evaluate_leads_with_perplexity(file_path):
+def _record_tier_call(tier, seconds):
+    with _tier_stats_lock:
+        _tier_stats[tier]["calls"] += 1
+        _tier_stats[tier]["seconds"] += seconds
+
+
+def get_scoring_tier_stats():
+    """Snapshot of the process-wide per-tier call counts and latency"""
+    with _tier_stats_lock:
+        return {tier: dict(stats) for tier, stats in _tier_stats.items()}
+
+
+def scoring_tier_stats_since(snapshot):
+    """Per-tier calls, total and average latency since an earlier get_scoring_tier_stats() snapshot"""
+    current = get_scoring_tier_stats()
+    report = {}
+    for tier, stats in current.items():
+        calls = stats["calls"] - snapshot[tier]["calls"]
+        seconds = stats["seconds"] - snapshot[tier]["seconds"]
+        report[tier] = {
+            "calls": calls,
+            "total_seconds": round(seconds, 1),
+            "avg_seconds": round(seconds / calls, 2) if calls else 0.0,
+        }
+    return report
+
+
+def call_perplexity_tiered(prompt, structured=False):
     """
-    Read apollo_final.csv, evaluate each lead using Perplexity API,
-    and add ICP score columns directly to the same file
+    Score with the cheap tier first and escalate only borderline results
+
+    Tier 1 runs PERPLEXITY_TIER1_MODEL with a short-answer instruction and a small
+    max_tokens. Scores between PERPLEXITY_ESCALATE_MIN_SCORE and
+    PERPLEXITY_ESCALATE_MAX_SCORE (or a failed tier 1 call) are re-scored by
+    PERPLEXITY_TIER2_MODEL with the full prompt.
     """
-    print("Loading Apollo final leads...")
-    df = pd.read_csv(file_path)
-    print(f"Total leads to evaluate: {len(df)}")
-    
+    started = time.monotonic()
+    response = call_perplexity_for_score(
+        prompt if structured else prompt + TIER1_PROMPT_SUFFIX,
+        model=PERPLEXITY_TIER1_MODEL,
+        max_tokens=PERPLEXITY_TIER1_MAX_TOKENS,
+        structured=structured,
+    )
+    _record_tier_call("tier1", time.monotonic() - started)
+
+    if response:
+        score, _ = read_score(response, structured)
+        if not (PERPLEXITY_ESCALATE_MIN_SCORE <= score <= PERPLEXITY_ESCALATE_MAX_SCORE):
+            return response
+
+    started = time.monotonic()
+    escalated = call_perplexity_for_score(
+        prompt,
+        model=PERPLEXITY_TIER2_MODEL,
+        max_tokens=PERPLEXITY_TIER2_MAX_TOKENS,
+        structured=structured,
+    )
+    _record_tier_call("tier2", time.monotonic() - started)
+    return escalated or response
+
+
+def _set_score(df, index, score, evaluation, journal=None):
+    """Write a score to its row and checkpoint it in the result journal"""
+    df.at[index, 'icp_score'] = score
+    df.at[index, 'icp_evaluation'] = evaluation
+    if journal is not None:
+        journal.record(df.loc[index], {'icp_score': score, 'icp_evaluation': evaluation})
+
+
+def evaluate_rows_with_perplexity(df, build_prompt, describe_row, noun="lead", max_workers=None, journal=None, tiered=None, structured=None):
+    """
+    Score every row of df that has no icp_score yet, many requests at a time
+
+    Requests run on a thread pool and share the process-wide "perplexity" vendor
+    budget, so throughput stays within it however many workers or pipelines run.
+    Results are written back to the row's own index as each request completes.
+
+    Args:
+        df: DataFrame with icp_score / icp_evaluation columns (updated in place)
+        build_prompt: Function taking a row dict and returning the prompt
+        describe_row: Function taking a row and returning a short label for logs
+        noun: Word used in log messages ("lead", "venue", ...)
+        max_workers: Concurrent requests (default: PERPLEXITY_MAX_WORKERS)
+        journal: Optional ResultJournal each score is checkpointed to as it arrives
+        tiered: Use call_perplexity_tiered (default: PERPLEXITY_TIERED_SCORING)
+        structured: Request SCORE_RESPONSE_FORMAT JSON answers (default: PERPLEXITY_STRUCTURED_OUTPUT)
+
+    Returns:
+        The updated DataFrame
+    """
+    max_workers = max_workers or PERPLEXITY_MAX_WORKERS
+    if tiered is None:
+        tiered = PERPLEXITY_TIERED_SCORING
+    if structured is None:
+        structured = PERPLEXITY_STRUCTURED_OUTPUT
+    tier_snapshot = get_scoring_tier_stats()
+
+    # Process each row (skip if already has a score)
+    leads_to_evaluate = df[df['icp_score'].isna() | (df['icp_score'] == '')]
+    already_scored = len(df) - len(leads_to_evaluate)
+
+    if already_scored > 0:
+        print(f"Skipping {already_scored} {noun}s that already have scores")
+
+    total = len(leads_to_evaluate)
+    print(f"Evaluating {total} {noun}s with {max_workers} workers")
+
+    def evaluate(row):
+        prompt = build_prompt(row.to_dict())
+        if tiered:
+            return call_perplexity_tiered(prompt, structured)
+        return call_perplexity_for_score(prompt, structured=structured)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(evaluate, row): (index, row)
+            for index, row in leads_to_evaluate.iterrows()
+        }
+
+        for done, future in enumerate(as_completed(futures), start=1):
+            index, row = futures[future]
+            print(f"\nEvaluated {noun} {done}/{total}: {describe_row(row)}")
+            try:
+                response = future.result()
+            except Exception as e:
+                print(f"  Error: {e}")
+                response = None
+
+            if response:
+                score, evaluation = read_score(response, structured)
+                _set_score(df, index, score, evaluation, journal)
+
+                print(f"  Score: {score}/10")
+                print(f"  Evaluation: {evaluation[:200]}...")
+            else:
+                df.at[index, 'icp_score'] = 5.0  # Default score on error
+                df.at[index, 'icp_evaluation'] = "Error: Could not evaluate"
+                print(f"  Error: Could not get evaluation, using default score 5.0")
+
+    if tiered:
+        for tier, stats in scoring_tier_stats_since(tier_snapshot).items():
+            print(f"{tier}: {stats['calls']} calls, avg {stats['avg_seconds']}s")
+
+    return df
+
+
+def evaluate_rows_in_batches(df, group_key, format_lead, get_icp, noun="lead", batch_size=None, max_workers=None, journal=None):
+    """
+    Score unscored rows N at a time, one request per batch of rows sharing an ICP
+
+    The system prompt and ICP block are sent once per batch instead of once per
+    row. Rows whose entry is missing or unparsable in the JSON answer keep an
+    empty score so the single-row pass that follows picks them up.
+
+    Args:
+        df: DataFrame with icp_score / icp_evaluation columns (updated in place)
+        group_key: Function taking a row dict and returning its ICP group (e.g. industry)
+        format_lead: Function taking a row dict and returning its details block
+        get_icp: Function taking a group and returning the ICP text
+        noun: Word used in log messages
+        batch_size: Rows per request (default: PERPLEXITY_BATCH_SIZE)
+        max_workers: Concurrent requests (default: PERPLEXITY_MAX_WORKERS)
+        journal: Optional ResultJournal each score is checkpointed to as it arrives
+
+    Returns:
+        Number of rows scored by batched requests
+    """
+    batch_size = batch_size or PERPLEXITY_BATCH_SIZE
+    max_workers = max_workers or PERPLEXITY_MAX_WORKERS
+
+    pending = df[df['icp_score'].isna() | (df['icp_score'] == '')]
+    groups = {}
+    for index, row in pending.iterrows():
+        groups.setdefault(group_key(row.to_dict()), []).append(index)
+
+    batches = [
+        (group, indices[i:i + batch_size])
+        for group, indices in groups.items()
+        for i in range(0, len(indices), batch_size)
+    ]
+    print(f"Scoring {len(pending)} {noun}s in {len(batches)} batched requests of up to {batch_size}")
+
+    def evaluate(group, indices):
+        leads = [(str(n), format_lead(df.loc[index].to_dict())) for n, index in enumerate(indices, start=1)]
+        prompt = create_icp_batch_evaluation_prompt(leads, get_icp(group))
+        response = call_perplexity_api(
+            prompt,
+            system_prompt=BATCH_SYSTEM_PROMPT,
+            max_tokens=PERPLEXITY_BATCH_TOKENS_PER_LEAD * len(indices),
+        )
+        return parse_batch_scores(response)
+
+    scored = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(evaluate, group, indices): indices
+            for group, indices in batches
+        }
+
+        for future in as_completed(futures):
+            indices = futures[future]
+            try:
+                scores = future.result()
+            except Exception as e:
+                print(f"  Batch error: {e}")
+                scores = {}
+
+            batch_scored = 0
+            for n, index in enumerate(indices, start=1):
+                if str(n) not in scores:
+                    continue
+                score, explanation = scores[str(n)]
+                _set_score(df, index, score, f"Score: {score}/10 - {explanation}"[:500], journal)
+                batch_scored += 1
+
+            scored += batch_scored
+            print(f"  Batch scored {batch_scored}/{len(indices)} {noun}s")
+
+    fallback = len(pending) - scored
+    if fallback:
+        print(f"{fallback} {noun}s could not be parsed from batches, falling back to single-{noun} calls")
+    return scored
+
+
+# Columns each evaluation reads: journal keys, prompt fields, pre-filter inputs and
+# (Apollo) the company score-sharing keys. The rest of the stage file is not loaded.
+APOLLO_EVALUATION_COLUMNS = [
+    'email', 'full_name', 'job_title', 'company_name', 'company_domain', 'industry',
+    'company_size', 'company_website', 'company_description', 'city', 'state',
+    'country', 'seniority_level', 'company_technologies',
+]
+GMAPS_EVALUATION_COLUMNS = [
+    'url', 'title', 'address', 'website', 'city', 'state', 'countryCode', 'totalScore',
+    'reviewsCount', 'categories', 'categoryName', 'icp',
+]
+HUBSPOT_EVALUATION_COLUMNS = ['email', 'firstname', 'lastname']
+
+
+def _load_for_evaluation(file_path, key_columns, columns):
+    df = read_stage(file_path, columns=columns + ['icp_score', 'icp_evaluation'])
+
     # Check if columns already exist, if so, only update missing scores
     if 'icp_score' not in df.columns:
         df['icp_score'] = None
     if 'icp_evaluation' not in df.columns:
         df['icp_evaluation'] = None
-    
-    # Process each lead (skip if already has a score)
-    total_leads = len(df)
-    leads_to_evaluate = df[df['icp_score'].isna() | (df['icp_score'] == '')].copy()
-    leads_already_scored = total_leads - len(leads_to_evaluate)
-    
-    if leads_already_scored > 0:
-        print(f"Skipping {leads_already_scored} leads that already have scores")
-    
-    for idx, (index, row) in enumerate(leads_to_evaluate.iterrows()):
-        print(f"\nEvaluating lead {idx + 1}/{len(leads_to_evaluate)}: {row.get('full_name', 'N/A')} at {row.get('company_name', 'N/A')}")
-        
-        # Create evaluation prompt
-        prompt = create_icp_evaluation_prompt(row.to_dict())
-        
-        # Call Perplexity API
-        response = call_perplexity_api(prompt)
-        
-        if response:
-            # Extract score
-            score = extract_score_from_response(response)
-            df.at[index, 'icp_score'] = score
-            df.at[index, 'icp_evaluation'] = response[:500]  # Store first 500 chars of evaluation
-            
-            print(f"  Score: {score}/10")
-            print(f"  Evaluation: {response[:200]}...")
-        else:
-            df.at[index, 'icp_score'] = 5.0  # Default score on error
-            df.at[index, 'icp_evaluation'] = "Error: Could not evaluate"
-            print(f"  Error: Could not get evaluation, using default score 5.0")
-        
-        # Rate limiting - wait 1 second between requests to avoid hitting API limits
-        if idx < len(leads_to_evaluate) - 1:  # Don't wait after last request
-            time.sleep(1)
-    
+
+    # Restore scores checkpointed by an earlier run that did not finish
+    journal = ResultJournal(journal_path_for(file_path, "icp"), key_columns)
+    journal.merge_into(df, ['icp_score', 'icp_evaluation'])
+    return df, journal
+
+
+def _save_evaluation(df, file_path, noun, journal):
     # Sort by score (highest first)
     df = df.sort_values(by='icp_score', ascending=False, na_position='last')
-    
-    # Save back to the same file (overwrite)
-    df.to_csv(file_path, index=False)
-    print(f"\nCompleted! Updated {len(df)} leads with ICP scores in {file_path}")
+
+    # Save back to the same file (overwrite): rows in score order, only the score columns rewritten
+    update_stage(file_path, df[['icp_score', 'icp_evaluation']])
+    journal.remove()
+    print(f"\nCompleted! Updated {len(df)} {noun} with ICP scores in {file_path}")
     print(f"Score distribution:")
     print(df['icp_score'].describe())
-    
+
     return df
 
 
+def _describe_hubspot_row(row):
+    firstname = str(row.get('firstname', 'N/A'))
+    lastname = str(row.get('lastname', 'N/A'))
+    email = str(row.get('email', 'N/A'))
+    full_name = f"{firstname} {lastname}".strip()
+    return f"{full_name} ({email})"
+
+
+def _score_apollo_rows(df, batch_size, journal=None):
+    if batch_size > 1:
+        evaluate_rows_in_batches(
+            df,
+            _industry_of,
+            format_apollo_lead_details,
+            get_icp_for_industry,
+            noun="lead",
+            batch_size=batch_size,
+            journal=journal,
+        )
+
+    # Single-lead pass (everything when not batching, otherwise only batch leftovers)
+    evaluate_rows_with_perplexity(
+        df,
+        create_icp_evaluation_prompt,
+        lambda row: f"{row.get('full_name', 'N/A')} at {row.get('company_name', 'N/A')}",
+        noun="lead",
+        journal=journal,
+    )
+
+
+def _company_score_group(index, lead_data):
+    """
+    Contacts in the same group would get the same score: same company and industry,
+    same seniority, and the same answer to "is this one of the industry's target titles"
+    """
+    domain = str(lead_data.get('company_domain', '')).strip().lower()
+    if not domain or domain == 'nan':
+        return ('row', index)
+
+    industry = _industry_of(lead_data)
+    seniority = str(lead_data.get('seniority_level', '')).strip().lower()
+    if seniority == 'nan':
+        seniority = ''
+    return (domain, industry, seniority, is_target_title(industry, lead_data.get('job_title')))
+
+
+def share_company_scores(df, batch_size=0, journal=None):
+    """
+    Score one contact per company group and copy the result to the rest of the group
+
+    Rows are grouped by company_domain and industry, and split further by seniority
+    and target-title match, the only contact attributes that move the score. Groups
+    whose representative could not be evaluated are left for the per-contact pass.
+
+    Returns:
+        Number of contacts that reused a company score
+    """
+    pending = df[df['icp_score'].isna() | (df['icp_score'] == '')]
+    groups = {}
+    for index, row in pending.iterrows():
+        groups.setdefault(_company_score_group(index, row.to_dict()), []).append(index)
+
+    representatives = [indices[0] for indices in groups.values()]
+    print(f"Sharing company scores: {len(pending)} leads in {len(representatives)} company groups")
+
+    rep_df = df.loc[representatives].copy()
+    _score_apollo_rows(rep_df, batch_size, journal)
+    df.loc[representatives, ['icp_score', 'icp_evaluation']] = rep_df[['icp_score', 'icp_evaluation']]
+
+    shared = 0
+    for indices in groups.values():
+        rep_index = indices[0]
+        evaluation = str(df.at[rep_index, 'icp_evaluation'])
+        if evaluation.startswith("Error"):
+            continue
+        for index in indices[1:]:
+            _set_score(df, index, df.at[rep_index, 'icp_score'], f"Shared company score: {evaluation}"[:500], journal)
+            shared += 1
+
+    print(f"Reused company scores for {shared} leads")
+    return shared
+
+
+def evaluate_leads_with_perplexity(file_path, batch_size=None, share_scores=None):
+    """
+    Read apollo_final.csv, evaluate each lead using Perplexity API,
+    and add ICP score columns directly to the same file
+
+    With batch_size > 1 (default: PERPLEXITY_BATCH_SIZE) leads of the same industry
+    are scored several per request, with single-lead calls for any that fail to parse.
+    With share_scores (default: APOLLO_SHARE_COMPANY_SCORES) each company is scored
+    once per distinct seniority / target-title combination.
+    Clear accepts/rejects are settled by the local ICP pre-filter first.
+    """
+    print("Loading Apollo final leads...")
+    df, journal = _load_for_evaluation(file_path, ['email'], APOLLO_EVALUATION_COLUMNS)
+    print(f"Total leads to evaluate: {len(df)}")
+
+    if batch_size is None:
+        batch_size = PERPLEXITY_BATCH_SIZE
+    if share_scores is None:
+        share_scores = APOLLO_SHARE_COMPANY_SCORES
+
+    # Settle obvious accepts/rejects locally; only ambiguous leads go to Perplexity
+    apply_prefilter(df, prefilter_apollo_leads, noun="lead")
+
+    if share_scores:
+        share_company_scores(df, batch_size, journal)
+
+    _score_apollo_rows(df, batch_size, journal)
+
+    return _save_evaluation(df, file_path, "leads", journal)
+
+
 def evaluate_gmaps_with_perplexity(file_path):
     """
     Read Google Maps CSV, evaluate each venue using Perplexity API,
     and add ICP score columns directly to the same file
     """
     print("Loading Google Maps venues...")
-    df = pd.read_csv(file_path)
+    df, journal = _load_for_evaluation(file_path, ['url', 'title', 'address'], GMAPS_EVALUATION_COLUMNS)
     print(f"Total venues to evaluate: {len(df)}")
-    
-    if 'icp_score' not in df.columns:
-        df['icp_score'] = None
-    if 'icp_evaluation' not in df.columns:
-        df['icp_evaluation'] = None
 
-    # Process each venue (skip if already has a score)
-    total_venues = len(df)
-    leads_to_evaluate = df[df['icp_score'].isna() | (df['icp_score'] == '')].copy()
-    venues_already_scored = total_venues - len(leads_to_evaluate)
-    
-    if venues_already_scored > 0:
-        print(f"Skipping {venues_already_scored} venues that already have scores")
-
-    for idx, (index, row) in enumerate(leads_to_evaluate.iterrows()):
-        print(f"\nEvaluating venue {idx+1}/{len(leads_to_evaluate)}: {row.get('title', 'N/A')}")
-        
-        # Create evaluation prompt
-        prompt = create_icp_evaluation_prompt_gmaps(row.to_dict())
-        
-        # Call Perplexity API
-        response = call_perplexity_api(prompt)
-        
-        if response:
-            score = extract_score_from_response(response)
-            df.at[index, 'icp_score'] = score
-            df.at[index, 'icp_evaluation'] = (response or "")[:500]
-            
-            print(f"  Score: {score}/10")
-            print(f"  Evaluation: {str(response)[:200]}...")
-        else:
-            df.at[index, 'icp_score'] = 5.0
-            df.at[index, 'icp_evaluation'] = "Error: Could not evaluate"
-            print(f"  Error: Could not get evaluation, using default score 5.0")
+    apply_prefilter(df, prefilter_gmaps_venues, noun="venue")
 
-        if idx < len(leads_to_evaluate) - 1:
-            time.sleep(1)
+    build_prompt = create_icp_evaluation_prompt_gmaps
+    fetcher = None
+    if GMAPS_FETCH_WEBSITES and 'website' in df.columns:
+        # Websites download in the background; each scoring worker only waits for its own venue's page
+        fetcher = WebsiteFetcher()
+        unscored = df['icp_score'].isna() | (df['icp_score'] == '')
+        fetcher.prefetch(df.loc[unscored, 'website'])
+
+        def build_prompt(lead_data):
+            return create_icp_evaluation_prompt_gmaps(lead_data, fetcher.get_text(lead_data.get('website')))
+
+    try:
+        evaluate_rows_with_perplexity(
+            df,
+            build_prompt,
+            lambda row: f"{row.get('title', 'N/A')}",
+            noun="venue",
+            journal=journal,
+        )
+    finally:
+        if fetcher is not None:
+            fetcher.shutdown()
+
+    return _save_evaluation(df, file_path, "venues", journal)
 
-    df = df.sort_values(by='icp_score', ascending=False, na_position='last')
-    df.to_csv(file_path, index=False)
-    print(f"\nCompleted! Updated {len(df)} venues with ICP scores in {file_path}")
-    print(f"Score distribution:")
-    print(df['icp_score'].describe())
-    
-    return df
 
 def evaluate_hubspot_with_perplexity(file_path):
     """
@@ -353,54 +905,205 @@ def evaluate_hubspot_with_perplexity(file_path):
     and add ICP score columns directly to the same file
     """
     print("Loading HubSpot leads...")
-    df = pd.read_csv(file_path)
+    df, journal = _load_for_evaluation(file_path, ['email'], HUBSPOT_EVALUATION_COLUMNS)
     print(f"Total leads to evaluate: {len(df)}")
-    
-    if 'icp_score' not in df.columns:
-        df['icp_score'] = None
-    if 'icp_evaluation' not in df.columns:
-        df['icp_evaluation'] = None
 
-    # Process each lead (skip if already has a score)
-    total_leads = len(df)
-    leads_to_evaluate = df[df['icp_score'].isna() | (df['icp_score'] == '')].copy()
-    leads_already_scored = total_leads - len(leads_to_evaluate)
-    
-    if leads_already_scored > 0:
-        print(f"Skipping {leads_already_scored} leads that already have scores")
-
-    for idx, (index, row) in enumerate(leads_to_evaluate.iterrows()):
-        firstname = str(row.get('firstname', 'N/A'))
-        lastname = str(row.get('lastname', 'N/A'))
-        email = str(row.get('email', 'N/A'))
-        full_name = f"{firstname} {lastname}".strip()
-        print(f"\nEvaluating lead {idx+1}/{len(leads_to_evaluate)}: {full_name} ({email})")
-        
-        # Create evaluation prompt
-        prompt = create_icp_evaluation_prompt_hubspot(row.to_dict())
-        
-        # Call Perplexity API
-        response = call_perplexity_api(prompt)
-        
+    apply_prefilter(df, prefilter_hubspot_leads, noun="lead")
+
+    evaluate_rows_with_perplexity(
+        df,
+        create_icp_evaluation_prompt_hubspot,
+        _describe_hubspot_row,
+        noun="lead",
+        journal=journal,
+    )
+
+    return _save_evaluation(df, file_path, "HubSpot leads", journal)
+
+
+# Async variants (used by the pipelines' async runners)
+
+async def async_call_perplexity_api(prompt, model="sonar", system_prompt=DEFAULT_SYSTEM_PROMPT, max_tokens=500, response_format=None):
+    """Async counterpart of call_perplexity_api sharing its cache, token bucket and retry rules"""
+    headers, payload = _perplexity_request(prompt, model, system_prompt, max_tokens, response_format)
+
+    cached = get_cached_response(model, system_prompt, prompt, max_tokens)
+    if cached is not None:
+        return cached
+
+    for attempt in range(PERPLEXITY_MAX_RETRIES + 1):
+        try:
+            started = time.monotonic()
+            response = await async_post(PERPLEXITY_API_URL, headers=headers, json=payload, timeout=30, retries=0)
+            if (response.status_code == 429 or response.status_code >= 500) and attempt < PERPLEXITY_MAX_RETRIES:
+                delay = _retry_delay(response, attempt)
+                print(f"Perplexity returned {response.status_code}, retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+            response.raise_for_status()
+            content = response.json()["choices"][0]["message"]["content"]
+            store_response(model, system_prompt, prompt, content, time.monotonic() - started, max_tokens)
+            return content
+        except httpx.HTTPStatusError as e:
+            print(f"Error calling Perplexity API: {e}")
+            print(f"Response: {e.response.text}")
+            return None
+        except Exception as e:
+            print(f"Error calling Perplexity API: {e}")
+            return None
+
+
+async def async_call_perplexity_for_score(prompt, model="sonar", max_tokens=500, structured=False):
+    """Async counterpart of call_perplexity_for_score"""
+    if structured:
+        return await async_call_perplexity_api(
+            prompt + STRUCTURED_PROMPT_SUFFIX,
+            model=model,
+            system_prompt=STRUCTURED_SYSTEM_PROMPT,
+            max_tokens=min(max_tokens, PERPLEXITY_STRUCTURED_MAX_TOKENS),
+            response_format=SCORE_RESPONSE_FORMAT,
+        )
+    return await async_call_perplexity_api(prompt, model=model, max_tokens=max_tokens)
+
+
+async def async_call_perplexity_tiered(prompt, structured=False):
+    """Async counterpart of call_perplexity_tiered"""
+    started = time.monotonic()
+    response = await async_call_perplexity_for_score(
+        prompt if structured else prompt + TIER1_PROMPT_SUFFIX,
+        model=PERPLEXITY_TIER1_MODEL,
+        max_tokens=PERPLEXITY_TIER1_MAX_TOKENS,
+        structured=structured,
+    )
+    _record_tier_call("tier1", time.monotonic() - started)
+
+    if response:
+        score, _ = read_score(response, structured)
+        if not (PERPLEXITY_ESCALATE_MIN_SCORE <= score <= PERPLEXITY_ESCALATE_MAX_SCORE):
+            return response
+
+    started = time.monotonic()
+    escalated = await async_call_perplexity_for_score(
+        prompt,
+        model=PERPLEXITY_TIER2_MODEL,
+        max_tokens=PERPLEXITY_TIER2_MAX_TOKENS,
+        structured=structured,
+    )
+    _record_tier_call("tier2", time.monotonic() - started)
+    return escalated or response
+
+
+async def async_evaluate_rows_with_perplexity(df, build_prompt, describe_row, noun="lead", max_in_flight=None, journal=None, tiered=None, structured=None):
+    """
+    Async counterpart of evaluate_rows_with_perplexity
+
+    Every unscored row becomes a coroutine; at most max_in_flight (default:
+    PERPLEXITY_MAX_WORKERS) wait on the API at once and the shared token bucket
+    still caps the request rate. build_prompt may be a coroutine function.
+    """
+    semaphore = asyncio.Semaphore(max_in_flight or PERPLEXITY_MAX_WORKERS)
+    if tiered is None:
+        tiered = PERPLEXITY_TIERED_SCORING
+    if structured is None:
+        structured = PERPLEXITY_STRUCTURED_OUTPUT
+
+    leads_to_evaluate = df[df['icp_score'].isna() | (df['icp_score'] == '')]
+    total = len(leads_to_evaluate)
+    print(f"Evaluating {total} {noun}s ({len(df) - total} already scored)")
+
+    async def evaluate(index, row):
+        async with semaphore:
+            try:
+                prompt = build_prompt(row.to_dict())
+                if inspect.isawaitable(prompt):
+                    prompt = await prompt
+                if tiered:
+                    response = await async_call_perplexity_tiered(prompt, structured)
+                else:
+                    response = await async_call_perplexity_for_score(prompt, structured=structured)
+            except Exception as e:
+                print(f"  Error: {e}")
+                response = None
+
         if response:
-            score = extract_score_from_response(response)
-            df.at[index, 'icp_score'] = score
-            df.at[index, 'icp_evaluation'] = (response or "")[:500]
-            
-            print(f"  Score: {score}/10")
-            print(f"  Evaluation: {str(response)[:200]}...")
+            score, evaluation = read_score(response, structured)
+            # The journal append (and its periodic fsync) runs off the event loop
+            await asyncio.to_thread(_set_score, df, index, score, evaluation, journal)
+            print(f"{describe_row(row)}: {score}/10")
         else:
-            df.at[index, 'icp_score'] = 5.0
+            df.at[index, 'icp_score'] = 5.0  # Default score on error
             df.at[index, 'icp_evaluation'] = "Error: Could not evaluate"
-            print(f"  Error: Could not get evaluation, using default score 5.0")
+            print(f"{describe_row(row)}: could not get evaluation, using default score 5.0")
 
-        if idx < len(leads_to_evaluate) - 1:
-            time.sleep(1)
+    await asyncio.gather(*(evaluate(index, row) for index, row in leads_to_evaluate.iterrows()))
+    return df
 
-    df = df.sort_values(by='icp_score', ascending=False, na_position='last')
-    df.to_csv(file_path, index=False)
-    print(f"\nCompleted! Updated {len(df)} HubSpot leads with ICP scores in {file_path}")
-    print(f"Score distribution:")
-    print(df['icp_score'].describe())
-    
-    return df
\ No newline at end of file
+
+async def async_evaluate_leads_with_perplexity(file_path, batch_size=None, share_scores=None):
+    """
+    Async counterpart of evaluate_leads_with_perplexity
+
+    Batched and company-shared scoring have no async path; with either enabled the
+    threaded implementation runs in a worker thread instead.
+    """
+    batch_size = PERPLEXITY_BATCH_SIZE if batch_size is None else batch_size
+    share_scores = APOLLO_SHARE_COMPANY_SCORES if share_scores is None else share_scores
+    if batch_size > 1 or share_scores:
+        return await asyncio.to_thread(evaluate_leads_with_perplexity, file_path, batch_size, share_scores)
+
+    # Stage file I/O and the pandas prefilter run in worker threads so other pipeline tasks keep going
+    df, journal = await asyncio.to_thread(_load_for_evaluation, file_path, ['email'], APOLLO_EVALUATION_COLUMNS)
+    await asyncio.to_thread(apply_prefilter, df, prefilter_apollo_leads, noun="lead")
+    await async_evaluate_rows_with_perplexity(
+        df,
+        create_icp_evaluation_prompt,
+        lambda row: f"{row.get('full_name', 'N/A')} at {row.get('company_name', 'N/A')}",
+        noun="lead",
+        journal=journal,
+    )
+    return await asyncio.to_thread(_save_evaluation, df, file_path, "leads", journal)
+
+
+async def async_evaluate_gmaps_with_perplexity(file_path):
+    """Async counterpart of evaluate_gmaps_with_perplexity (website fetching stays on its thread pool)"""
+    df, journal = await asyncio.to_thread(_load_for_evaluation, file_path, ['url', 'title', 'address'], GMAPS_EVALUATION_COLUMNS)
+    await asyncio.to_thread(apply_prefilter, df, prefilter_gmaps_venues, noun="venue")
+
+    build_prompt = create_icp_evaluation_prompt_gmaps
+    fetcher = None
+    if GMAPS_FETCH_WEBSITES and 'website' in df.columns:
+        fetcher = WebsiteFetcher()
+        unscored = df['icp_score'].isna() | (df['icp_score'] == '')
+        fetcher.prefetch(df.loc[unscored, 'website'])
+
+        async def build_prompt(lead_data):
+            text = await asyncio.to_thread(fetcher.get_text, lead_data.get('website'))
+            return create_icp_evaluation_prompt_gmaps(lead_data, text)
+
+    try:
+        await async_evaluate_rows_with_perplexity(
+            df,
+            build_prompt,
+            lambda row: f"{row.get('title', 'N/A')}",
+            noun="venue",
+            journal=journal,
+        )
+    finally:
+        if fetcher is not None:
+            fetcher.shutdown()
+
+    return await asyncio.to_thread(_save_evaluation, df, file_path, "venues", journal)
+
+
+async def async_evaluate_hubspot_with_perplexity(file_path):
+    """Async counterpart of evaluate_hubspot_with_perplexity"""
+    df, journal = await asyncio.to_thread(_load_for_evaluation, file_path, ['email'], HUBSPOT_EVALUATION_COLUMNS)
+    await asyncio.to_thread(apply_prefilter, df, prefilter_hubspot_leads, noun="lead")
+    await async_evaluate_rows_with_perplexity(
+        df,
+        create_icp_evaluation_prompt_hubspot,
+        _describe_hubspot_row,
+        noun="lead",
+        journal=journal,
+    )
+    return await asyncio.to_thread(_save_evaluation, df, file_path, "HubSpot leads", journal)
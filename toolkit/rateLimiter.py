@@ -0,0 +1,60 @@
+"""
+Rate Limiter
+Thread-safe token bucket used to keep vendor calls under their requests-per-minute limits
+"""
+
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Classic token bucket: `rate_per_minute` tokens refill continuously up to `capacity`
+
+    acquire() blocks until a token is available, so any number of worker threads
+    can share one bucket and together never exceed the configured rate.
+    """
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = capacity or max(1, int(rate_per_minute // 6))  # ~10s of burst
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate_per_second)
+        self.updated_at = now
+
+    def try_acquire(self, tokens=1):
+        """Take `tokens` if available; returns 0.0 on success, else the seconds until they will be"""
+        with self.lock:
+            self._refill()
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return 0.0
+            return (tokens - self.tokens) / self.rate_per_second
+
+    def acquire(self, tokens=1):
+        """Block until `tokens` tokens are available and take them"""
+        while True:
+            wait = self.try_acquire(tokens)
+            if not wait:
+                return
+            time.sleep(wait)
+
+    def drain(self):
+        """Empty the bucket, e.g. after the vendor answered 429, so every caller backs off"""
+        with self.lock:
+            self._refill()
+            self.tokens = 0.0
+
+    async def acquire_async(self, tokens=1):
+        """acquire() for asyncio code: waits with asyncio.sleep instead of blocking the loop"""
+        while True:
+            wait = self.try_acquire(tokens)
+            if not wait:
+                return
+            await asyncio.sleep(wait)
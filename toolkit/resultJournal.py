@@ -0,0 +1,149 @@
+"""
+Result Journal
+Append-only JSONL log of per-row results so paid enrichment steps can resume after a crash
+"""
+
+import json
+import os
+import threading
+import pandas as pd
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# fsync the journal after this many appended rows (every write is still flushed)
+RESULT_JOURNAL_FSYNC_EVERY = int(os.getenv("RESULT_JOURNAL_FSYNC_EVERY", "20"))
+
+
+def journal_path_for(file_path, step):
+    """Journal file that sits next to the stage file it checkpoints"""
+    return f"{file_path}.{step}.journal.jsonl"
+
+
+def row_journal_key(row, key_columns):
+    """
+    Natural key of a row built from key_columns, or None if all of them are empty
+
+    Keys come from row content rather than the DataFrame index so a restarted
+    pipeline that rebuilt the stage file in a different order still matches.
+    """
+    values = []
+    for column in key_columns:
+        value = row.get(column)
+        if value is None or (not isinstance(value, str) and pd.isna(value)):
+            value = ""
+        values.append(str(value).strip().lower())
+    if not any(values) or all(v == "nan" for v in values):
+        return None
+    return "|".join(values)
+
+
+def _has_result(row, columns):
+    for column in columns:
+        value = row.get(column)
+        if value is None or (not isinstance(value, str) and pd.isna(value)):
+            continue
+        if str(value).strip() not in ("", "nan"):
+            return True
+    return False
+
+
+class ResultJournal:
+    """
+    Per-row result journal for one stage file
+
+        journal = ResultJournal(journal_path_for(file_path, "icp"), ["email"])
+        done = journal.merge_into(df, ["icp_score", "icp_evaluation"])
+        ...
+        journal.record(row, {"icp_score": 8, "icp_evaluation": "..."})
+        ...
+        df.to_csv(file_path)
+        journal.remove()
+    """
+
+    def __init__(self, path, key_columns, fsync_every=None):
+        self.path = path
+        self.key_columns = key_columns
+        self.fsync_every = fsync_every or RESULT_JOURNAL_FSYNC_EVERY
+        self.lock = threading.Lock()
+        self.file = None
+        self.unsynced = 0
+
+    def load(self):
+        """Return {row key: result values}; later entries win, a torn last line is ignored"""
+        results = {}
+        if not os.path.exists(self.path):
+            return results
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                results[entry["key"]] = entry["values"]
+        return results
+
+    def merge_into(self, df, columns):
+        """
+        Copy journaled results into rows that have none yet
+
+        A row already has a result when any of `columns` is filled; those rows keep
+        their values even if the journal holds an entry for the same key.
+
+        Returns:
+            Set of df indices whose result came from the journal
+        """
+        results = self.load()
+        merged = set()
+        if not results:
+            return merged
+
+        for column in columns:
+            if column not in df.columns:
+                df[column] = None
+
+        for index, row in df.iterrows():
+            key = row_journal_key(row, self.key_columns)
+            if key is None or key not in results or _has_result(row, columns):
+                continue
+            for column, value in results[key].items():
+                if column in df.columns:
+                    df.at[index, column] = value
+            merged.add(index)
+
+        print(f"♻️ Restored {len(merged)} results from journal {self.path}")
+        return merged
+
+    def record(self, row, values):
+        """Append one row's result; thread-safe"""
+        key = row_journal_key(row, self.key_columns)
+        if key is None:
+            return
+        line = json.dumps({"key": key, "values": values}, default=str)
+        with self.lock:
+            if self.file is None:
+                journal_dir = os.path.dirname(self.path)
+                if journal_dir:
+                    os.makedirs(journal_dir, exist_ok=True)
+                self.file = open(self.path, "a", encoding="utf-8")
+            self.file.write(line + "\n")
+            self.file.flush()
+            self.unsynced += 1
+            if self.unsynced >= self.fsync_every:
+                os.fsync(self.file.fileno())
+                self.unsynced = 0
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.flush()
+                os.fsync(self.file.fileno())
+                self.file.close()
+                self.file = None
+                self.unsynced = 0
+
+    def remove(self):
+        """Delete the journal once its results are safely in the stage file"""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
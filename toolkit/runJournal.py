@@ -0,0 +1,110 @@
+"""
+Apify Run Journal
+Local record of started actor runs so a restarted pipeline can reattach instead of relaunching
+"""
+
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+from toolkit.scrapeCache import scrape_cache_key
+
+load_dotenv()
+
+RUN_JOURNAL_PATH = os.getenv("APIFY_RUN_JOURNAL_PATH", "outputs/.apify_runs.json")
+# Journaled runs older than this are not reattached to
+RUN_JOURNAL_MAX_AGE_HOURS = float(os.getenv("APIFY_RUN_JOURNAL_MAX_AGE_HOURS", "24"))
+
+_journal_lock = threading.Lock()
+
+
+def _load():
+    if not os.path.exists(RUN_JOURNAL_PATH):
+        return {}
+    try:
+        with open(RUN_JOURNAL_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Could not read run journal {RUN_JOURNAL_PATH}: {e}")
+        return {}
+
+
+def _save(journal):
+    output_dir = os.path.dirname(RUN_JOURNAL_PATH)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    tmp_path = f"{RUN_JOURNAL_PATH}.tmp-{os.getpid()}-{threading.get_ident()}"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(journal, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, RUN_JOURNAL_PATH)
+
+
+def record_run(actor_id, config, run_id, dataset_id=None):
+    """Save a freshly started run as soon as Apify returns its ID"""
+    key = scrape_cache_key(actor_id, config)
+    with _journal_lock:
+        journal = _load()
+        journal[key] = {
+            "actor_id": actor_id,
+            "run_id": run_id,
+            "dataset_id": dataset_id,
+            "status": "started",
+            "collected_items": 0,
+            "started_at": datetime.now().isoformat(),
+        }
+        _save(journal)
+
+
+def find_resumable_run(actor_id, config):
+    """
+    Return the journal entry of a recent, not yet collected run for this config
+
+    Returns:
+        Entry dict with run_id/dataset_id, or None if a new run has to be started
+    """
+    key = scrape_cache_key(actor_id, config)
+    with _journal_lock:
+        entry = _load().get(key)
+
+    if not entry or entry.get("status") != "started":
+        return None
+
+    started_at = datetime.fromisoformat(entry["started_at"])
+    if datetime.now() - started_at > timedelta(hours=RUN_JOURNAL_MAX_AGE_HOURS):
+        return None
+    return entry
+
+
+def record_collected(actor_id, config, collected_items):
+    """Save how many dataset items of the run are already appended to the output file"""
+    key = scrape_cache_key(actor_id, config)
+    with _journal_lock:
+        journal = _load()
+        if key in journal:
+            journal[key]["collected_items"] = collected_items
+            _save(journal)
+
+
+def collected_items(actor_id, config):
+    """Dataset items a journaled, not yet collected run already appended (0 for a fresh run)"""
+    entry = find_resumable_run(actor_id, config)
+    return entry.get("collected_items", 0) if entry else 0
+
+
+def mark_run(actor_id, config, status):
+    """Update a journaled run's status ("collected" or "failed") and drop stale entries"""
+    key = scrape_cache_key(actor_id, config)
+    cutoff = datetime.now() - timedelta(hours=RUN_JOURNAL_MAX_AGE_HOURS)
+    with _journal_lock:
+        journal = _load()
+        if key in journal:
+            journal[key]["status"] = status
+            journal[key]["finished_at"] = datetime.now().isoformat()
+        journal = {
+            k: v for k, v in journal.items()
+            if datetime.fromisoformat(v["started_at"]) >= cutoff
+        }
+        _save(journal)
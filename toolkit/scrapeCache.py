@@ -0,0 +1,133 @@
+"""
+Scrape Cache
+Content-addressed local cache of Apify datasets, keyed by a hash of (actor id, config)
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+import pandas as pd
+from dotenv import load_dotenv
+
+load_dotenv()
+
+SCRAPE_CACHE_DIR = os.getenv("SCRAPE_CACHE_DIR", "outputs/.scrape_cache")
+# Cached datasets older than this are ignored and removed (0 disables the cache)
+SCRAPE_CACHE_TTL_HOURS = float(os.getenv("SCRAPE_CACHE_TTL_HOURS", "24"))
+
+COMPLETE_MARKER = "_COMPLETE"
+
+
+def scrape_cache_key(actor_id, config):
+    """Stable hash of the actor id and its input config"""
+    payload = json.dumps({"actor_id": actor_id, "config": config}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _cache_path(key):
+    return os.path.join(SCRAPE_CACHE_DIR, key)
+
+
+def _parquet_safe(df):
+    """Stringify non-string objects (lists, dicts, mixed types) so pyarrow can infer one type per column"""
+    df = df.copy()
+    for col in df.columns[df.dtypes == object]:
+        df[col] = df[col].map(
+            lambda v: v if v is None or isinstance(v, str) else (None if isinstance(v, float) and v != v else str(v))
+        )
+    return df
+
+
+def get_cached_pages(actor_id, config, ttl_hours=None):
+    """
+    Look up a cached dataset for this actor config
+
+    Args:
+        actor_id: Apify actor id
+        config: Actor input config dict
+        ttl_hours: Max age of a usable entry (default: SCRAPE_CACHE_TTL_HOURS)
+
+    Returns:
+        Generator of pages (lists of item dicts) on a hit, or None on a miss
+    """
+    ttl_hours = SCRAPE_CACHE_TTL_HOURS if ttl_hours is None else ttl_hours
+    if ttl_hours <= 0:
+        return None
+
+    path = _cache_path(scrape_cache_key(actor_id, config))
+    marker = os.path.join(path, COMPLETE_MARKER)
+    if not os.path.exists(marker):
+        return None
+
+    age_hours = (time.time() - os.path.getmtime(marker)) / 3600
+    if age_hours > ttl_hours:
+        print(f"🗑️ Scrape cache entry expired ({age_hours:.1f}h old), removing")
+        shutil.rmtree(path, ignore_errors=True)
+        return None
+
+    parts = sorted(f for f in os.listdir(path) if f.endswith(".parquet"))
+
+    def pages():
+        for part in parts:
+            df = pd.read_parquet(os.path.join(path, part))
+            yield df.astype(object).where(df.notna(), None).to_dict("records")
+
+    return pages()
+
+
+class ScrapeCacheWriter:
+    """
+    Write a dataset to the cache page by page while it is being streamed
+
+    Parts go to a private temp directory that is renamed into place only when the
+    block exits cleanly, so a failed run never leaves a partial entry behind.
+
+        with ScrapeCacheWriter(ACTOR_ID, config) as cache_writer:
+            save_pages(cache_writer.tee(pages))
+    """
+
+    def __init__(self, actor_id, config, enabled=True):
+        self.path = _cache_path(scrape_cache_key(actor_id, config))
+        self.tmp_path = f"{self.path}.tmp-{os.getpid()}-{threading.get_ident()}-{uuid.uuid4().hex[:8]}"
+        # A dataset resumed part-way would be cached without its first pages
+        self.enabled = enabled and SCRAPE_CACHE_TTL_HOURS > 0
+        self.part_count = 0
+
+    def __enter__(self):
+        if self.enabled:
+            os.makedirs(self.tmp_path, exist_ok=True)
+        return self
+
+    def write_page(self, items):
+        if not self.enabled or not items:
+            return
+        df = _parquet_safe(pd.DataFrame(items))
+        df.to_parquet(os.path.join(self.tmp_path, f"part-{self.part_count:05d}.parquet"), index=False)
+        self.part_count += 1
+
+    def tee(self, pages):
+        """Yield pages unchanged while writing each one to the cache"""
+        for page in pages:
+            self.write_page(page)
+            yield page
+
+    def __exit__(self, exc_type, exc, tb):
+        if not self.enabled:
+            return False
+        if exc_type is not None:
+            shutil.rmtree(self.tmp_path, ignore_errors=True)
+            return False
+
+        open(os.path.join(self.tmp_path, COMPLETE_MARKER), "w").close()
+        shutil.rmtree(self.path, ignore_errors=True)
+        try:
+            os.rename(self.tmp_path, self.path)
+            print(f"💾 Cached {self.part_count} page(s) at {self.path}")
+        except OSError as e:
+            print(f"⚠️ Could not store scrape cache entry: {e}")
+            shutil.rmtree(self.tmp_path, ignore_errors=True)
+        return False
@@ -0,0 +1,183 @@
+"""
+Vendor Quota Coordinator
+Process-wide per-vendor request-rate and concurrency budgets shared by every pipeline thread and event loop
+"""
+
+import asyncio
+import itertools
+import os
+import threading
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from urllib.parse import urlsplit
+from dotenv import load_dotenv
+from toolkit.rateLimiter import TokenBucket
+
+load_dotenv()
+
+# Blocked async waiters re-check the queue this often
+ASYNC_POLL_SECONDS = 0.05
+
+# name: (requests per second, concurrent requests); override with QUOTA_<NAME>_RPS / QUOTA_<NAME>_CONCURRENCY
+DEFAULT_VENDOR_BUDGETS = {
+    "perplexity": (int(os.getenv("PERPLEXITY_REQUESTS_PER_MINUTE", "50")) / 60, 8),
+    "apify": (10, 20),
+    "instantly": (5, 2),
+    "neverbounce": (2, 2),
+    "hubspot": (9, 5),
+    "hunter": (5, 3),
+    "snov": (1, 2),
+    "apollo": (1, 2),
+    "rocketreach": (2, 2),
+}
+
+HOST_VENDORS = {
+    "api.perplexity.ai": "perplexity",
+    "api.apify.com": "apify",
+    "api.instantly.ai": "instantly",
+    "api.neverbounce.com": "neverbounce",
+    "api.hubapi.com": "hubspot",
+    "api.hunter.io": "hunter",
+    "api.snov.io": "snov",
+    "api.apollo.io": "apollo",
+    "api.rocketreach.co": "rocketreach",
+}
+
+
+class VendorQuota:
+    """
+    One vendor's budget: at most `rps` requests per second and `concurrency` in flight
+
+    Waiters are served strictly first come, first served across threads and event
+    loops, so a pipeline that queued later cannot starve one that queued earlier.
+    """
+
+    def __init__(self, name, rps, concurrency):
+        self.name = name
+        self.bucket = TokenBucket(rps * 60, capacity=max(1, int(rps)))
+        self.concurrency = concurrency
+        self.in_flight = 0
+        self.condition = threading.Condition()
+        self.queue = deque()
+        self.tickets = itertools.count()
+
+    def _enqueue(self):
+        with self.condition:
+            ticket = next(self.tickets)
+            self.queue.append(ticket)
+            return ticket
+
+    def _try_take(self, ticket):
+        """
+        Must hold self.condition. Returns (taken, wait): wait is the seconds until a
+        rate token frees up, or None when blocked behind the queue / concurrency.
+        """
+        if self.queue[0] != ticket or self.in_flight >= self.concurrency:
+            return False, None
+        wait = self.bucket.try_acquire()
+        if wait:
+            return False, wait
+        self.queue.popleft()
+        self.in_flight += 1
+        self.condition.notify_all()
+        return True, 0.0
+
+    def _abandon(self, ticket):
+        with self.condition:
+            if ticket in self.queue:
+                self.queue.remove(ticket)
+            self.condition.notify_all()
+
+    def acquire(self):
+        """Block until it is this caller's turn and the budget allows one more request"""
+        ticket = self._enqueue()
+        try:
+            with self.condition:
+                while True:
+                    taken, wait = self._try_take(ticket)
+                    if taken:
+                        return
+                    self.condition.wait(timeout=wait)
+        except BaseException:
+            self._abandon(ticket)
+            raise
+
+    async def acquire_async(self):
+        """acquire() for asyncio code; waits without blocking the event loop"""
+        ticket = self._enqueue()
+        try:
+            while True:
+                with self.condition:
+                    taken, wait = self._try_take(ticket)
+                if taken:
+                    return
+                await asyncio.sleep(wait or ASYNC_POLL_SECONDS)
+        except BaseException:
+            self._abandon(ticket)
+            raise
+
+    def release(self):
+        with self.condition:
+            self.in_flight -= 1
+            self.condition.notify_all()
+
+    def drain(self):
+        """Pause new requests until the rate bucket refills, e.g. after a 429"""
+        self.bucket.drain()
+
+
+_quotas = {}
+_quotas_lock = threading.Lock()
+
+
+def get_vendor_quota(name):
+    """Process-wide quota for a named vendor, created from its budget on first use"""
+    with _quotas_lock:
+        if name not in _quotas:
+            default_rps, default_concurrency = DEFAULT_VENDOR_BUDGETS[name]
+            rps = float(os.getenv(f"QUOTA_{name.upper()}_RPS", default_rps))
+            concurrency = int(os.getenv(f"QUOTA_{name.upper()}_CONCURRENCY", default_concurrency))
+            _quotas[name] = VendorQuota(name, rps, concurrency)
+        return _quotas[name]
+
+
+def vendor_for_url(url):
+    """Vendor name of a URL's host, or None for hosts without a budget (e.g. venue websites)"""
+    return HOST_VENDORS.get((urlsplit(url).hostname or "").lower())
+
+
+@contextmanager
+def vendor_slot(url):
+    """Hold one request's worth of the URL's vendor budget (no-op for unbudgeted hosts)"""
+    vendor = vendor_for_url(url)
+    if vendor is None:
+        yield
+        return
+    quota = get_vendor_quota(vendor)
+    quota.acquire()
+    try:
+        yield
+    finally:
+        quota.release()
+
+
+@asynccontextmanager
+async def async_vendor_slot(url):
+    """Async counterpart of vendor_slot"""
+    vendor = vendor_for_url(url)
+    if vendor is None:
+        yield
+        return
+    quota = get_vendor_quota(vendor)
+    await quota.acquire_async()
+    try:
+        yield
+    finally:
+        quota.release()
+
+
+def drain_vendor(url):
+    """Back off every caller of the URL's vendor after it answered 429"""
+    vendor = vendor_for_url(url)
+    if vendor is not None:
+        get_vendor_quota(vendor).drain()
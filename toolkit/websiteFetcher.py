@@ -0,0 +1,245 @@
+"""
+Website Fetcher
+Concurrent, per-host polite fetching of venue websites reduced to plain text, cached on disk by URL
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+load_dotenv()
+
+WEBSITE_FETCH_MAX_WORKERS = int(os.getenv("WEBSITE_FETCH_MAX_WORKERS", "16"))
+# Simultaneous requests allowed against any single host
+WEBSITE_FETCH_PER_HOST = int(os.getenv("WEBSITE_FETCH_PER_HOST", "2"))
+# Total time allowed per page; a body still arriving after this is cut off
+WEBSITE_FETCH_TIMEOUT_SECONDS = float(os.getenv("WEBSITE_FETCH_TIMEOUT_SECONDS", "10"))
+# Stop downloading a page after this many bytes
+WEBSITE_FETCH_MAX_BYTES = int(os.getenv("WEBSITE_FETCH_MAX_BYTES", "300000"))
+# Extracted text is truncated to this many characters
+WEBSITE_TEXT_MAX_CHARS = int(os.getenv("WEBSITE_TEXT_MAX_CHARS", "4000"))
+WEBSITE_CACHE_DIR = os.getenv("WEBSITE_CACHE_DIR", "outputs/.website_cache")
+# Cached pages older than this are fetched again (0 disables the cache)
+WEBSITE_CACHE_TTL_HOURS = float(os.getenv("WEBSITE_CACHE_TTL_HOURS", "168"))
+# When set, every request goes to this base URL instead (path and query kept, original
+# host sent in the Host header) so the fetcher can run against a local HTTP stand-in
+WEBSITE_FETCH_BASE_URL = os.getenv("WEBSITE_FETCH_BASE_URL", "")
+
+USER_AGENT = "Mozilla/5.0 (compatible; LeadGenBot/1.0)"
+SKIPPED_TAGS = {"script", "style", "noscript", "svg", "template", "iframe"}
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+class _TextExtractor(HTMLParser):
+    """Collects visible text plus the meta description, skipping script/style blocks"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_TAGS:
+            self.skip_depth += 1
+        elif tag == "meta":
+            attrs = dict(attrs)
+            if (attrs.get("name") or attrs.get("property") or "").lower() in ("description", "og:description"):
+                self.parts.append(attrs.get("content") or "")
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS and self.skip_depth:
+            self.skip_depth -= 1
+
+    def handle_data(self, data):
+        if not self.skip_depth:
+            self.parts.append(data)
+
+
+def html_to_text(html, max_chars=None):
+    """Strip HTML down to whitespace-collapsed visible text"""
+    extractor = _TextExtractor()
+    try:
+        extractor.feed(html)
+        extractor.close()
+    except Exception:
+        pass
+    text = _WHITESPACE_RE.sub(" ", " ".join(extractor.parts)).strip()
+    return text[:max_chars or WEBSITE_TEXT_MAX_CHARS]
+
+
+def normalize_website_url(url):
+    """Return an absolute http(s) URL, or None for empty / unusable values"""
+    if url is None:
+        return None
+    url = str(url).strip()
+    if not url or url.lower() in ("nan", "none", "n/a"):
+        return None
+    if not re.match(r"^https?://", url, re.IGNORECASE):
+        url = f"http://{url}"
+    return url if urlsplit(url).hostname else None
+
+
+def _cache_path(url):
+    return os.path.join(WEBSITE_CACHE_DIR, hashlib.sha256(url.encode("utf-8")).hexdigest() + ".json")
+
+
+def _read_cache(url):
+    if WEBSITE_CACHE_TTL_HOURS <= 0:
+        return None
+    path = _cache_path(url)
+    try:
+        with open(path, encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if time.time() - entry.get("fetched_at", 0) > WEBSITE_CACHE_TTL_HOURS * 3600:
+        return None
+    return entry.get("text", "")
+
+
+def _write_cache(url, text, status):
+    if WEBSITE_CACHE_TTL_HOURS <= 0:
+        return
+    os.makedirs(WEBSITE_CACHE_DIR, exist_ok=True)
+    path = _cache_path(url)
+    tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"url": url, "status": status, "fetched_at": time.time(), "text": text}, f)
+    os.replace(tmp_path, path)
+
+
+class WebsiteFetcher:
+    """
+    Fetch many websites in the background while the caller does other work
+
+        fetcher = WebsiteFetcher()
+        fetcher.prefetch(df['website'])
+        ...
+        text = fetcher.get_text(row['website'])  # waits only for this URL
+        ...
+        fetcher.shutdown()
+
+    Downloads are capped at WEBSITE_FETCH_MAX_BYTES and WEBSITE_FETCH_TIMEOUT_SECONDS,
+    each host gets at most WEBSITE_FETCH_PER_HOST concurrent requests, and results
+    (including 4xx/5xx pages, stored as empty text) are cached on disk for
+    WEBSITE_CACHE_TTL_HOURS. Connection errors are not cached so the next run retries them.
+
+    Venue sites go through the fetcher's own session rather than httpClient's
+    per-host vendor sessions, so thousands of one-off hosts neither evict the API
+    sessions nor show up in the pipeline's per-host HTTP stats.
+    """
+
+    def __init__(self, max_workers=None, per_host=None, base_url=None, timeout=None, max_bytes=None):
+        max_workers = max_workers or WEBSITE_FETCH_MAX_WORKERS
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.per_host = per_host or WEBSITE_FETCH_PER_HOST
+        self.base_url = (WEBSITE_FETCH_BASE_URL if base_url is None else base_url).rstrip("/")
+        self.timeout = timeout or WEBSITE_FETCH_TIMEOUT_SECONDS
+        self.max_bytes = max_bytes or WEBSITE_FETCH_MAX_BYTES
+        # One session; urllib3 keeps a bounded LRU of host pools and only closes idle connections
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=self.per_host, max_retries=1)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.lock = threading.Lock()
+        self.host_semaphores = {}
+        self.futures = {}
+        self.stats = {"fetched": 0, "cached": 0, "failed": 0}
+
+    def _host_semaphore(self, host):
+        with self.lock:
+            if host not in self.host_semaphores:
+                self.host_semaphores[host] = threading.Semaphore(self.per_host)
+            return self.host_semaphores[host]
+
+    def _count(self, key):
+        with self.lock:
+            self.stats[key] += 1
+
+    def _request_target(self, url):
+        """URL to request and extra headers, honouring the local stand-in base URL"""
+        if not self.base_url:
+            return url, {}
+        parts = urlsplit(url)
+        target = f"{self.base_url}{parts.path or '/'}"
+        if parts.query:
+            target += f"?{parts.query}"
+        return target, {"Host": parts.netloc}
+
+    def _fetch(self, url):
+        cached = _read_cache(url)
+        if cached is not None:
+            self._count("cached")
+            return cached
+
+        target, extra_headers = self._request_target(url)
+        headers = {"User-Agent": USER_AGENT, "Accept": "text/html,*/*;q=0.5", **extra_headers}
+        host = urlsplit(url).hostname.lower()
+
+        with self._host_semaphore(host):
+            deadline = time.monotonic() + self.timeout
+            try:
+                response = self.session.get(target, headers=headers, timeout=self.timeout, stream=True)
+            except requests.exceptions.RequestException as e:
+                print(f"⚠️ Could not fetch {url}: {e}")
+                self._count("failed")
+                return ""
+
+            with response:
+                body = b""
+                status = response.status_code
+                encoding = response.encoding or "utf-8"
+                if response.ok and "html" in response.headers.get("Content-Type", "text/html").lower():
+                    try:
+                        # read1 returns whatever has arrived, so a stalled body keeps its first part
+                        while len(body) < self.max_bytes and time.monotonic() < deadline:
+                            chunk = response.raw.read1(16384, decode_content=True)
+                            if not chunk:
+                                break
+                            body += chunk
+                    except (requests.exceptions.RequestException, urllib3.exceptions.HTTPError) as e:
+                        print(f"⚠️ Stopped reading {url} after {len(body)} bytes: {e}")
+                    body = body[:self.max_bytes]
+
+        text = html_to_text(body.decode(encoding, errors="replace")) if body else ""
+        _write_cache(url, text, status)
+        self._count("fetched")
+        return text
+
+    def prefetch(self, urls):
+        """Queue every usable URL for background fetching; duplicates are fetched once"""
+        for raw_url in urls:
+            url = normalize_website_url(raw_url)
+            if url is None:
+                continue
+            with self.lock:
+                if url not in self.futures:
+                    self.futures[url] = self.executor.submit(self._fetch, url)
+
+    def get_text(self, raw_url):
+        """Extracted text for one website ('' if missing or unreachable), waiting for its fetch if needed"""
+        url = normalize_website_url(raw_url)
+        if url is None:
+            return ""
+        self.prefetch([url])
+        try:
+            return self.futures[url].result()
+        except Exception as e:
+            print(f"⚠️ Could not fetch {url}: {e}")
+            return ""
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
+        print(f"🌐 Websites: {self.stats['fetched']} fetched, {self.stats['cached']} from cache, {self.stats['failed']} failed")